@@ -21,6 +21,7 @@ import queue
 import threading
 import time
 import atexit
+from collections import deque
 from typing import Any, Dict, Optional
 from pathlib import Path
 from dfx.build_trace_log import process_build_trace_log
@@ -28,6 +29,15 @@ from dfx import dfx_info
 
 
 class AsyncTraceHandler:
+    """Write trace events to the trace log in a background thread.
+
+    The worker drains the queue in batches of up to batch_size events and
+    writes them with a single flush once flush_bytes are buffered or
+    flush_interval seconds passed since the last flush. Events that do not
+    fit in the queue are kept in an unbounded spill buffer instead of being
+    dropped. On shutdown the worker writes a trace_handler_stats event with
+    its own overhead.
+    """
 
     _instance = None
 
@@ -37,7 +47,8 @@ class AsyncTraceHandler:
             cls._instance._initialized = False
         return cls._instance
 
-    def __init__(self, log_file_path: Path, max_queue_size: int = 1000):
+    def __init__(self, log_file_path: Path, max_queue_size: int = 1000, batch_size: int = 256,
+                 flush_bytes: int = 64 * 1024, flush_interval: float = 1.0):
         if not self._initialized:
             log_dir = os.path.dirname(log_file_path)
             if log_dir and not os.path.exists(log_dir):
@@ -45,7 +56,24 @@ class AsyncTraceHandler:
 
             self.log_file_path = log_file_path
             self.queue = queue.Queue(maxsize=max_queue_size)
+            self.batch_size = batch_size
+            self.flush_bytes = flush_bytes
+            self.flush_interval = flush_interval
+            # events that did not fit in the queue, drained by the worker after the queue
+            self._spill = deque()
+            self._spill_lock = threading.Lock()
             self._stop_event = threading.Event()
+            self._done_event = threading.Event()
+            self.stats = {
+                "events": 0,
+                "spilled_events": 0,
+                "bytes_written": 0,
+                "flushes": 0,
+                "queue_high_water": 0,
+                "worker_seconds": 0.0,
+            }
+            self._first_event_time = None
+            self._trace_id = None
 
             self.worker_thread = threading.Thread(target=self._worker, daemon=True)
             self.worker_thread.start()
@@ -59,53 +87,121 @@ class AsyncTraceHandler:
 
     def event_handler(self, data: Dict[str, Any]) -> None:
         try:
-            try:
-                self.queue.put(data, block=False)
-            except queue.Full:
+            # once events spill, keep spilling until the worker caught up to keep them in order
+            if self._spill:
+                self._spill_event(data)
+            else:
                 try:
-                    self.queue.put(data, block=True, timeout=0.1)
+                    self.queue.put(data, block=False)
                 except queue.Full:
-                    dfx_info(f"Warning: Log queue is full, dropping log data: {data}")
+                    self._spill_event(data)
+            pending = self.queue.qsize() + len(self._spill)
+            if pending > self.stats["queue_high_water"]:
+                self.stats["queue_high_water"] = pending
         except Exception as e:
             dfx_info(f"Error: Failed to queue log data: {str(e)}")
 
+    def _spill_event(self, data: Dict[str, Any]) -> None:
+        with self._spill_lock:
+            self._spill.append(data)
+            self.stats["spilled_events"] += 1
+
     def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
         self._stop_event.set()
 
         if wait:
-            try:
-                self.queue.join()
-            except Exception:
-                pass
+            self._done_event.wait(timeout)
 
         if self.worker_thread.is_alive():
             self.worker_thread.join(timeout=timeout)
-    
+
+    def _next_batch(self, timeout: float):
+        """Up to batch_size events, queued ones first, and how many came from the queue."""
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+        except queue.Empty:
+            pass
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        queued = len(batch)
+        if len(batch) < self.batch_size and self._spill:
+            with self._spill_lock:
+                while self._spill and len(batch) < self.batch_size:
+                    batch.append(self._spill.popleft())
+        return batch, queued
+
+    def _encode(self, log_data: Dict[str, Any]) -> str:
+        if self._trace_id is None and isinstance(log_data, dict):
+            self._trace_id = log_data.get("trace_id")
+        try:
+            return json.dumps(log_data, ensure_ascii=False) + "\n"
+        except Exception as e:
+            error_msg = {
+                "timestamp": time.time(),
+                "error": f"Failed to write log: {str(e)}",
+                "original_data": str(log_data)
+            }
+            return json.dumps(error_msg) + "\n"
+
+    def _stats_event(self) -> Dict[str, Any]:
+        end_time = time.time()
+        start_time = self._first_event_time or end_time
+        duration = end_time - start_time
+        stats = dict(self.stats)
+        stats["events_per_second"] = stats["events"] / duration if duration > 0 else 0.0
+        stats.update({
+            "trace_id": self._trace_id,
+            "event_name": "trace_handler_stats",
+            "start_time": start_time,
+            "end_time": end_time,
+        })
+        return stats
+
     def _worker(self) -> None:
         try:
             fd = os.open(self.log_file_path, os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o644)
-            with os.fdopen(fd, 'a', encoding='utf-8') as log_file:
-                while not self._stop_event.is_set() or not self.queue.empty():
-                    try:
-                        log_data = self.queue.get(timeout=0.1)
-                        try:
-                            log_line = json.dumps(log_data, ensure_ascii=False)
-                            log_file.write(f"{log_line}\n")
-                            log_file.flush()
-                        except Exception as e:
-                            error_msg = {
-                                "timestamp": time.time(),
-                                "error": f"Failed to write log: {str(e)}",
-                                "original_data": str(log_data)
-                            }
-                            log_file.write(f"{json.dumps(error_msg)}\n")
-                            log_file.flush()
-                        finally:
-                            self.queue.task_done()
-                    except queue.Empty:
-                        continue
+            with os.fdopen(fd, 'ab') as log_file:
+                pending = []
+                pending_chars = 0
+                last_flush = time.monotonic()
+                while True:
+                    stopping = self._stop_event.is_set()
+                    batch, queued = self._next_batch(0 if stopping else 0.1)
+                    busy_start = time.perf_counter()
+                    if batch and self._first_event_time is None:
+                        self._first_event_time = time.time()
+                    for log_data in batch:
+                        line = self._encode(log_data)
+                        pending.append(line)
+                        pending_chars += len(line)
+                    self.stats["events"] += len(batch)
+                    drained = not batch and stopping
+                    if pending and (drained or pending_chars >= self.flush_bytes
+                                    or time.monotonic() - last_flush >= self.flush_interval):
+                        data = ''.join(pending).encode('utf-8')
+                        log_file.write(data)
+                        log_file.flush()
+                        self.stats["bytes_written"] += len(data)
+                        self.stats["flushes"] += 1
+                        pending = []
+                        pending_chars = 0
+                        last_flush = time.monotonic()
+                    self.stats["worker_seconds"] += time.perf_counter() - busy_start
+                    for _ in range(queued):
+                        self.queue.task_done()
+                    if drained:
+                        break
+                if self.stats["events"]:
+                    log_file.write(self._encode(self._stats_event()).encode('utf-8'))
+                    log_file.flush()
         except Exception as e:
             dfx_info(f"Async log worker failed: {str(e)}")
+        finally:
+            self._done_event.set()
 
 
 # Exposed event_handler function
@@ -118,9 +214,10 @@ def event_handler(data: Dict[str, Any], trace_log_file: Path) -> None:
 def _shutdown_handler():
     try:
         if AsyncTraceHandler._instance:
+            # write out the buffered events before the log is processed
+            AsyncTraceHandler._instance.shutdown()
             # Directly call process_build_trace_log, which now handles upload or local save logic internally
             process_build_trace_log(log_file=AsyncTraceHandler._instance.log_file_path)
-            AsyncTraceHandler._instance.shutdown()
     except Exception:
         pass
 
@@ -36,6 +36,8 @@ class BuildTracker:
 
     _instance = None
     event_handler = event_handler
+    # command line of this process, recorded with every event
+    _raw_args = None
 
     # Initialize configuration using DFXConfigManager
     config_manager = get_config_manager()
@@ -111,6 +113,12 @@ class BuildTracker:
         )
         return args_info
 
+    @classmethod
+    def raw_args(cls) -> list:
+        if cls._raw_args is None:
+            cls._raw_args = sys.argv[2:] if len(sys.argv) > 2 else []
+        return cls._raw_args
+
     @staticmethod
     def check_build_status(tracking_data: Dict, event_name: str, build_type: str, result: Any) -> Dict:
         tracking_data["status"] = "success"
@@ -146,8 +154,7 @@ class BuildTracker:
 
                 args_info = BuildTracker.args_info_parse(args, args_key)
                 tracking_data["args_info"] = args_info
-                args_list = sys.argv[2:] if len(sys.argv) > 2 else []
-                tracking_data["raw_args"] = args_list
+                tracking_data["raw_args"] = BuildTracker.raw_args()
 
                 try:
                     result = func(*args, **kwargs)
@@ -16,6 +16,7 @@
 # limitations under the License.
 #
 
+import os
 
 from modules.interface.build_module_interface import BuildModuleInterface
 from resolver.interface.args_resolver_interface import ArgsResolverInterface
@@ -27,8 +28,11 @@ from containers.arg import BuildPhase
 from exceptions.ohos_exception import OHOSException
 from util.system_util import SystemUtil
 from util.log_util import LogUtil
+from resources.config import Config
 from containers.status import throw_exception
 from util.monitor import Monitor
+from util.resource_sampler import ResourceSampler
+from util.build_timeline import BuildTimeline
 from dfx.build_tracker import build_tracker
 
 
@@ -36,6 +40,20 @@ class OHOSBuildModule(BuildModuleInterface):
 
     _instance = None
 
+    # hb phase recorded with the resource samples taken while a build phase runs
+    SAMPLER_PHASES = {
+        BuildPhase.PRE_BUILD: 'PREBUILD',
+        BuildPhase.PRE_LOAD: 'PRELOAD',
+        BuildPhase.LOAD: 'LOAD',
+        BuildPhase.PRE_TARGET_GENERATE: 'GN',
+        BuildPhase.TARGET_GENERATE: 'GN',
+        BuildPhase.POST_TARGET_GENERATE: 'GN',
+        BuildPhase.PRE_TARGET_COMPILATION: 'NINJA',
+        BuildPhase.TARGET_COMPILATION: 'NINJA',
+        BuildPhase.POST_TARGET_COMPILATION: 'POSTBUILD',
+        BuildPhase.POST_BUILD: 'POSTBUILD',
+    }
+
     def __init__(self,
                  args_dict: dict,
                  args_resolver: ArgsResolverInterface,
@@ -48,6 +66,7 @@ class OHOSBuildModule(BuildModuleInterface):
                          loader, target_generator, target_compiler)
         OHOSBuildModule._instance = self
         self._start_time = SystemUtil.get_current_time()
+        self.resource_sampler = None
 
     @property
     def build_time(self):
@@ -61,9 +80,49 @@ class OHOSBuildModule(BuildModuleInterface):
             raise OHOSException(
                 'OHOSBuildModule has not been instantiated', '0000')
 
+    def start_resource_sampler(self):
+        sampler = ResourceSampler()
+        if sampler.start():
+            self.resource_sampler = sampler
+        return self.resource_sampler
+
+    def stop_resource_sampler(self):
+        '''Description: stop the resource sampler and write its samples and
+            the per phase summary to the out dir
+        '''
+        sampler = self.resource_sampler
+        if sampler is None:
+            return
+        self.resource_sampler = None
+        sampler.stop()
+        try:
+            out_path = Config().out_path
+            sampler.save(os.path.join(out_path, 'resource_samples.bin'))
+            summary = sampler.summary()
+            with open(os.path.join(out_path, 'resource_summary.txt'), 'w') as summary_file:
+                summary_file.write('\n'.join(summary) + '\n')
+        except (OSError, OHOSException) as exception:
+            LogUtil.hb_warning('failed to save resource samples: {}'.format(exception))
+            return
+        for line in summary:
+            LogUtil.hb_info(line, '[RESOURCE]')
+
+    def write_build_timeline(self):
+        if not BuildTimeline.is_enabled():
+            return
+        try:
+            out_path = Config().out_path
+            timeline_file = BuildTimeline.write(out_path, os.path.join(out_path, 'resource_samples.bin'))
+        except (OSError, ValueError, OHOSException) as exception:
+            LogUtil.hb_warning('failed to write build timeline: {}'.format(exception))
+            return
+        LogUtil.hb_info('build timeline: {}'.format(timeline_file))
+
     @throw_exception
     def run(self):
         monitor = Monitor()
+        if self.args_dict.get('build_timeline') and self.args_dict.get('build_timeline').arg_value:
+            BuildTimeline.enable()
         try:
             super().run()
         except OHOSException as exception:
@@ -72,6 +131,9 @@ class OHOSBuildModule(BuildModuleInterface):
         else:
             LogUtil.hb_info('{} build success'.format(
                 self.args_dict.get('product_name').arg_value))
+        finally:
+            self.stop_resource_sampler()
+            self.write_build_timeline()
 
     def _prebuild(self):
         self._run_phase(BuildPhase.PRE_BUILD)
@@ -85,7 +147,8 @@ class OHOSBuildModule(BuildModuleInterface):
         self._run_phase(BuildPhase.PRE_LOAD)
         if self.args_dict.get('fast_rebuild', None) and not self.args_dict.get('fast_rebuild').arg_value:
             LogUtil.set_stage("[PRELOAD]")
-            self.preloader.run()
+            with BuildTimeline.span('preloader'):
+                self.preloader.run()
             LogUtil.clear_stage()
 
     @build_tracker(
@@ -97,7 +160,8 @@ class OHOSBuildModule(BuildModuleInterface):
         self._run_phase(BuildPhase.LOAD)
         if self.args_dict.get('fast_rebuild', None) and not self.args_dict.get('fast_rebuild').arg_value:
             LogUtil.set_stage("[LOAD]")
-            self.loader.run()
+            with BuildTimeline.span('loader'):
+                self.loader.run()
             LogUtil.clear_stage()
 
     def _pre_target_generate(self):
@@ -112,7 +176,8 @@ class OHOSBuildModule(BuildModuleInterface):
         self._run_phase(BuildPhase.TARGET_GENERATE)
         if not self.args_dict.get("build_only_load").arg_value and not self.args_dict.get("fast_rebuild").arg_value:
             LogUtil.set_stage("[GN]")
-            self.target_generator.run()
+            with BuildTimeline.span('gn gen'):
+                self.target_generator.run()
             LogUtil.clear_stage()
 
     def _post_target_generate(self):
@@ -130,7 +195,8 @@ class OHOSBuildModule(BuildModuleInterface):
         self._run_phase(BuildPhase.TARGET_COMPILATION)
         if not self.args_dict.get("build_only_load").arg_value and not self.args_dict.get("build_only_gn").arg_value:
             LogUtil.set_stage("[NINJA]")
-            self.target_compiler.run()
+            with BuildTimeline.span('ninja'):
+                self.target_compiler.run()
             LogUtil.clear_stage()
 
     @build_tracker(
@@ -150,5 +216,8 @@ class OHOSBuildModule(BuildModuleInterface):
         @parameter: [phase]:  Build phase corresponding to parameter
         @return :none
         '''
+        if self.resource_sampler is not None and phase in self.SAMPLER_PHASES:
+            self.resource_sampler.set_phase(self.SAMPLER_PHASES[phase])
         for phase_arg in [arg for arg in self.args_dict.values()if arg.arg_phase == phase]:
-            self.args_resolver.resolve_arg(phase_arg, self)
+            with BuildTimeline.span(phase_arg.arg_name, 'args'):
+                self.args_resolver.resolve_arg(phase_arg, self)
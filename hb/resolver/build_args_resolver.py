@@ -42,6 +42,7 @@ from util.component_util import ComponentUtil
 from util.product_util import ProductUtil
 from util.prebuild.patch_process import Patch
 from util.post_build.part_rom_statistics import output_part_rom_status
+from util.build_timeline import GN_TRACE_FILE
 
 
 def rename_file(source_file, target_file):
@@ -431,6 +432,13 @@ class BuildArgsResolver(ArgsResolverInterface):
                 pycache_dir = os.environ.get('HOME')
             pycache_dir = os.path.join(pycache_dir, '.pycache')
             os.environ['PYCACHE_DIR'] = pycache_dir
+            # every cached action appends its hit/miss to the stats file,
+            # summarized by --stat-pycache at the end of the build
+            pycache_stats_file = os.path.join(config.out_path, 'pycache_stats.log')
+            os.makedirs(config.out_path, exist_ok=True)
+            with open(pycache_stats_file, 'w'):
+                pass
+            os.environ['PYCACHE_STATS_FILE'] = pycache_stats_file
             pyd_start_cmd = [
                 'python3',
                 '{}/build/scripts/util/pyd.py'.format(config.root_path),
@@ -879,6 +887,49 @@ class BuildArgsResolver(ArgsResolverInterface):
             if os.path.isfile(logfile):
                 SystemUtil.exec_command(cmd, log_path=config.log_path, log_stage="[POSTBUILD]")
 
+    @staticmethod
+    def resolve_resource_sampling(target_arg: Arg, build_module: BuildModuleInterface):
+        """resolve '--resource-sampling' arg
+        :param target_arg: arg object which is used to get arg value.
+        :param build_module [maybe unused]: build module object which is used to get other services.
+        :phase: prebuild.
+        """
+        if target_arg.arg_value and hasattr(build_module, 'start_resource_sampler'):
+            sampler = build_module.start_resource_sampler()
+            if sampler is not None:
+                sampler.set_phase('PREBUILD')
+
+    @staticmethod
+    def resolve_build_timeline(target_arg: Arg, build_module: BuildModuleInterface):
+        """resolve '--build-timeline' arg
+        :param target_arg: arg object which is used to get arg value.
+        :param build_module [maybe unused]: build module object which is used to get other services.
+        :phase: prebuild.
+        """
+        if target_arg.arg_value:
+            # the timeline itself is enabled by the build module before the first phase
+            build_module.target_generator.regist_flag(
+                '--tracelog', '{}/{}'.format(Config().out_path, GN_TRACE_FILE))
+
+    @staticmethod
+    def resolve_stat_pycache(target_arg: Arg, build_module: BuildModuleInterface):
+        """resolve "--stat-pycache' arg
+        :param target_arg: arg object which is used to get arg value.
+        :param build_module [maybe unused]: build module object which is used to get other services.
+        :phase: postTargetCompilation
+        """
+        if target_arg.arg_value:
+            config = Config()
+            pycache_stats_file = os.environ.get('PYCACHE_STATS_FILE')
+            if not os.environ.get('PYCACHE_DIR') or not pycache_stats_file:
+                return
+            cmd = [
+                'python3', '{}/build/scripts/util/pyd.py'.format(config.root_path),
+                '--stat', '--stats-file', pycache_stats_file
+            ]
+            if os.path.isfile(pycache_stats_file):
+                SystemUtil.exec_command(cmd, log_path=config.log_path, log_stage="[POSTBUILD]")
+
     @staticmethod
     def resolve_get_warning_list(target_arg: Arg, build_module: BuildModuleInterface):
         """resolve "--get-warning-list' arg
@@ -922,7 +973,18 @@ class BuildArgsResolver(ArgsResolverInterface):
                 str(unixtime),
                 "--duration-file",
                 "{}/sorted_action_duration.txt".format(config.out_path),
+                "--report-file",
+                "{}/build_analysis.txt".format(config.out_path),
+                "--parts-path-info",
+                "{}/build_configs/parts_info/parts_path_info.json".format(config.out_path),
+                "--part-subsystem-info",
+                "{}/build_configs/parts_info/part_subsystem.json".format(config.out_path),
             ]
+            sampler = getattr(build_module, 'resource_sampler', None)
+            if sampler is not None:
+                sample_file = os.path.join(config.out_path, 'resource_samples.bin')
+                sampler.save(sample_file)
+                cmd.extend(['--resource-samples', sample_file])
             SystemUtil.exec_command(cmd, log_path=config.log_path, log_stage="[POSTBUILD]")
 
     @staticmethod
@@ -994,6 +1056,16 @@ class BuildArgsResolver(ArgsResolverInterface):
         loader = build_module.loader
         loader.regist_arg("enable_scan_optimization", target_arg.arg_value)
 
+    @staticmethod
+    def resolve_parallel_load(target_arg: Arg, build_module: BuildModuleInterface):
+        """resolve '--parallel-load' arg
+        :param target_arg: arg object which is used to get arg value.
+        :param build_module [maybe unused]: build module object which is used to get other services.
+        :phase: load.
+        """
+        loader = build_module.loader
+        loader.regist_arg("parallel_load", target_arg.arg_value)
+
     @staticmethod
     def resolve_clean_args(target_arg: Arg, build_module: BuildModuleInterface):
         """resolve '--clean-args' arg
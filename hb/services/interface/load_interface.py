@@ -49,6 +49,9 @@ class LoadInterface(ServiceInterface):
     def run(self):
         self.__post_init__()
         self._execute_loader_args_display()
+        if self._load_cache_hit():
+            self._display_write_stats()
+            return
         self._check_parts_config_info()
         self._generate_subsystem_configs()
         self._generate_target_platform_parts()
@@ -67,11 +70,25 @@ class LoadInterface(ServiceInterface):
         self._check_product_part_feature()
         self._generate_syscap_files()
         self._cropping_components()
+        self._save_load_cache()
+        self._display_write_stats()
 
     @abstractmethod
     def _execute_loader_args_display(self):
         pass
 
+    @abstractmethod
+    def _load_cache_hit(self):
+        pass
+
+    @abstractmethod
+    def _save_load_cache(self):
+        pass
+
+    @abstractmethod
+    def _display_write_stats(self):
+        pass
+
     @abstractmethod
     def _check_parts_config_info(self):
         pass
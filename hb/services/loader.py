@@ -28,8 +28,11 @@ from util.loader import generate_targets_gn  # noqa: E402
 from util.loader import load_ohos_build  # noqa: E402
 from util.loader import subsystem_scan  # noqa: E402
 from util.loader import subsystem_info  # noqa: E402
-from scripts.util.file_utils import read_json_file, write_json_file, write_file  # noqa: E402, E501
+from util.loader import load_cache  # noqa: E402
+from scripts.util.file_utils import read_json_file, write_json_file, write_file, \
+    write_file_if_changed, get_write_stats  # noqa: E402, E501
 from util.log_util import LogUtil
+from util.build_timeline import BuildTimeline
 from resources.config import Config
 
 
@@ -60,7 +63,13 @@ class OHOSLoader(LoadInterface):
         self._subsystem_info = ""
         self.skip_partlist_check = ""
         self.enable_scan_optimization = ""
+        self.parallel_load = ""
+        self.load_cache_file = ""
+        self.parts_load_cache_file = ""
+        self._load_fingerprint = ""
+        self._is_load_cache_hit = False
 
+    @BuildTimeline.traced('loader init', category='load')
     def __post_init__(self):
         self.source_root_dir = self.config.root_path + '/'
         self.gn_root_out_dir = self.config.out_path if not self.config.out_path.startswith(
@@ -89,6 +98,10 @@ class OHOSLoader(LoadInterface):
             self.config_output_dir, 'auto_install_parts.json')
         self.components_file = os.path.join(
             self.config_output_dir, 'parts_info', 'components.json')
+        self.load_cache_file = os.path.join(
+            self.config.root_path, 'out/preloader', self.config.product, 'load_cache.json')
+        self.parts_load_cache_file = os.path.join(
+            self.config.root_path, 'out/preloader', self.config.product, 'parts_load_cache.json')
 
         compile_standard_allow_file = os.path.join(
             self.config.root_path, 'out/preloader', self.config.product, 'compile_standard_whitelist.json')
@@ -108,6 +121,7 @@ class OHOSLoader(LoadInterface):
         self.load_test_config = self.args_dict.get('load_test_config')
         self.skip_partlist_check = self.args_dict.get('skip_partlist_check')
         self.enable_scan_optimization = self.args_dict.get('enable_scan_optimization')
+        self.parallel_load = self.args_dict.get('parallel_load')
 
         self._subsystem_info = subsystem_info.get_subsystem_info(
             self.subsystem_config_file,
@@ -117,6 +131,11 @@ class OHOSLoader(LoadInterface):
             self.enable_scan_optimization)
         overrided_components = self._override_components()
 
+        self._load_fingerprint = self._get_load_fingerprint(compile_standard_allow_file)
+        self._is_load_cache_hit = self._check_load_cache()
+        if self._is_load_cache_hit:
+            return
+
         self._platforms_info = platforms_loader.get_platforms_info(
             self.platforms_config_file,
             self.source_root_dir,
@@ -141,7 +160,9 @@ class OHOSLoader(LoadInterface):
             overrided_components,
             bundle_subsystem_allow_list,
             self.skip_partlist_check,
-            self.build_xts)
+            self.build_xts,
+            self.parallel_load,
+            self.parts_load_cache_file)
         self.parts_targets = self.parts_config_info.get('parts_targets')
         self.phony_targets = self.parts_config_info.get('phony_target')
         self.parts_info = self.parts_config_info.get('parts_info')
@@ -166,6 +187,7 @@ class OHOSLoader(LoadInterface):
 
 
     @throw_exception
+    @BuildTimeline.traced(category='load')
     def _cropping_components(self):
         src_parts = read_json_file(self.parts_src_file)
 
@@ -191,10 +213,101 @@ class OHOSLoader(LoadInterface):
                     and component not in add_parts:
                 del new_components_data[component]
         self._merge_components_info(new_components_data)
-        os.remove(self.components_file)
-        write_json_file(self.components_file, new_components_data)
+        write_json_file(self.components_file, new_components_data, check_changes=True)
         
 
+# load cache method
+
+    '''Description: fingerprint all inputs of the load phase: preloader outputs, product \
+        and subsystem configs, all scanned bundle.json/ohos.build files and the build args.
+    @parameter: compile_standard_allow_file
+    @return : fingerprint
+    '''
+
+    def _get_load_fingerprint(self, compile_standard_allow_file: str) -> str:
+        preloader_dir = os.path.dirname(self.platforms_config_file)
+        input_files = [os.path.join(preloader_dir, _name) for _name in sorted(os.listdir(preloader_dir))
+                       if _name.endswith(('.json', '.build')) and _name not in self._load_cache_file_names()
+                       and not _name.startswith('subsystem_scan')]
+        input_files.extend([
+            self.subsystem_config_file,
+            self.example_subsystem_file,
+            compile_standard_allow_file,
+            os.path.join(self.config.product_path, 'subsystem_config_overlay.json'),
+            self.config.config_json,
+            os.path.join(self.source_root_dir, 'out/products_ext/components.json'),
+            os.path.join(self.source_root_dir, 'out/products_ext/third_party_allow_list.json'),
+            os.path.join(self.source_root_dir, 'build/third_party_allow_list.json'),
+            os.path.join(self.source_root_dir, 'out/products_ext/auto_install_whitelist.json'),
+            os.path.join(self.source_root_dir, 'build/auto_install_whitelist.json'),
+            os.path.join(self.source_root_dir, 'out/products_ext/component_feature_whitelist.json'),
+            os.path.join(self.source_root_dir, 'build/component_feature_whitelist.json'),
+            os.path.join(self.source_root_dir, 'component_dist/{}-{}/packages_to_install'.format(
+                self.target_os, self.target_cpu), 'dist_parts_info.json')])
+        for _info in self._subsystem_info.values():
+            input_files.extend(_info.get('build_files', []))
+        args = [self.source_root_dir, self.gn_root_out_dir, self.os_level,
+                self.target_cpu, self.target_os, self.config.compile_mode,
+                self.config.product, self.build_example, self.scalable_build,
+                self.build_platform_name, self.build_xts, self.ignore_api_check,
+                self.load_test_config, self.skip_partlist_check, self._subsystem_info]
+        return load_cache.content_digest([args, load_cache.files_digest(input_files)])
+
+    def _load_cache_file_names(self) -> list:
+        return [os.path.basename(self.load_cache_file), os.path.basename(self.parts_load_cache_file)]
+
+    '''Description: key outputs of the load phase, a load cache hit requires that they \
+        were not modified or removed since the last complete load.
+    @parameter: none
+    @return : output files
+    '''
+
+    def _get_load_outputs(self) -> list:
+        outputs = [os.path.join(self.config_output_dir, _name) for _name in (
+            'target_platforms_parts.json',
+            'platforms_parts_by_src.json',
+            'required_parts_targets.json',
+            'required_parts_targets_list.json',
+            'parts_src_flag.json',
+            'auto_install_parts.json',
+            'platforms_list.gni',
+            'parts_different_info.json',
+            'infos_for_testfwk.json',
+            'parts_info/components.json',
+            'parts_info/parts_info.json',
+            'parts_info/part_subsystem.gni',
+            'parts_list.gni',
+            'phony_targets/BUILD.gn')]
+        outputs.append(os.path.join(os.path.dirname(self.platforms_config_file),
+                                    'system/etc/param/syscap.para'))
+        return outputs
+
+    def _check_load_cache(self) -> bool:
+        cache_data = load_cache.read_cache(self.load_cache_file)
+        if cache_data.get('fingerprint') != self._load_fingerprint \
+                or not load_cache.outputs_unchanged(cache_data.get('outputs')):
+            # outputs are about to be regenerated, an interrupted load must not hit
+            load_cache.remove_cache(self.load_cache_file)
+            return False
+        LogUtil.hb_info("load inputs are unchanged, reuse outputs in '{}'".format(
+            self.config_output_dir))
+        return True
+
+    @BuildTimeline.traced(category='load')
+    def _save_load_cache(self):
+        load_cache.write_cache(self.load_cache_file, {
+            'fingerprint': self._load_fingerprint,
+            'outputs': load_cache.output_mtimes(self._get_load_outputs())
+        })
+
+    def _load_cache_hit(self) -> bool:
+        return self._is_load_cache_hit
+
+    def _display_write_stats(self):
+        write_stats = get_write_stats()
+        LogUtil.hb_info('preload and load outputs: {} files written, {} files unchanged'.format(
+            write_stats.get('written'), write_stats.get('unchanged')))
+
 # check method
 
     '''Description: Check the parameters passed in config. If the parameters are not 
@@ -233,6 +346,7 @@ class OHOSLoader(LoadInterface):
                                 the corresponding file ('build/subsystem_config_example.json') exists.", "2005")
 
     @throw_exception
+    @BuildTimeline.traced(category='load')
     def _check_product_part_feature(self):
         LogUtil.hb_info("Checking all product features...")
         product_preloader_dir = os.path.dirname(self.platforms_config_file)
@@ -272,6 +386,7 @@ class OHOSLoader(LoadInterface):
                             key, _f_name), "2006")
 
     @throw_exception
+    @BuildTimeline.traced(category='load')
     def _check_parts_config_info(self):
         LogUtil.hb_info("Checking parts config...")
         if not ('parts_info' in self.parts_config_info
@@ -293,6 +408,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
     @throw_exception
+    @BuildTimeline.traced(category='load')
     def _generate_syscap_files(self):
         pre_syscap_info_path = os.path.dirname(self.platforms_config_file)
         system_path = os.path.join(self.source_root_dir, os.path.join(
@@ -378,7 +494,7 @@ class OHOSLoader(LoadInterface):
             os.mkdir(system_etc_path)
         syscap_info_json = os.path.join(
             system_etc_path, "SystemCapability.json")
-        write_json_file(syscap_info_json, syscap_info_dict)
+        write_json_file(syscap_info_json, syscap_info_dict, check_changes=True)
         LogUtil.hb_info(
             "generate syscap info file to '{}'".format(syscap_info_json), mode=self.config.log_mode)
         target_syscap_with_part_name_list.sort(
@@ -386,17 +502,16 @@ class OHOSLoader(LoadInterface):
         syscap_info_with_part_name_file = os.path.join(
             system_etc_path, "syscap.json")
         write_json_file(syscap_info_with_part_name_file, {
-            'components': target_syscap_with_part_name_list})
+            'components': target_syscap_with_part_name_list},
+            check_changes=True)
         LogUtil.hb_info("generate syscap info with part name list to '{}'".format(
             syscap_info_with_part_name_file), mode=self.config.log_mode)
         if not os.path.exists(os.path.join(system_etc_path, "param/")):
             os.mkdir(os.path.join(system_etc_path, "param/"))
         target_syscap_for_init_file = os.path.join(
             system_etc_path, "param/syscap.para")
-        with os.fdopen(os.open(target_syscap_for_init_file,
-                                os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 
-                                stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH), 'w') as file:
-            file.writelines(sorted(target_syscap_for_init_list))
+        write_file_if_changed(target_syscap_for_init_file, ''.join(sorted(target_syscap_for_init_list)),
+                              stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
         LogUtil.hb_info("generate target syscap for init list to '{}'".format(
             target_syscap_for_init_file), mode=self.config.log_mode)
 
@@ -420,6 +535,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_infos_for_testfwk(self):
         infos_for_testfwk_file = os.path.join(self.config_output_dir,
                                               "infos_for_testfwk.json")
@@ -443,6 +559,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_target_platform_parts(self):
         target_platform_parts_file = os.path.join(self.config_output_dir,
                                                   "target_platforms_parts.json")
@@ -458,6 +575,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_part_different_info(self):
         parts_different_info = self._get_parts_by_platform()
         parts_different_info_file = os.path.join(self.config_output_dir,
@@ -474,6 +592,7 @@ class OHOSLoader(LoadInterface):
     @return: none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_platforms_list(self):
         platforms_list_gni_file = os.path.join(self.config_output_dir,
                                                "platforms_list.gni")
@@ -483,7 +602,7 @@ class OHOSLoader(LoadInterface):
         if 'phone' not in self.build_platforms:
             _gni_file_content.append('  "phone"')
         _gni_file_content.append(']')
-        write_file(platforms_list_gni_file, '\n'.join(_gni_file_content))
+        write_file(platforms_list_gni_file, '\n'.join(_gni_file_content), check_changes=True)
         LogUtil.hb_info("generate platforms list to '{}'".format(
             platforms_list_gni_file), mode=self.config.log_mode)
 
@@ -493,12 +612,13 @@ class OHOSLoader(LoadInterface):
     @return: none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_auto_install_part(self):
         parts_path_info = self.parts_config_info.get("parts_path_info")
         auto_install_part_list = []
         auto_install_list_file = os.path.join(
             self.config_output_dir, "auto_install_parts.json")
-        write_json_file(auto_install_list_file, auto_install_part_list)
+        write_json_file(auto_install_list_file, auto_install_part_list, check_changes=True)
         LogUtil.hb_info("generate auto install part to '{}'".format(
             auto_install_list_file), mode=self.config.log_mode)
 
@@ -508,6 +628,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_src_flag(self):
         parts_src_flag_file = os.path.join(self.config_output_dir,
                                            "parts_src_flag.json")
@@ -524,11 +645,13 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_required_parts_targets_list(self):
         build_targets_list_file = os.path.join(self.config_output_dir,
                                                "required_parts_targets_list.json")
         write_json_file(build_targets_list_file,
-                        list(self.required_parts_targets.values()))
+                        list(self.required_parts_targets.values()),
+                        check_changes=True)
         LogUtil.hb_info("generate build targets list file to '{}'".format(
             build_targets_list_file), mode=self.config.log_mode)
 
@@ -538,10 +661,11 @@ class OHOSLoader(LoadInterface):
     @return: none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_required_parts_targets(self):
         build_targets_info_file = os.path.join(self.config_output_dir,
                                                "required_parts_targets.json")
-        write_json_file(build_targets_info_file, self.required_parts_targets)
+        write_json_file(build_targets_info_file, self.required_parts_targets, check_changes=True)
         LogUtil.hb_info("generate required parts targets to '{}'".format(
             build_targets_info_file), mode=self.config.log_mode)
 
@@ -551,6 +675,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_platforms_part_by_src(self):
         platforms_parts_by_src = self._get_platforms_parts()
         platforms_parts_by_src_file = os.path.join(self.source_root_dir,
@@ -572,6 +697,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_target_gn(self):
         generate_targets_gn.gen_targets_gn(self.required_parts_targets,
                                            self.config_output_dir)
@@ -582,6 +708,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_phony_targets_build_file(self):
         generate_targets_gn.gen_phony_targets(self.required_phony_targets,
                                               self.config_output_dir)
@@ -593,6 +720,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_stub_targets(self):
         generate_targets_gn.gen_stub_targets(
             self.parts_config_info.get('parts_kits_info'),
@@ -605,6 +733,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_system_capabilities(self):
         for platform in self.build_platforms:
             platform_parts = self.target_platform_parts.get(platform)
@@ -636,6 +765,7 @@ class OHOSLoader(LoadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='load')
     def _generate_subsystem_configs(self):
 
         # The function has been implemented in module util/loader/subsystem_info.py
@@ -898,6 +1028,7 @@ class OHOSLoader(LoadInterface):
         args.append('scalable_build={}'.format(self.scalable_build))
         args.append('skip_partlist_check={}'.format(self.skip_partlist_check))
         args.append('enable_scan_optimization={}'.format(self.enable_scan_optimization))
+        args.append('parallel_load={}'.format(self.parallel_load))
         LogUtil.write_log(self.config.log_path,
                           'loader args:{}'.format(args), 'info')
 
@@ -952,13 +1083,14 @@ class OHOSLoader(LoadInterface):
 
                 if overrided:
                     # Update parts.json and parts_config.json generated by preloader
-                    write_json_file(parts_file, {"parts": all_parts})
+                    write_json_file(parts_file, {"parts": all_parts}, check_changes=True)
                     parts_file = self.platforms_config_file.replace(
                         "platforms.build", "parts_config.json")
                     self._output_parts_config_json(all_parts, parts_file)
                     all_component_override_map.update(component_override_map)
         write_json_file(
-            f"{self.config_output_dir}/component_override_map.json", all_component_override_map)
+            f"{self.config_output_dir}/component_override_map.json", all_component_override_map,
+            check_changes=True)
         return overrided_components
 
     def _override_one_component(self, subsystem_info: dict, component: dict, build_file: str, all_parts: dict, overrided_components: dict, component_override_map: dict):
@@ -1028,4 +1160,4 @@ class OHOSLoader(LoadInterface):
             part = part.replace(".", "_")
             part = part.replace("/", "_")
             parts_config[part] = True
-        write_json_file(output_file, parts_config)
+        write_json_file(output_file, parts_config, check_changes=True)
@@ -23,6 +23,8 @@ from util.io_util import IoUtil
 from util.preloader.preloader_process_data import Dirs, Outputs, Product
 from util.preloader.parse_lite_subsystems_config import parse_lite_subsystem_config
 from util.log_util import LogUtil
+from util.build_timeline import BuildTimeline
+from scripts.util.file_utils import write_file_if_changed
 
 
 class OHOSPreloader(PreloadInterface):
@@ -43,6 +45,7 @@ class OHOSPreloader(PreloadInterface):
         self._compile_env_allowlist_info = {}
         self._hvigor_compile_whitelist_info = {}
 
+    @BuildTimeline.traced('preloader init', category='preload')
     def __post_init__(self):
         self._dirs = Dirs(self._config)
         self._outputs = Outputs(self._dirs.preloader_output_dir)
@@ -65,6 +68,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_platforms_build(self):
         config = {
             'target_os': self._target_os,
@@ -74,7 +78,7 @@ class OHOSPreloader(PreloadInterface):
                                             self._dirs.preloader_output_dir)
         }
         platform_config = {'version': 2, 'platforms': {'phone': config}}
-        IoUtil.dump_json_file(self._outputs.platforms_build, platform_config)
+        IoUtil.dump_json_file(self._outputs.platforms_build, platform_config, check_changes=True)
         LogUtil.hb_info(
             'generated platforms build info to {}/platforms.build'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -84,6 +88,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_build_gnargs_prop(self):
         all_features = {}
         for _part_name, vals in self._all_parts.items():
@@ -102,11 +107,8 @@ class OHOSPreloader(PreloadInterface):
             else:
                 raise Exception("part feature '{key}:{val}' type not support.")
             attr_list.append(_item)
-        with os.fdopen(os.open(self._outputs.build_gnargs_prop,
-                                os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 
-                                stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH),
-                        'w') as fobj:
-            fobj.write('\n'.join(attr_list))
+        write_file_if_changed(self._outputs.build_gnargs_prop, '\n'.join(attr_list),
+                              stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
         LogUtil.hb_info(
             'generated build gnargs prop info to {}/build_gnargs.prop'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -116,6 +118,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_features_json(self):
         all_features = {}
         part_feature_map = {}
@@ -130,7 +133,7 @@ class OHOSPreloader(PreloadInterface):
             "features": all_features,
             "part_to_feature": part_feature_map
         }
-        IoUtil.dump_json_file(self._outputs.features_json, parts_feature_info)
+        IoUtil.dump_json_file(self._outputs.features_json, parts_feature_info, check_changes=True)
         LogUtil.hb_info(
             'generated features info to {}/features.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -140,6 +143,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_syscap_json(self):
         all_syscap = {}
         part_syscap_map = {}
@@ -152,7 +156,7 @@ class OHOSPreloader(PreloadInterface):
             "syscap": all_syscap,
             "part_to_syscap": part_syscap_map
         }
-        IoUtil.dump_json_file(self._outputs.syscap_json, parts_syscap_info)
+        IoUtil.dump_json_file(self._outputs.syscap_json, parts_syscap_info, check_changes=True)
         LogUtil.hb_info(
             'generated syscap info to {}/syscap.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -162,6 +166,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_exclusion_modules_json(self):
         exclusions = {}
         for _part_name, vals in self._all_parts.items():
@@ -170,11 +175,12 @@ class OHOSPreloader(PreloadInterface):
                 pair = dict()
                 pair[_part_name] = _exclusions
                 exclusions.update(pair)
-        IoUtil.dump_json_file(self._outputs.exclusion_modules_json, exclusions)
+        IoUtil.dump_json_file(self._outputs.exclusion_modules_json, exclusions, check_changes=True)
         LogUtil.hb_info(
             'generated exclusion modules info to {}/exclusion_modules.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
 
+    @BuildTimeline.traced(category='preload')
     def _generate_dependency_pruning_json(self):
         dependency_pruning = {}
         for _part_name, vals in self._all_parts.items():
@@ -182,7 +188,8 @@ class OHOSPreloader(PreloadInterface):
             if _prune_deps:
                 dependency_pruning[_part_name] = _prune_deps
         IoUtil.dump_json_file(
-            self._outputs.dependency_pruning_json, dependency_pruning)
+            self._outputs.dependency_pruning_json, dependency_pruning,
+            check_changes=True)
         LogUtil.hb_info(
             'generated dependency pruning info to {}/dependency_pruning.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -192,9 +199,11 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_build_config_json(self):
         IoUtil.dump_json_file(
-            self._outputs.build_config_json, self._build_vars)
+            self._outputs.build_config_json, self._build_vars,
+            check_changes=True)
         LogUtil.hb_info(
             'generated build config info to {}/build_config.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -204,15 +213,13 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_build_prop(self):
         build_vars_list = []
         for key, value in self._build_vars.items():
             build_vars_list.append('{}={}'.format(key, value))
-        with os.fdopen(os.open(self._outputs.build_prop,
-                                os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 
-                                stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH),
-                        'w') as fobj:
-            fobj.write('\n'.join(build_vars_list))
+        write_file_if_changed(self._outputs.build_prop, '\n'.join(build_vars_list),
+                              stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
         LogUtil.hb_info(
             'generated build prop info to {}/build.prop'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -222,9 +229,10 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_parts_json(self):
         parts_info = {"parts": sorted(list(self._all_parts.keys()))}
-        IoUtil.dump_json_file(self._outputs.parts_json, parts_info)
+        IoUtil.dump_json_file(self._outputs.parts_json, parts_info, check_changes=True)
         LogUtil.hb_info(
             'generated product parts info to {}/parts.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -234,6 +242,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_parts_config_json(self):
         parts_config = {}
         for part in self._all_parts:
@@ -242,7 +251,7 @@ class OHOSPreloader(PreloadInterface):
             part = part.replace(".", "_")
             part = part.replace("/", "_")
             parts_config[part] = True
-        IoUtil.dump_json_file(self._outputs.parts_config_json, parts_config)
+        IoUtil.dump_json_file(self._outputs.parts_config_json, parts_config, check_changes=True)
         LogUtil.hb_info(
             'generated parts config info to {}/parts_config.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -252,6 +261,7 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_subsystem_config_json(self):
         if self._subsystem_info:
             self._subsystem_info.update(
@@ -259,7 +269,8 @@ class OHOSPreloader(PreloadInterface):
             self._subsystem_info.update(
                 self._product._get_device_specific_subsystem())
         IoUtil.dump_json_file(
-            self._outputs.subsystem_config_json, self._subsystem_info)
+            self._outputs.subsystem_config_json, self._subsystem_info,
+            check_changes=True)
         LogUtil.hb_info(
             'generated subsystem config info to {}/subsystem_config.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -269,9 +280,11 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_systemcapability_json(self):
         IoUtil.dump_json_file(
-            self._outputs.systemcapability_json, self._product._syscap_info)
+            self._outputs.systemcapability_json, self._product._syscap_info,
+            check_changes=True)
         LogUtil.hb_info(
             'generated system capability info to {}/systemcapability.json'.format(
                 self._dirs.preloader_output_dir), mode=self.config.log_mode)
@@ -281,16 +294,20 @@ class OHOSPreloader(PreloadInterface):
     @return :none
     '''
 
+    @BuildTimeline.traced(category='preload')
     def _generate_compile_standard_whitelist_json(self):
         IoUtil.dump_json_file(
-            self._outputs.compile_standard_whitelist_json, self._compile_standard_whitelist_info)
+            self._outputs.compile_standard_whitelist_json, self._compile_standard_whitelist_info,
+            check_changes=True)
         LogUtil.hb_info(
             'generated compile_standard_whitelist info to {}/compile_standard_whitelist.json'
             .format(self._dirs.preloader_output_dir), mode=self.config.log_mode)
 
+    @BuildTimeline.traced(category='preload')
     def _generate_compile_env_allowlist_json(self):
         IoUtil.dump_json_file(
-            self._outputs.compile_env_allowlist_json, self._compile_env_allowlist_info
+            self._outputs.compile_env_allowlist_json, self._compile_env_allowlist_info,
+            check_changes=True
         )
         LogUtil.hb_info(
             "generated compile_env_allowlist info to {}/compile_env_allowlist.json".format(
@@ -298,9 +315,11 @@ class OHOSPreloader(PreloadInterface):
             )
         )
 
+    @BuildTimeline.traced(category='preload')
     def _generate_hvigor_compile_whitelist_json(self):
         IoUtil.dump_json_file(
-            self._outputs.hvigor_compile_whitelist_json, self._hvigor_compile_whitelist_info
+            self._outputs.hvigor_compile_whitelist_json, self._hvigor_compile_whitelist_info,
+            check_changes=True
         )
         LogUtil.hb_info(
             "generated hvigor_compile_whitelist info to {}/hvigor_compile_hap_whitelist.json".format(
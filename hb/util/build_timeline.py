@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""One chrome trace of the whole build.
+
+While the build runs, hb records spans of its build phases, the resolvers of
+the build args, the preloader and loader steps, gn gen and ninja. At the end
+of the build they are merged with the gn tracelog, the edges of the ninja log
+and the resource samples into build_timeline.json.gz in the out dir, which
+chrome://tracing and ui.perfetto.dev open. Nothing is recorded unless the
+timeline was enabled.
+"""
+
+import os
+import json
+import gzip
+import time
+import functools
+import threading
+import contextlib
+
+from scripts.ninja2trace import NinjaToTrace, CountingTheTid, RESOURCE_COUNTERS
+from scripts.util.resource_samples import read_samples
+
+BUILD_TIMELINE_FILE = 'build_timeline.json.gz'
+GN_TRACE_FILE = 'gn_trace.log'
+
+HB_PID = 1
+GN_PID = 2
+NINJA_PID = 3
+RESOURCES_PID = 4
+PROCESS_NAMES = {HB_PID: 'hb', GN_PID: 'gn gen', NINJA_PID: 'ninja', RESOURCES_PID: 'resources'}
+
+
+class BuildTimeline():
+
+    _enabled = False
+    _start_time = None
+    # (name, category, start, end, thread ident), times from time.time()
+    _spans = []
+
+    @classmethod
+    def enable(cls):
+        if not cls._enabled:
+            cls._enabled = True
+            cls._start_time = time.time()
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return cls._enabled
+
+    @classmethod
+    @contextlib.contextmanager
+    def span(cls, name: str, category: str = 'hb'):
+        if not cls._enabled:
+            yield
+            return
+        start = time.time()
+        try:
+            yield
+        finally:
+            cls._spans.append((name, category, start, time.time(), threading.get_ident()))
+
+    @classmethod
+    def traced(cls, name: str = None, category: str = 'hb'):
+        '''Description: decorator recording a span for every call of the function
+        '''
+        def decorator(func):
+            @functools.wraps(func)
+            def inner(*args, **kwargs):
+                if not cls._enabled:
+                    return func(*args, **kwargs)
+                with cls.span(name or func.__name__, category):
+                    return func(*args, **kwargs)
+            return inner
+        return decorator
+
+    @classmethod
+    def find_span(cls, name: str):
+        for span in reversed(cls._spans):
+            if span[0] == name:
+                return span
+        return None
+
+    @classmethod
+    def write(cls, out_path: str, sample_file: str = None) -> str:
+        '''Description: merge the recorded spans with the gn tracelog, the ninja log
+            and the resource samples and write the timeline to the out dir
+        @parameter: out_path: out dir of the build, sample_file: resource_samples.bin
+        @return: path of the timeline
+        '''
+        merge_start = time.time()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": name}}
+                  for pid, name in PROCESS_NAMES.items()]
+        events.extend(cls._hb_events())
+        gn_span = cls.find_span('gn gen')
+        if gn_span is not None:
+            events.extend(cls._gn_events(os.path.join(out_path, GN_TRACE_FILE), gn_span[2]))
+        ninja_span = cls.find_span('ninja')
+        if ninja_span is not None:
+            events.extend(cls._ninja_events(os.path.join(out_path, '.ninja_log'), ninja_span[2]))
+        if sample_file:
+            events.extend(cls._resource_events(sample_file))
+        # the cost of the timeline itself
+        events.append(cls._complete_event('merge build timeline', 'hb', merge_start, time.time(), HB_PID, 0))
+
+        timeline_file = os.path.join(out_path, BUILD_TIMELINE_FILE)
+        tmp_file = '{}.{}.tmp'.format(timeline_file, os.getpid())
+        with gzip.open(tmp_file, 'wt', compresslevel=6) as timeline_f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, timeline_f, separators=(',', ':'))
+        os.replace(tmp_file, timeline_file)
+        return timeline_file
+
+    @classmethod
+    def _us(cls, timestamp: float) -> int:
+        return int((timestamp - cls._start_time) * 1000000)
+
+    @classmethod
+    def _complete_event(cls, name: str, category: str, start: float, end: float, pid: int, tid: int) -> dict:
+        return {"name": name, "cat": category, "ph": "X", "ts": cls._us(start),
+                "dur": int((end - start) * 1000000), "pid": pid, "tid": tid}
+
+    @classmethod
+    def _hb_events(cls) -> list:
+        tids = {threading.main_thread().ident: 0}
+        events = []
+        for name, category, start, end, ident in cls._spans:
+            tid = tids.setdefault(ident, len(tids))
+            events.append(cls._complete_event(name, category, start, end, HB_PID, tid))
+        for ident, tid in tids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": HB_PID, "tid": tid,
+                           "args": {"name": 'main' if tid == 0 else 'thread {}'.format(ident)}})
+        return events
+
+    @classmethod
+    def _gn_events(cls, gn_trace_file: str, gn_start: float) -> list:
+        '''Description: events of the gn tracelog, moved to start with the gn gen span
+        '''
+        if not os.path.isfile(gn_trace_file) or os.path.getmtime(gn_trace_file) < gn_start:
+            return []
+        try:
+            with open(gn_trace_file, 'r') as trace_f:
+                trace = json.load(trace_f)
+        except (OSError, ValueError):
+            return []
+        gn_events = trace.get('traceEvents', []) if isinstance(trace, dict) else trace
+        timed_events = [event for event in gn_events if 'ts' in event and event.get('ph') != 'M']
+        if not timed_events:
+            return []
+        offset = cls._us(gn_start) - min(float(event['ts']) for event in timed_events)
+        events = []
+        for event in gn_events:
+            event = dict(event, pid=GN_PID)
+            if 'ts' in event:
+                event['ts'] = float(event['ts']) + offset
+            events.append(event)
+        return events
+
+    @classmethod
+    def _ninja_events(cls, ninja_log: str, ninja_start: float) -> list:
+        '''Description: edges of the ninja log run by this build, in the lanes of build.trace
+        '''
+        parser = NinjaToTrace()
+        if not os.path.isfile(ninja_log) or not parser.parse_file(ninja_log, '%f' % (ninja_start * 10**9)):
+            return []
+        start_us = cls._us(ninja_start)
+        counter = CountingTheTid()
+        events = []
+        for data_line in parser.datalist:
+            events.append({"name": ', '.join(data_line.target_obj_names), "cat": "targets", "ph": "X",
+                           "ts": start_us + data_line.start * 1000,
+                           "dur": (data_line.end - data_line.start) * 1000,
+                           "pid": NINJA_PID, "tid": counter.counting_the_new_tid(data_line)})
+        return events
+
+    @classmethod
+    def _resource_events(cls, sample_file: str) -> list:
+        if not os.path.isfile(sample_file):
+            return []
+        try:
+            columns, _ = read_samples(sample_file)
+        except (OSError, ValueError, KeyError):
+            return []
+        events = []
+        for index, sample_time in enumerate(columns.get('time', [])):
+            if sample_time < cls._start_time:
+                continue
+            for name, counter_columns in RESOURCE_COUNTERS:
+                events.append({"name": name, "cat": "resources", "ph": "C", "ts": cls._us(sample_time),
+                               "pid": RESOURCES_PID,
+                               "args": {column: round(columns[column][index], 1)
+                                        for column in counter_columns if column in columns}})
+        return events
@@ -24,6 +24,7 @@ import shutil
 
 from hb.helper.no_instance import NoInstance
 from exceptions.ohos_exception import OHOSException
+from scripts.util.file_utils import write_file_if_changed
 
 
 class IoUtil(metaclass=NoInstance):
@@ -41,7 +42,10 @@ class IoUtil(metaclass=NoInstance):
             raise e
 
     @staticmethod
-    def dump_json_file(dump_file: str, json_data: dict or list):
+    def dump_json_file(dump_file: str, json_data: dict or list, check_changes: bool = False):
+        if check_changes:
+            write_file_if_changed(dump_file, json.dumps(json_data, ensure_ascii=False, indent=2))
+            return
         with open(dump_file, 'wt', encoding='utf-8') as json_file:
             json.dump(json_data, json_file, ensure_ascii=False, indent=2)
 
@@ -88,7 +88,8 @@ def gen_targets_gn(parts_targets, config_output_dir):
     parts_list_gni_file = os.path.join(config_output_dir, 'parts_list.gni')
     parts_list_content = '"{}",'.format('",\n  "'.join(parts_list))
     write_file(parts_list_gni_file,
-               PARTS_LIST_GNI_TEMPLATE.format(parts_list_content))
+               PARTS_LIST_GNI_TEMPLATE.format(parts_list_content),
+               check_changes=True)
     LogUtil.hb_info(
         "generate part list gni file to '{}/parts_list.gni'".format(config_output_dir), mode=Config.log_mode)
 
@@ -99,7 +100,8 @@ def gen_targets_gn(parts_targets, config_output_dir):
     else:
         inner_kits_content = ''
     write_file(inner_kits_gni_file,
-               INNER_KITS_GNI_TEMPLATE.format(inner_kits_content))
+               INNER_KITS_GNI_TEMPLATE.format(inner_kits_content),
+               check_changes=True)
     LogUtil.hb_info(
         "generate inner kits gni file to '{}/inner_kits_list.gni'".format(
           config_output_dir), mode=Config.log_mode)
@@ -111,7 +113,8 @@ def gen_targets_gn(parts_targets, config_output_dir):
     else:
         system_kits_content = ''
     write_file(system_list_gni_file,
-               SYSTEM_KITS_GNI_TEMPLATE.format(system_kits_content))
+               SYSTEM_KITS_GNI_TEMPLATE.format(system_kits_content),
+               check_changes=True)
     LogUtil.hb_info(
         "generate system list gni file to '{}/system_kits_list.gni'".format(
           config_output_dir), mode=Config.log_mode)
@@ -128,7 +131,8 @@ def gen_targets_gn(parts_targets, config_output_dir):
         shutil.move(parts_test_filter_gni_file, parts_test_gni_file)
     else:
         write_file(parts_test_gni_file,
-                   PARTS_TEST_GNI_TEMPLATE.format(test_list_content))
+                   PARTS_TEST_GNI_TEMPLATE.format(test_list_content),
+                   check_changes=True)
     LogUtil.hb_info(
         "generate parts test gni file to '{}/parts_test_list.gni'".format(
           config_output_dir), mode=Config.log_mode)
@@ -158,7 +162,7 @@ def gen_phony_targets(variant_phony_targets, config_output_dir):
 
     phony_build_file = os.path.join(config_output_dir, 'phony_targets',
                                     'BUILD.gn')
-    write_file(phony_build_file, '\n'.join(phony_build_content))
+    write_file(phony_build_file, '\n'.join(phony_build_content), check_changes=True)
     LogUtil.hb_info(
         "generate phony target build file to '{}/phony_targets/BUILD.gn'".format(
           config_output_dir), mode=Config.log_mode)
@@ -219,7 +223,7 @@ def gen_stub_targets(parts_kits_info, platform_stubs, config_output_dir):
                 platform=platform,
                 combined_jar_deps=',\n'.join(stub_kit_targets),
                 sources_list_files=',\n'.join(dist_stub))
-            write_file(gn_file, gn_contents)
+            write_file(gn_file, gn_contents, check_changes=True)
             LogUtil.hb_info(
                 "generated platform stub to '{}/{}-stub/BUILD.gn'".format(
                   config_output_dir, platform), mode=Config.log_mode)
@@ -227,7 +231,7 @@ def gen_stub_targets(parts_kits_info, platform_stubs, config_output_dir):
         else:
             gni_contents.append('zframework_stub_exists = false')
 
-        write_file(gni_file, '\n'.join(gni_contents))
+        write_file(gni_file, '\n'.join(gni_contents), check_changes=True)
         LogUtil.hb_info(
             "generated platform zframework stub to '{}/subsystem_info/{}-stub/zframework_stub_exists.gni'".format(
                 config_output_dir, platform), mode=Config.log_mode)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Fingerprint helpers and cache files of the load phase.
+
+The loader keeps two caches in out/preloader/<product>:
+  load_cache.json        fingerprint of all load inputs and the mtimes of
+                         the key outputs of the last complete load.
+  parts_load_cache.json  per subsystem parsing results keyed by the content
+                         of its bundle.json/ohos.build files.
+"""
+
+import os
+import json
+import hashlib
+
+from util.log_util import LogUtil
+
+LOAD_CACHE_VERSION = 1
+
+# file digests of the current process, keyed by path, mtime and size
+_file_digests = {}
+
+
+def file_digest(file_path: str) -> str:
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return ''
+    stat_key = (file_stat.st_mtime_ns, file_stat.st_size)
+    cached = _file_digests.get(file_path)
+    if cached and cached[0] == stat_key:
+        return cached[1]
+    sha256_obj = hashlib.sha256()
+    try:
+        with open(file_path, 'rb') as file_obj:
+            for chunk in iter(lambda: file_obj.read(1024 * 1024), b''):
+                sha256_obj.update(chunk)
+    except OSError:
+        return ''
+    digest = sha256_obj.hexdigest()
+    _file_digests[file_path] = (stat_key, digest)
+    return digest
+
+
+def content_digest(content) -> str:
+    data = json.dumps([LOAD_CACHE_VERSION, content], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def files_digest(file_list: list) -> str:
+    return content_digest([[_file, file_digest(_file)] for _file in file_list])
+
+
+def output_mtimes(file_list: list) -> dict:
+    mtimes = {}
+    for _file in file_list:
+        try:
+            mtimes[_file] = os.stat(_file).st_mtime_ns
+        except OSError:
+            mtimes[_file] = None
+    return mtimes
+
+
+def outputs_unchanged(recorded_mtimes: dict) -> bool:
+    if not recorded_mtimes:
+        return False
+    current_mtimes = output_mtimes(list(recorded_mtimes.keys()))
+    return all(mtime is not None for mtime in current_mtimes.values()) \
+        and current_mtimes == recorded_mtimes
+
+
+def read_cache(cache_file: str) -> dict:
+    if not cache_file or not os.path.isfile(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r') as cache_f:
+            cache_data = json.load(cache_f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache_data, dict) or cache_data.get('version') != LOAD_CACHE_VERSION:
+        return {}
+    return cache_data
+
+
+def write_cache(cache_file: str, cache_data: dict):
+    cache_dir = os.path.dirname(os.path.abspath(cache_file))
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_data['version'] = LOAD_CACHE_VERSION
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        with open(tmp_file, 'w') as cache_f:
+            json.dump(cache_data, cache_f, separators=(',', ':'))
+        os.replace(tmp_file, cache_file)
+    except OSError as err:
+        LogUtil.hb_warning('write load cache {} failed: {}'.format(cache_file, err))
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def remove_cache(cache_file: str):
+    if cache_file and os.path.isfile(cache_file):
+        os.remove(cache_file)
@@ -15,14 +15,19 @@
 
 import os
 import sys
+import time
+import multiprocessing
 
 from containers.status import throw_exception
 from util.log_util import LogUtil
 from resources.config import Config
+from util.build_timeline import BuildTimeline
 from exceptions.ohos_exception import OHOSException
 from scripts.util.file_utils import read_json_file, write_json_file, \
-    write_file  # noqa: E402, E501  pylint: disable=C0413, E0611
+    write_file, get_write_stats, merge_write_stats  # noqa: E402, E501  pylint: disable=C0413, E0611
+from scripts.util.detect_cpu_count import get_cpu_count  # noqa: E402
 from . import load_bundle_file
+from . import load_cache
 
 IMPORT_LIST = """
 # import("//build/ohos.gni")
@@ -52,6 +57,14 @@ ohos_inner_kits("{0}_inner_kits") {{
   variant = "{4}"
 }}"""
 
+PART_SUBSYSTEM_GNI_TEMPLATE = """# Generated by hb loader, do not edit.
+# Each entry is "<part_name>:<subsystem_name>", looked up with filter_include
+# instead of running get_subsystem_name.py for every target.
+part_subsystem_info = [
+{}
+]
+"""
+
 SYSTEM_KITS_TEMPLATE = """
 ohos_system_kits("{0}_system_kits") {{
   sdk_libs = [
@@ -231,7 +244,7 @@ class PartObject(object):
         """output build gn."""
         part_gn_file = os.path.join(config_output_dir, self._part_name,
                                     'BUILD.gn')
-        write_file(part_gn_file, '\n'.join(self._build_gn_content))
+        write_file(part_gn_file, '\n'.join(self._build_gn_content), check_changes=True)
 
     def get_target_label(self, config_output_relpath):
         """target label."""
@@ -752,7 +765,7 @@ def _output_all_components_info(parts_config_dict, parts_info_output_path):
 
     _component_file = os.path.join(parts_info_output_path,
                                    "components.json")
-    write_json_file(_component_file, components)
+    write_json_file(_component_file, components, check_changes=True)
 
 
 def _output_parts_info(parts_config_dict,
@@ -792,7 +805,7 @@ def process_other_parts(part_name, parts_config_dict, parts_info_output_path):
         if part_name == 'parts_inner_kits_info':
             parts_info_file = os.path.join(parts_info_output_path,
                                            'inner_kits_info' + ".json")
-        write_json_file(parts_info_file, parts_info)
+        write_json_file(parts_info_file, parts_info, check_changes=True)
         LogUtil.hb_info("generate '{}' info to '{}'".format(part_name,
                                                             parts_info_file), mode=Config.log_mode)
 
@@ -811,7 +824,7 @@ def process_parts_modules_info(parts_config_dict, parts_info_output_path):
         _output_info['parts'] = _all_p_info
         parts_modules_info_file = os.path.join(parts_info_output_path,
                                                'parts_modules_info.json')
-        write_json_file(parts_modules_info_file, _output_info)
+        write_json_file(parts_modules_info_file, _output_info, check_changes=True)
         LogUtil.hb_info("generate parts modules info to '{}'".format(
             parts_modules_info_file), mode=Config.log_mode)
 
@@ -821,7 +834,7 @@ def process_parts_path_info(parts_config_dict, parts_info_output_path):
         parts_path_info = parts_config_dict.get('parts_path_info')
         parts_path_info_file = os.path.join(parts_info_output_path,
                                             'parts_path_info.json')
-        write_json_file(parts_path_info_file, parts_path_info)
+        write_json_file(parts_path_info_file, parts_path_info, check_changes=True)
         LogUtil.hb_info(
             "generate parts path info to '{}'".format(parts_path_info_file), mode=Config.log_mode)
         path_to_parts = {}
@@ -831,7 +844,7 @@ def process_parts_path_info(parts_config_dict, parts_info_output_path):
             path_to_parts[_val] = _p_list
         path_to_parts_file = os.path.join(parts_info_output_path,
                                           'path_to_parts.json')
-        write_json_file(path_to_parts_file, path_to_parts)
+        write_json_file(path_to_parts_file, path_to_parts, check_changes=True)
         LogUtil.hb_info(
             "generate path to parts to '{}'".format(path_to_parts_file), mode=Config.log_mode)
 
@@ -841,7 +854,7 @@ def process_subsystem_parts(config_output_path, parts_config_dict, parts_info_ou
         subsystem_parts = parts_config_dict.get('subsystem_parts')
         subsystem_parts_file = os.path.join(parts_info_output_path,
                                             "subsystem_parts.json")
-        write_json_file(subsystem_parts_file, subsystem_parts)
+        write_json_file(subsystem_parts_file, subsystem_parts, check_changes=True)
         LogUtil.hb_info(
             "generate ubsystem-parts of parts-info to '{}'".format(
                 subsystem_parts_file), mode=Config.log_mode)
@@ -853,7 +866,7 @@ def process_subsystem_parts(config_output_path, parts_config_dict, parts_info_ou
             _sub_info_output_file = os.path.join(config_output_path,
                                                  'mini_adapter',
                                                  '{}.json'.format(_sub_name))
-            write_json_file(_sub_info_output_file, _output_info)
+            write_json_file(_sub_info_output_file, _output_info, check_changes=True)
         LogUtil.hb_info(
             "generate mini adapter info to '{}/mini_adapter/'".format(
                 config_output_path), mode=Config.log_mode)
@@ -864,7 +877,7 @@ def process_parts_info(parts_config_dict, parts_info_output_path, skip_partlist_
         parts_info = parts_config_dict.get('parts_info')
         parts_info_file = os.path.join(parts_info_output_path,
                                        "parts_info.json")
-        write_json_file(parts_info_file, parts_info)
+        write_json_file(parts_info_file, parts_info, check_changes=True)
         LogUtil.hb_info("generate parts info to '{}'".format(parts_info_file), mode=Config.log_mode)
         _part_subsystem_dict = {}
         for key, value in parts_info.items():
@@ -874,12 +887,134 @@ def process_parts_info(parts_config_dict, parts_info_output_path, skip_partlist_
                 break
         _part_subsystem_file = os.path.join(parts_info_output_path,
                                             "part_subsystem.json")
-        write_json_file(_part_subsystem_file, _part_subsystem_dict)
+        write_json_file(_part_subsystem_file, _part_subsystem_dict, check_changes=True)
         LogUtil.hb_info(
             "generate part-subsystem of parts-info to '{}'".format(
                 _part_subsystem_file), mode=Config.log_mode)
-
-
+        _part_subsystem_gni = os.path.join(parts_info_output_path,
+                                           "part_subsystem.gni")
+        _part_subsystem_list = '\n'.join('  "{}:{}",'.format(_part, _sub_name)
+                                         for _part, _sub_name in sorted(_part_subsystem_dict.items()))
+        write_file(_part_subsystem_gni,
+                   PART_SUBSYSTEM_GNI_TEMPLATE.format(_part_subsystem_list),
+                   check_changes=True)
+
+
+def _load_subsystem_parts(load_args):
+    (subsystem_name, build_config_info, source_root_dir, config_output_relpath,
+     variant_toolchains, target_arch, ignored_subsystems,
+     exclusion_modules_config_file, dependency_pruning_config_file,
+     load_test_config, overrided_components, bundle_subsystem_allow_list,
+     build_xts) = load_args
+    start_time = time.monotonic()
+    build_loader = LoadBuildConfig(source_root_dir, build_config_info,
+                                   config_output_relpath,
+                                   variant_toolchains, subsystem_name,
+                                   target_arch, ignored_subsystems,
+                                   exclusion_modules_config_file,
+                                   dependency_pruning_config_file,
+                                   load_test_config, overrided_components,
+                                   bundle_subsystem_allow_list)
+    # xts subsystem special handling, device_attest and
+    # device_attest_lite parts need to be compiled into the version image, other parts are not.
+    # parts_modules_info needs to be parse before filting.
+    if subsystem_name == 'xts' and build_xts is False:
+        xts_device_attest_name = ['device_attest_lite', 'device_attest']
+        build_loader.parse()
+        build_loader.parts_info_filter(xts_device_attest_name)
+    subsystem_parts_info = {}
+    subsystem_parts_info['parts_variants'] = build_loader.parts_variants()
+    subsystem_parts_info['parts_inner_kits_info'] = build_loader.parts_inner_kits_info()
+    subsystem_parts_info['parts_component_info'] = build_loader.parts_component_info()
+    subsystem_parts_info['parts_kits_info'] = build_loader.parts_kits_info()
+    subsystem_parts_info['parts_targets'] = build_loader.parts_build_targets()
+    subsystem_parts_info['parts_name_list'] = build_loader.parts_name_list()
+    subsystem_parts_info['parts_info'] = build_loader.parts_info()
+    subsystem_parts_info['phony_target'] = build_loader.parts_phony_target()
+    subsystem_parts_info['parts_path_info'] = build_loader.parts_path_info()
+    subsystem_parts_info['hisysevent_config'] = build_loader.parts_hisysevent_config()
+    subsystem_parts_info['parts_modules_info'] = build_loader.parts_modules_info()
+    subsystem_parts_info['parts_deps'] = build_loader.parts_deps()
+    subsystem_parts_info['syscap_info'] = build_loader.parse_syscap_info()
+    return subsystem_parts_info, time.monotonic() - start_time
+
+
+def _load_subsystem_parts_task(load_args):
+    subsystem_name = load_args[0]
+    write_stats = get_write_stats()
+    try:
+        result = _load_subsystem_parts(load_args)
+        # the write counters of a worker are not seen by the parent process
+        write_stats = {key: value - write_stats.get(key, 0)
+                       for key, value in get_write_stats().items()}
+        return result, None, write_stats
+    except OHOSException as exception:
+        return None, (str(exception), exception._code), {}
+    except SystemExit:
+        # throw_exception has already printed the error in the worker, turn
+        # the exit into a result so the pool does not wait for it forever.
+        return None, ("load parts of subsystem '{}' failed.".format(subsystem_name), "2014"), {}
+
+
+def _load_all_subsystem_parts(load_tasks, parallel_load):
+    if not parallel_load or len(load_tasks) <= 1:
+        for load_args in load_tasks:
+            yield load_args[0], _load_subsystem_parts(load_args)
+        return
+    processes = min(get_cpu_count(), len(load_tasks))
+    with multiprocessing.Pool(processes=processes) as pool:
+        # imap keeps the task order, so merging stays identical to the serial path
+        results = pool.imap(_load_subsystem_parts_task, load_tasks, chunksize=1)
+        for load_args, (result, error, write_stats) in zip(load_tasks, results):
+            if error:
+                raise OHOSException(*error)
+            merge_write_stats(write_stats)
+            yield load_args[0], result
+
+
+def _log_subsystem_load_cost(subsystem_load_cost, wall_time, top_count=10):
+    LogUtil.hb_info('parts loading of {} subsystems costed {} s, sum of subsystems {} s'.format(
+        len(subsystem_load_cost), round(wall_time, 2), round(sum(subsystem_load_cost.values()), 2)))
+    slowest = sorted(subsystem_load_cost.items(), key=lambda item: item[1], reverse=True)
+    for subsystem_name, cost in slowest[:top_count]:
+        LogUtil.hb_info('  subsystem {} parts loading costed {} s'.format(
+            subsystem_name, round(cost, 2)))
+
+
+def _parts_load_common_digest(source_root_dir, config_output_relpath,
+                              variant_toolchains, target_arch,
+                              ignored_subsystems, exclusion_modules_config_file,
+                              dependency_pruning_config_file, load_test_config,
+                              overrided_components, bundle_subsystem_allow_list,
+                              build_xts):
+    # bundle.json conditions are evaluated against ohos_config.json and the
+    # config attributes, see load_bundle_file.BundlePartObj
+    config = Config()
+    condition_args = [getattr(config, key, None)
+                      for key in ('compile_mode', 'target_os', 'target_cpu', 'os_level')]
+    return load_cache.content_digest([
+        source_root_dir, config_output_relpath, variant_toolchains,
+        target_arch, ignored_subsystems, load_test_config,
+        overrided_components, bundle_subsystem_allow_list, build_xts,
+        condition_args,
+        load_cache.files_digest([exclusion_modules_config_file,
+                                 dependency_pruning_config_file,
+                                 config.config_json])])
+
+
+def _part_build_gn_exists(source_root_dir, config_output_relpath,
+                          subsystem_name, subsystem_parts_info):
+    if not subsystem_parts_info:
+        return False
+    for part_name in subsystem_parts_info.get('parts_name_list', []):
+        part_gn_file = os.path.join(source_root_dir, config_output_relpath,
+                                    subsystem_name, part_name, 'BUILD.gn')
+        if not os.path.isfile(part_gn_file):
+            return False
+    return True
+
+
+@BuildTimeline.traced(category='load')
 def get_parts_info(source_root_dir,
                    config_output_relpath,
                    subsystem_info,
@@ -892,7 +1027,9 @@ def get_parts_info(source_root_dir,
                    overrided_components,
                    bundle_subsystem_allow_list,
                    skip_partlist_check,
-                   build_xts=False):
+                   build_xts=False,
+                   parallel_load=False,
+                   cache_file=None):
     """parts info,
     get info from build config file.
     """
@@ -909,41 +1046,66 @@ def get_parts_info(source_root_dir,
     _parts_modules_info = {}
     _parts_deps = {}
     system_syscap = []
+    load_tasks = []
+    load_order = []
+    cached_subsystems = load_cache.read_cache(cache_file).get('subsystems', {})
+    subsystem_cache = {}
+    subsystem_results = {}
+    common_digest = _parts_load_common_digest(
+        source_root_dir, config_output_relpath, variant_toolchains, target_arch,
+        ignored_subsystems, exclusion_modules_config_file,
+        dependency_pruning_config_file, load_test_config, overrided_components,
+        bundle_subsystem_allow_list, build_xts)
     for subsystem_name, build_config_info in subsystem_info.items():
         if not len(build_config_info.get("build_files")):
             continue
-        build_loader = LoadBuildConfig(source_root_dir, build_config_info,
-                                       config_output_relpath,
-                                       variant_toolchains, subsystem_name,
-                                       target_arch, ignored_subsystems,
-                                       exclusion_modules_config_file,
-                                       dependency_pruning_config_file,
-                                       load_test_config, overrided_components,
-                                       bundle_subsystem_allow_list)
-        # xts subsystem special handling, device_attest and
-        # device_attest_lite parts need to be compiled into the version image, other parts are not.
-        # parts_modules_info needs to be parse before filting.
-        if subsystem_name == 'xts' and build_xts is False:
-            xts_device_attest_name = ['device_attest_lite', 'device_attest']
-            build_loader.parse()
-            build_loader.parts_info_filter(xts_device_attest_name)
-        _parts_variants = build_loader.parts_variants()
-        parts_variants.update(_parts_variants)
-        _inner_kits_info = build_loader.parts_inner_kits_info()
-        parts_inner_kits_info.update(_inner_kits_info)
-        _parts_component_info = build_loader.parts_component_info()
-        parts_component_info.update(_parts_component_info)
-        parts_kits_info.update(build_loader.parts_kits_info())
-        _parts_targets = build_loader.parts_build_targets()
-        parts_targets.update(_parts_targets)
-        subsystem_parts[subsystem_name] = build_loader.parts_name_list()
-        parts_info.update(build_loader.parts_info())
-        _phony_target.update(build_loader.parts_phony_target())
-        _parts_path_info.update(build_loader.parts_path_info())
-        _parts_hisysevent_config.update(build_loader.parts_hisysevent_config())
-        _parts_modules_info.update(build_loader.parts_modules_info())
-        _parts_deps.update(build_loader.parts_deps())
-        system_syscap.extend(build_loader.parse_syscap_info())
+        load_order.append(subsystem_name)
+        cache_key = load_cache.content_digest([
+            common_digest, subsystem_name, build_config_info,
+            load_cache.files_digest(build_config_info.get("build_files"))])
+        cached = cached_subsystems.get(subsystem_name)
+        if cached and cached.get('key') == cache_key and _part_build_gn_exists(
+                source_root_dir, config_output_relpath, subsystem_name,
+                cached.get('result')):
+            subsystem_results[subsystem_name] = cached.get('result')
+            subsystem_cache[subsystem_name] = cached
+            continue
+        subsystem_cache[subsystem_name] = {'key': cache_key}
+        load_tasks.append((subsystem_name, build_config_info, source_root_dir,
+                           config_output_relpath, variant_toolchains,
+                           target_arch, ignored_subsystems,
+                           exclusion_modules_config_file,
+                           dependency_pruning_config_file, load_test_config,
+                           overrided_components, bundle_subsystem_allow_list,
+                           build_xts))
+    LogUtil.hb_info('parts load cache hit {} subsystems, reload {} subsystems'.format(
+        len(subsystem_results), len(load_tasks)))
+    subsystem_load_cost = {}
+    load_start_time = time.monotonic()
+    for subsystem_name, (_parts_info, load_cost) in _load_all_subsystem_parts(load_tasks, parallel_load):
+        subsystem_load_cost[subsystem_name] = load_cost
+        subsystem_results[subsystem_name] = _parts_info
+        subsystem_cache[subsystem_name]['result'] = _parts_info
+    if cache_file:
+        load_cache.write_cache(cache_file, {'subsystems': subsystem_cache})
+    # merge in the subsystem config order, cached or not, so the later
+    # subsystems override the earlier ones exactly as a full load does
+    for subsystem_name in load_order:
+        _parts_info = subsystem_results.get(subsystem_name)
+        parts_variants.update(_parts_info.get('parts_variants'))
+        parts_inner_kits_info.update(_parts_info.get('parts_inner_kits_info'))
+        parts_component_info.update(_parts_info.get('parts_component_info'))
+        parts_kits_info.update(_parts_info.get('parts_kits_info'))
+        parts_targets.update(_parts_info.get('parts_targets'))
+        subsystem_parts[subsystem_name] = _parts_info.get('parts_name_list')
+        parts_info.update(_parts_info.get('parts_info'))
+        _phony_target.update(_parts_info.get('phony_target'))
+        _parts_path_info.update(_parts_info.get('parts_path_info'))
+        _parts_hisysevent_config.update(_parts_info.get('hisysevent_config'))
+        _parts_modules_info.update(_parts_info.get('parts_modules_info'))
+        _parts_deps.update(_parts_info.get('parts_deps'))
+        system_syscap.extend(_parts_info.get('syscap_info'))
+    _log_subsystem_load_cost(subsystem_load_cost, time.monotonic() - load_start_time)
     LogUtil.hb_info(
         "generate all parts build gn file to '{}/{}'".format(
             source_root_dir, config_output_relpath), mode=Config.log_mode)
@@ -17,6 +17,7 @@ import sys
 import os
 from util.log_util import LogUtil
 from resources.config import Config
+from util.build_timeline import BuildTimeline
 from exceptions.ohos_exception import OHOSException
 from scripts.util.file_utils import read_json_file, write_json_file  # noqa: E402
 from containers.status import throw_exception
@@ -181,6 +182,7 @@ class PlatformsLoader:
         return _result
 
 
+@BuildTimeline.traced(category='load')
 def get_platforms_info(platforms_config_file, source_root_dir, root_build_dir,
                        target_arch, config_output_relpath, scalable_build):
     platform_loader = PlatformsLoader(platforms_config_file, source_root_dir,
@@ -191,7 +193,7 @@ def get_platforms_info(platforms_config_file, source_root_dir, root_build_dir,
     all_parts = platform_loader.get_all_parts()
     all_parts_file = os.path.join(source_root_dir, config_output_relpath,
                                   platforms_info_output_dir, "all_parts.json")
-    write_json_file(all_parts_file, all_parts)
+    write_json_file(all_parts_file, all_parts, check_changes=True)
     LogUtil.hb_info(
         "generate all parts of platforms info to '{}'".format(all_parts_file), mode=Config.log_mode)
 
@@ -19,13 +19,14 @@ import sys
 from scripts.util.file_utils import write_json_file  # noqa: E402
 from . import subsystem_scan  # noqa: E402
 from resources.config import Config
+from util.build_timeline import BuildTimeline
 
 
 def _output_subsystem_configs(output_dir, subsystem_configs):
     build_config_file_name = "subsystem_build_config.json"
     build_config_file = os.path.join(output_dir, 'subsystem_info',
                                      build_config_file_name)
-    write_json_file(build_config_file, subsystem_configs)
+    write_json_file(build_config_file, subsystem_configs, check_changes=True)
 
     src_output_file_name = "src_subsystem_info.json"
     no_src_output_file_name = "no_src_subsystem_info.json"
@@ -35,12 +36,13 @@ def _output_subsystem_configs(output_dir, subsystem_configs):
         src_subsystem[key] = val.get('path')
     src_output_file = os.path.join(output_dir, 'subsystem_info',
                                    src_output_file_name)
-    write_json_file(src_output_file, src_subsystem)
+    write_json_file(src_output_file, src_subsystem, check_changes=True)
 
     no_src_output_file = os.path.join(output_dir, 'subsystem_info',
                                       no_src_output_file_name)
     write_json_file(no_src_output_file,
-                    subsystem_configs.get('no_src_subsystem'))
+                    subsystem_configs.get('no_src_subsystem'),
+                    check_changes=True)
 
 
 def merge_subsystem_overlay(subsystem_configs, subsystem_config_overlay, key):
@@ -62,6 +64,7 @@ def merge_subsystem_overlay(subsystem_configs, subsystem_config_overlay, key):
             subsystem_configs[key].setdefault(subsystem, subsystem_config_overlay[key][subsystem])
 
 
+@BuildTimeline.traced(category='load')
 def get_subsystem_info(subsystem_config_file, example_subsystem_file,
                        source_root_dir, config_output_path, enable_scan_optimization):
     if not subsystem_config_file:
@@ -69,11 +72,13 @@ def get_subsystem_info(subsystem_config_file, example_subsystem_file,
 
     subsystem_configs = {}
     output_dir_realpath = os.path.join(source_root_dir, config_output_path)
+    config = Config()
+    scan_index_dir = os.path.join(config.root_path, 'out/preloader', config.product)
     subsystem_configs = subsystem_scan.scan(subsystem_config_file,
                                             example_subsystem_file,
                                             source_root_dir,
-                                            enable_scan_optimization)
-    config = Config()
+                                            enable_scan_optimization,
+                                            os.path.join(scan_index_dir, 'subsystem_scan_index.json'))
     subsystem_config_overlay_file = os.path.join(
         config.product_path, "subsystem_config_overlay.json")
     if os.path.isfile(subsystem_config_overlay_file):
@@ -81,7 +86,9 @@ def get_subsystem_info(subsystem_config_file, example_subsystem_file,
         subsystem_config_overlay = subsystem_scan.scan(subsystem_config_overlay_file,
                                                        example_subsystem_file,
                                                        source_root_dir,
-                                                       enable_scan_optimization)
+                                                       enable_scan_optimization,
+                                                       os.path.join(scan_index_dir,
+                                                                    'subsystem_scan_overlay_index.json'))
         merge_subsystem_overlay(subsystem_configs, subsystem_config_overlay, 'subsystem')
         merge_subsystem_overlay(subsystem_configs, subsystem_config_overlay, 'no_src_subsystem')
 
@@ -15,6 +15,8 @@
 
 import os
 import sys
+import json
+import hashlib
 import argparse
 import multiprocessing
 import time
@@ -54,34 +56,125 @@ def _read_config(subsystem_config_file, example_subsystem_file):
     return subsystem_info
 
 
-def _scan_build_file(subsystem_path, enable_depth_optimization):
+_IGNORE_DIRS = ['.git', '.gitee', '.github', 'doc', 'docs', 'node_modules']
+_MAX_SCAN_DEPTH = 5
+_SCAN_INDEX_VERSION = 1
+
+
+def _list_dir(path):
+    # Returns (subdirs, has_ohos_build, has_bundle_json) in the same order
+    # os.walk would visit them, or None if the directory cannot be listed.
+    subdirs = []
+    has_ohos_build = False
+    has_bundle_json = False
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # os.walk lists symlinked dirs but never descends into them
+                    if entry.name not in _IGNORE_DIRS and not entry.is_symlink():
+                        subdirs.append(entry.name)
+                elif entry.name == 'ohos.build':
+                    has_ohos_build = True
+                elif entry.name == 'bundle.json':
+                    has_bundle_json = True
+    except OSError:
+        return None
+    return subdirs, has_ohos_build, has_bundle_json
+
+
+def _scan_build_file(subsystem_path, enable_depth_optimization, index=None):
+    """Walk subsystem_path and collect ohos.build/bundle.json files.
+
+    index maps directory paths (relative to subsystem_path) to
+    [st_mtime_ns, st_ino, subdirs, has_ohos_build, has_bundle_json] as
+    recorded by a previous scan. A directory whose mtime and inode are
+    unchanged has the same entries, so its cached listing is reused instead
+    of reading the directory again.
+    Returns (build_files, new_index, hits, misses).
+    """
     _files = []
     _bundle_files = []
-    _ignore_dirs = [ '.git', '.gitee', '.github', 'doc', 'docs', 'node_modules']
-    max_depth = 5
-    bundle_dirs = set()
-
-    for root, dirs, files in os.walk(subsystem_path):
-        dirs[:] = [d for d in dirs if d not in _ignore_dirs]
-        for name in files:
-            if name == 'ohos.build':
-                _files.append(os.path.join(root, name))
-                bundle_dirs.add(root)
-            elif name == 'bundle.json':
-                _bundle_files.append(os.path.join(root, name))
-                bundle_dirs.add(root)
-
-        current_depth = root[len(os.path.normpath(subsystem_path)):].count(os.sep)
-        if enable_depth_optimization and current_depth >= max_depth:
-            for _bundle_dir in bundle_dirs:
-                _bundle_dir += os.sep
-                if root.startswith(_bundle_dir):
-                    del dirs[:]
-                    break
+    index = index or {}
+    new_index = {}
+    hits = 0
+    misses = 0
+
+    # iterative pre-order traversal matching os.walk(topdown=True)
+    stack = [('.', False)]
+    while stack:
+        rel_dir, in_bundle = stack.pop()
+        root = subsystem_path if rel_dir == '.' else os.path.join(subsystem_path, rel_dir)
+        try:
+            dir_stat = os.stat(root)
+        except OSError:
+            continue
+        cached = index.get(rel_dir)
+        if cached and cached[0] == dir_stat.st_mtime_ns and cached[1] == dir_stat.st_ino:
+            hits += 1
+            entry = cached
+        else:
+            misses += 1
+            listing = _list_dir(root)
+            if listing is None:
+                continue
+            entry = [dir_stat.st_mtime_ns, dir_stat.st_ino] + list(listing)
+        new_index[rel_dir] = entry
+        subdirs, has_ohos_build, has_bundle_json = entry[2], entry[3], entry[4]
+
+        if has_ohos_build:
+            _files.append(os.path.join(root, 'ohos.build'))
+        if has_bundle_json:
+            _bundle_files.append(os.path.join(root, 'bundle.json'))
+
+        current_depth = 0 if rel_dir == '.' else rel_dir.count(os.sep) + 1
+        if enable_depth_optimization and current_depth >= _MAX_SCAN_DEPTH and in_bundle:
+            continue
+        child_in_bundle = in_bundle or has_ohos_build or has_bundle_json
+        for name in reversed(subdirs):
+            child = name if rel_dir == '.' else os.path.join(rel_dir, name)
+            stack.append((child, child_in_bundle))
 
     if _bundle_files:
         _files.extend(_bundle_files)
-    return _files
+    return _files, new_index, hits, misses
+
+
+def _config_digest(subsystem_infos, source_root_dir, enable_scan_optimization):
+    content = json.dumps([_SCAN_INDEX_VERSION, subsystem_infos, source_root_dir,
+                          bool(enable_scan_optimization)], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _load_scan_index(index_file, config_digest):
+    if not index_file or not os.path.isfile(index_file):
+        return {}
+    try:
+        with open(index_file, 'r') as index_f:
+            index_data = json.load(index_f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(index_data, dict) or index_data.get('config_digest') != config_digest:
+        return {}
+    return index_data
+
+
+def _save_scan_index(index_file, index_data):
+    index_dir = os.path.dirname(os.path.abspath(index_file))
+    os.makedirs(index_dir, exist_ok=True)
+    tmp_file = '{}.{}.tmp'.format(index_file, os.getpid())
+    try:
+        with open(tmp_file, 'w') as index_f:
+            json.dump(index_data, index_f, separators=(',', ':'))
+        os.replace(tmp_file, index_file)
+    except OSError as err:
+        LogUtil.hb_warning('write subsystem scan index {} failed: {}'.format(index_file, err))
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
 
 
 def _check_path_prefix(paths):
@@ -93,16 +186,18 @@ def _check_path_prefix(paths):
 
 
 def scan_task(args):
-    key, path, enable_optimization = args
+    key, path, enable_optimization, index = args
     _all_build_config_files = []
-    _all_build_config_files.extend(_scan_build_file(path, enable_optimization))
-    return key, _all_build_config_files
+    build_files, new_index, hits, misses = _scan_build_file(path, enable_optimization, index)
+    _all_build_config_files.extend(build_files)
+    return key, path, _all_build_config_files, new_index, hits, misses
 
 
 @throw_exception
 @progress_spinner("subsystem config scanning ...")
-def scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimization):
+def scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimization, path_indexes=None):
     scan_tasks = []
+    path_indexes = path_indexes or {}
 
     for key, val in subsystem_infos.items():
         if not isinstance(val, list):
@@ -114,7 +209,8 @@ def scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimizati
                         key), "2013")
         for _path in val:
             subsystem_path = os.path.join(source_root_dir, _path)
-            scan_tasks.append((key, subsystem_path, enable_scan_optimization))
+            scan_tasks.append((key, subsystem_path, enable_scan_optimization,
+                               path_indexes.get(subsystem_path)))
 
     with multiprocessing.Pool() as pool:
         results = list(pool.imap_unordered(scan_task, scan_tasks, chunksize=1))
@@ -122,7 +218,8 @@ def scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimizati
     return results
 
 
-def scan(subsystem_config_file, example_subsystem_file, source_root_dir, enable_scan_optimization):
+def scan(subsystem_config_file, example_subsystem_file, source_root_dir, enable_scan_optimization,
+         index_file=None):
     s_time = time.monotonic()
     subsystem_infos = _read_config(subsystem_config_file,
                                    example_subsystem_file)
@@ -131,12 +228,21 @@ def scan(subsystem_config_file, example_subsystem_file, source_root_dir, enable_
 
     no_src_subsystem = {}
     _build_configs = {}
-    results = scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimization)
+    config_digest = _config_digest(subsystem_infos, source_root_dir, enable_scan_optimization)
+    scan_index = _load_scan_index(index_file, config_digest)
+    results = scan_subsystem_info(source_root_dir, subsystem_infos, enable_scan_optimization,
+                                  scan_index.get('paths'))
 
     merged = {}
-    for key, build_files in results:
+    new_path_indexes = {}
+    index_hits = 0
+    index_misses = 0
+    for key, path, build_files, new_index, hits, misses in results:
         merged.setdefault(key, [])
         merged[key].extend(build_files)
+        new_path_indexes[path] = new_index
+        index_hits += hits
+        index_misses += misses
 
     for key, build_files in merged.items():
         if build_files:
@@ -154,7 +260,17 @@ def scan(subsystem_config_file, example_subsystem_file, source_root_dir, enable_
     }
 
     e_time = time.monotonic()
-    LogUtil.hb_info('subsytem config scan completed costed is {} s'.format(round(e_time - s_time, 2)))
+    cost_time = e_time - s_time
+    # the cost of the last full scan is kept as the baseline for time saved
+    full_scan_cost = scan_index.get('full_scan_cost', 0) if index_hits else cost_time
+    if index_file:
+        _save_scan_index(index_file, {
+            'config_digest': config_digest,
+            'full_scan_cost': full_scan_cost,
+            'paths': new_path_indexes
+        })
+    LogUtil.hb_info('subsytem config scan completed costed is {} s, index hit {} miss {}, saved {} s'.format(
+        round(cost_time, 2), index_hits, index_misses, round(max(full_scan_cost - cost_time, 0), 2)))
     return scan_result
 
 def main():
@@ -165,10 +281,12 @@ def main():
     parser.add_argument('--source-root-dir', required=True)
     parser.add_argument('--output-dir', required=True)
     parser.add_argument('--enable-scan-optimization', action='store_true')
+    parser.add_argument('--index-file', required=False)
     args = parser.parse_args()
 
     build_configs = scan(args.subsystem_config_file,
-                         args.example_subsystem_file, args.source_root_dir, args.enable_scan_optimization)
+                         args.example_subsystem_file, args.source_root_dir, args.enable_scan_optimization,
+                         args.index_file)
 
     build_configs_file = os.path.join(args.output_dir,
                                       "subsystem_build_config.json")
@@ -18,6 +18,7 @@
 
 import sys
 import re
+import io
 import os
 
 from containers.colors import Colors
@@ -37,6 +38,8 @@ class LogLevel():
 class LogUtil(metaclass=NoInstance):
     # static member for store current stage
     stage = ""
+    # compiled status patterns by status code prefix
+    _status_patterns = {}
 
     @staticmethod
     def set_stage(stage):
@@ -106,103 +109,93 @@ class LogUtil(metaclass=NoInstance):
 
     @staticmethod
     def analyze_build_error(error_log, status_code_prefix):
-        with open(error_log, 'rt', encoding='utf-8') as log_file:
+        with open(error_log, 'rt', encoding='utf-8', errors='replace') as log_file:
             data = log_file.read()
-            status_file = IoUtil.read_json_file(STATUS_FILE)
-            choices = []
-            status_map = {}
-            for status_code, status in status_file.items():
-                if not status_code.startswith(status_code_prefix):
-                    continue
-                if isinstance(status, dict) and status.get('pattern'):
-                    choices.append(status['pattern'])
-                    status_map[status['pattern']] = status.get('code')
-            best_match = None
-            best_ratio = 0
-            for choice in choices:
-                pattern = re.compile(choice, re.DOTALL)
+        combined_pattern, choices = LogUtil._get_status_patterns(status_code_prefix)
+        best_match = None
+        best_ratio = 0
+        # the combined pattern rejects logs matching no known status at once,
+        # error.log is bounded so the exact ratio check below stays cheap.
+        if data and combined_pattern and combined_pattern.search(data):
+            for pattern, status_code in choices:
                 match = pattern.search(data)
                 if not match:
                     continue
                 ratio = len(match.group()) / len(data)
                 if ratio > best_ratio:
                     best_ratio = ratio
-                    best_match = choice
-            return_status_code = status_map.get(
-                best_match) if best_match else f'{status_code_prefix}000'
-        return return_status_code
+                    best_match = status_code
+        return best_match if best_match else f'{status_code_prefix}000'
+
+    @staticmethod
+    def _get_status_patterns(status_code_prefix):
+        if status_code_prefix in LogUtil._status_patterns:
+            return LogUtil._status_patterns[status_code_prefix]
+        status_file = IoUtil.read_json_file(STATUS_FILE)
+        choices = []
+        for status_code, status in status_file.items():
+            if not status_code.startswith(status_code_prefix):
+                continue
+            if isinstance(status, dict) and status.get('pattern'):
+                choices.append((status['pattern'], status.get('code')))
+        combined_pattern = None
+        if choices:
+            combined_pattern = re.compile(
+                '|'.join('(?:{})'.format(pattern) for pattern, _ in choices), re.DOTALL)
+        compiled = (combined_pattern,
+                    [(re.compile(pattern, re.DOTALL), code) for pattern, code in choices])
+        LogUtil._status_patterns[status_code_prefix] = compiled
+        return compiled
 
     @staticmethod
-    def get_gn_failed_log(log_path):
+    def get_gn_failed_log(log_path, error_lines):
         error_log = os.path.join(os.path.dirname(log_path), 'error.log')
-        is_gn_failed = False
-        with open(log_path, 'rt', encoding='utf-8') as log_file:
-            lines = log_file.readlines()
-        error_lines = []
-        for i, line in enumerate(lines):
-            if line.startswith('ERROR at'):
-                error_lines.extend(lines[i: i + 50])
-                is_gn_failed = True
-                break
-        for log in error_lines[:50]:
+        for log in error_lines:
             LogUtil.hb_error(log)
             with open(error_log, 'at', encoding='utf-8') as log_file:
                 log_file.write(log + '\n')
-        if is_gn_failed:
+        if error_lines:
             return_status_code = LogUtil.analyze_build_error(error_log, '3')
             raise OHOSException(
                 'GN Failed! Please check error in {}, and for more build information in {}'.format(
                     error_log, log_path), return_status_code)
 
     @staticmethod
-    def get_ninja_failed_log(log_path):
+    def get_ninja_failed_log(log_path, failed_log):
         error_log = os.path.join(os.path.dirname(log_path), 'error.log')
-        is_ninja_failed = False
-        with open(log_path, 'rt', encoding='utf-8') as log_file:
-            data = log_file.read()
-        failed_pattern = re.compile(r'(ninja: (?:error|fatal):.*?)\n', re.DOTALL)
-        failed_log = failed_pattern.findall(data)
-        if failed_log:
-            is_ninja_failed = True
         for log in failed_log:
             LogUtil.hb_error(log)
             with open(error_log, 'at', encoding='utf-8') as log_file:
                 log_file.write(log)
-        if is_ninja_failed:
+        if failed_log:
             return_status_code = LogUtil.analyze_build_error(error_log, '4')
             raise OHOSException(
                 'NINJA Failed! Please check error in {}, and for more build information in {}'.format(
                     error_log, log_path), return_status_code)
 
     @staticmethod
-    def get_compiler_failed_pattern(cmd: list):
+    def get_compiler_failed_prefix(cmd: list):
         # in verbose mode, output commands instead of descriptions.
         if any(flag in cmd for flag in ("-v", "--verbose")):
-            prefix = r"\[\d+/\d+]"
-        else:
-            description_str = "|".join(re.escape(k) for k in NINJA_DESCRIPTION)
-            prefix = rf'(?:\[\d+/\d+\]\s+\b(?:{description_str}))\b'
+            return r"\[\d+/\d+]"
+        description_str = "|".join(re.escape(k) for k in NINJA_DESCRIPTION)
+        return rf'(?:\[\d+/\d+\]\s+\b(?:{description_str}))\b'
 
+    @staticmethod
+    def get_compiler_failed_pattern(cmd: list):
+        prefix = LogUtil.get_compiler_failed_prefix(cmd)
         pattern_str = rf'({prefix}.*?)(?={prefix}|ninja: build stopped)'
         failed_pattern = re.compile(pattern_str, re.DOTALL)
 
         return failed_pattern
 
     @staticmethod
-    def get_compiler_failed_log(log_path, cmd: list):
+    def get_compiler_failed_log(log_path, failed_log, is_compiler_failed):
         error_log = os.path.join(os.path.dirname(log_path), 'error.log')
-        is_compiler_failed = False
-        with open(log_path, 'rt', encoding='utf-8') as log_file:
-            data = log_file.read()
-        failed_pattern = LogUtil.get_compiler_failed_pattern(cmd)
-        failed_log = failed_pattern.findall(data)
-        if failed_log:
-            is_compiler_failed = True
         for log in failed_log:
-            if any(line.startswith("FAILED:") for line in log.splitlines()):
-                LogUtil.hb_error(log)
-                with open(error_log, 'at', encoding='utf-8') as log_file:
-                    log_file.write(log)
+            LogUtil.hb_error(log)
+            with open(error_log, 'at', encoding='utf-8') as log_file:
+                log_file.write(log)
         if is_compiler_failed:
             return_status_code = LogUtil.analyze_build_error(error_log, '4')
             raise OHOSException(
@@ -210,14 +203,93 @@ class LogUtil(metaclass=NoInstance):
                     error_log, log_path), return_status_code)
 
     @staticmethod
-    def get_failed_log(log_path, cmd: list):
+    def get_failed_log(log_path, cmd: list, start_offset=0):
+        # failures logged before start_offset, by earlier commands, are not reported
         last_error_log = os.path.join(os.path.dirname(log_path), 'error.log')
         if os.path.exists(last_error_log):
             mtime = os.stat(last_error_log).st_mtime
             os.rename(
                 last_error_log, '{}/error.{}.log'.format(os.path.dirname(last_error_log), mtime))
-        LogUtil.get_gn_failed_log(log_path)
-        LogUtil.get_ninja_failed_log(log_path)
-        LogUtil.get_compiler_failed_log(log_path, cmd)
+        analyzer = FailedLogAnalyzer(LogUtil.get_compiler_failed_prefix(cmd))
+        analyzer.scan(log_path, start_offset)
+        LogUtil.get_gn_failed_log(log_path, analyzer.gn_error_lines)
+        LogUtil.get_ninja_failed_log(log_path, analyzer.ninja_error_lines)
+        LogUtil.get_compiler_failed_log(log_path, analyzer.compiler_failed_logs, analyzer.is_compiler_failed)
         raise OHOSException(
             'BUILD Failed! Please check build log for more information: {}'.format(log_path))
+
+
+class FailedLogAnalyzer():
+    """Classify gn/ninja/compiler failures of a build log in a single pass.
+
+    The log is read line by line, only the gn error window, ninja error lines
+    and the currently open compiler output block are kept, so memory does not
+    grow with the size of the log.
+    """
+
+    GN_ERROR_START = 'ERROR at'
+    GN_ERROR_WINDOW = 50
+    NINJA_FAILED_PATTERN = re.compile(r'(ninja: (?:error|fatal):.*?)\n', re.DOTALL)
+    BUILD_STOPPED = 'ninja: build stopped'
+
+    def __init__(self, compiler_prefix):
+        self._prefix_pattern = re.compile(compiler_prefix)
+        self.gn_error_lines = []
+        self.ninja_error_lines = []
+        self.compiler_failed_logs = []
+        self.is_compiler_failed = False
+        self._block = None
+        self._block_failed = False
+
+    def scan(self, log_path, start_offset=0):
+        with open(log_path, 'rb') as raw_file:
+            raw_file.seek(start_offset)
+            log_file = io.TextIOWrapper(raw_file, encoding='utf-8', errors='replace')
+            for line in log_file:
+                if self.gn_error_lines:
+                    # gn failure wins, nothing after its window matters
+                    if len(self.gn_error_lines) >= self.GN_ERROR_WINDOW:
+                        break
+                    self.gn_error_lines.append(line)
+                    continue
+                if line.startswith(self.GN_ERROR_START):
+                    self.gn_error_lines.append(line)
+                    continue
+                self.ninja_error_lines.extend(self.NINJA_FAILED_PATTERN.findall(line))
+                self._scan_compiler_line(line)
+
+    def _scan_compiler_line(self, line):
+        events = [(match.start(), True) for match in self._prefix_pattern.finditer(line)]
+        pos = line.find(self.BUILD_STOPPED)
+        while pos != -1:
+            events.append((pos, False))
+            pos = line.find(self.BUILD_STOPPED, pos + 1)
+        events.sort()
+
+        consumed = 0
+        for pos, is_prefix in events:
+            if self._block is not None:
+                self._append_block(line[consumed:pos])
+                self._close_block()
+            if is_prefix:
+                self._block = []
+                self._block_failed = False
+                consumed = pos
+        if self._block is not None:
+            self._append_block(line[consumed:])
+
+    def _append_block(self, text):
+        if not text:
+            return
+        # same as checking every line of the block, text always starts at a
+        # line start except for the block's first piece
+        if not self._block_failed:
+            self._block_failed = any(_line.startswith('FAILED:') for _line in text.splitlines())
+        self._block.append(text)
+
+    def _close_block(self):
+        self.is_compiler_failed = True
+        if self._block_failed:
+            self.compiler_failed_logs.append(''.join(self._block))
+        self._block = None
+        self._block_failed = False
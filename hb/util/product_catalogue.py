@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Catalogue of the products of the source tree.
+
+The product configs (out/products_ext/vendor, vendor and the built-in
+products) are scanned once per process and the result is kept in
+out/product_catalogue.json together with the stat of every directory
+listed and every file checked or read by the scan. The next hb invocation
+reuses it while none of them changed: adding or removing a product
+changes the mtime of its directory, editing a config changes the config.
+"""
+
+import os
+import json
+import stat
+
+from util.io_util import IoUtil
+from util.log_util import LogUtil
+
+PRODUCT_CATALOGUE_VERSION = 1
+PRODUCT_CATALOGUE_FILE = 'product_catalogue.json'
+
+
+def _stat_key(path: str):
+    try:
+        path_stat = os.stat(path)
+    except OSError:
+        return None
+    return [path_stat.st_mtime_ns, path_stat.st_size, stat.S_ISDIR(path_stat.st_mode)]
+
+
+class _ProductScanner():
+    """File system access of the scan, recording the stat of every path."""
+
+    def __init__(self):
+        self.sources = {}
+
+    def _record(self, path: str):
+        if path not in self.sources:
+            self.sources[path] = _stat_key(path)
+        return self.sources[path]
+
+    def exists(self, path: str) -> bool:
+        return self._record(path) is not None
+
+    def isdir(self, path: str) -> bool:
+        key = self._record(path)
+        return key is not None and key[2]
+
+    def isfile(self, path: str) -> bool:
+        key = self._record(path)
+        return key is not None and not key[2]
+
+    def listdir(self, path: str) -> list:
+        self._record(path)
+        return os.listdir(path)
+
+    def read_json(self, path: str) -> dict:
+        self._record(path)
+        return IoUtil.read_json_file(path)
+
+
+class ProductCatalogue():
+    """All products of the tree in scan order, indexed by name and by company and name.
+
+    A product config that fails to parse is kept as a broken entry at its
+    position, get_products() raises the parse error when it gets there, as
+    the scan of every config did before.
+    """
+
+    # catalogues of the current process, keyed by the scanned paths
+    _instances = {}
+
+    def __init__(self, products: list, sources: dict):
+        self.products = products
+        self.sources = sources
+        self._by_name = {}
+        self._by_company_name = {}
+        for index, product in enumerate(products):
+            if 'broken_config' in product:
+                continue
+            self._by_name.setdefault(product['name'], index)
+            self._by_company_name.setdefault((product['company'], product['name']), index)
+
+    @classmethod
+    def get(cls, root_path: str, built_in_product_path: str, built_in_product_path_for_llvm: str,
+            cache_file: str = None):
+        paths = [root_path, built_in_product_path, built_in_product_path_for_llvm]
+        key = tuple(paths)
+        catalogue = cls._instances.get(key)
+        if catalogue is None:
+            catalogue = cls._read_cache(cache_file, paths)
+            if catalogue is None:
+                catalogue = cls.scan(*paths)
+                if cache_file and not catalogue.has_broken_configs():
+                    catalogue._write_cache(cache_file, paths)
+            cls._instances[key] = catalogue
+        return catalogue
+
+    @classmethod
+    def clear(cls):
+        cls._instances.clear()
+
+    def has_broken_configs(self) -> bool:
+        return any('broken_config' in product for product in self.products)
+
+    def iter_products(self):
+        for product in self.products:
+            if 'broken_config' in product:
+                # raises the parse error of the config
+                IoUtil.read_json_file(product['broken_config'])
+                continue
+            yield dict(product)
+
+    def find(self, product_name: str, company: str = None):
+        if company:
+            index = self._by_company_name.get((company, product_name))
+        else:
+            index = self._by_name.get(product_name)
+        return None if index is None else dict(self.products[index])
+
+    @classmethod
+    def scan(cls, root_path: str, built_in_product_path: str, built_in_product_path_for_llvm: str):
+        scanner = _ProductScanner()
+        products = []
+        cls._scan_ext_products(scanner, root_path, products)
+        cls._scan_vendor_products(scanner, os.path.join(root_path, 'vendor'), products)
+        cls._scan_built_in_products(scanner, built_in_product_path, products)
+        if scanner.isdir(built_in_product_path_for_llvm):
+            cls._scan_built_in_products(scanner, built_in_product_path_for_llvm, products)
+        return cls(products, scanner.sources)
+
+    @staticmethod
+    def _read_config(scanner: _ProductScanner, config_path: str, products: list):
+        try:
+            return scanner.read_json(config_path)
+        except ValueError:
+            products.append({'broken_config': config_path})
+            return None
+
+    @classmethod
+    def _scan_ext_products(cls, scanner: _ProductScanner, root_path: str, products: list):
+        _ext_scan_path = os.path.join(root_path, 'out/products_ext/vendor')
+        if not scanner.exists(_ext_scan_path):
+            return
+        for company in scanner.listdir(_ext_scan_path):
+            company_path = os.path.join(_ext_scan_path, company)
+            if not scanner.isdir(company_path):
+                continue
+
+            for product in scanner.listdir(company_path):
+                p_config_path = os.path.join(company_path, product)
+                config_path = os.path.join(p_config_path, 'config.json')
+                if not scanner.isfile(config_path):
+                    continue
+                info = cls._read_config(scanner, config_path, products)
+                if info is None:
+                    continue
+                product_name = info.get('product_name')
+                if info.get('product_path'):
+                    product_path = os.path.join(root_path, info.get('product_path'))
+                else:
+                    product_path = p_config_path
+                if product_name is None:
+                    continue
+                product_info = {
+                    'company': company,
+                    "name": product_name,
+                    'product_config_path': p_config_path,
+                    'product_path': product_path,
+                    'version': info.get('version', '3.0'),
+                    'os_level': info.get('type', "mini"),
+                    'build_out_path': info.get('build_out_path'),
+                    'subsystem_config_json': info.get('subsystem_config_json'),
+                }
+                subsystem_config_overlay_path = os.path.join(product_path, 'subsystem_config_overlay.json')
+                if scanner.isfile(subsystem_config_overlay_path):
+                    product_info['subsystem_config_overlay_json'] = subsystem_config_overlay_path
+                product_info.update({
+                    'config': config_path,
+                    'component_type': info.get('component_type', ''),
+                    'compile_mode': info.get('compile_mode', 'cross')
+                })
+                products.append(product_info)
+
+    @classmethod
+    def _scan_vendor_products(cls, scanner: _ProductScanner, vendor_path: str, products: list):
+        if not scanner.isdir(vendor_path):
+            return
+        for company in scanner.listdir(vendor_path):
+            company_path = os.path.join(vendor_path, company)
+            if not scanner.isdir(company_path):
+                continue
+
+            for product in scanner.listdir(company_path):
+                product_path = os.path.join(company_path, product)
+                config_path = os.path.join(product_path, 'config.json')
+                if not scanner.isfile(config_path):
+                    continue
+                info = cls._read_config(scanner, config_path, products)
+                if info is None or info.get('product_name') is None:
+                    continue
+                products.append({
+                    'company': company,
+                    "name": info.get('product_name'),
+                    'product_config_path': product_path,
+                    'product_path': product_path,
+                    'version': info.get('version', '3.0'),
+                    'os_level': info.get('type', "mini"),
+                    'config': config_path,
+                    'component_type': info.get('component_type', ''),
+                    'compile_mode': info.get('compile_mode', 'cross')
+                })
+
+    @classmethod
+    def _scan_built_in_products(cls, scanner: _ProductScanner, bip_path: str, products: list):
+        for item in scanner.listdir(bip_path):
+            if item[0] in ".":
+                continue
+            product_name = item[0:-len('.json')] if item.endswith('.json') else item
+            config_path = os.path.join(bip_path, item)
+            info = cls._read_config(scanner, config_path, products)
+            if info is None:
+                continue
+            products.append({
+                'company': 'built-in',
+                "name": product_name,
+                'product_config_path': bip_path,
+                'product_path': bip_path,
+                'version': info.get('version', '2.0'),
+                'os_level': info.get('type', 'standard'),
+                'config': config_path,
+                'component_type': info.get('component_type', ''),
+                'compile_mode': info.get('compile_mode', 'cross')
+            })
+
+    @classmethod
+    def _read_cache(cls, cache_file: str, paths: list):
+        if not cache_file or not os.path.isfile(cache_file):
+            return None
+        try:
+            with open(cache_file, 'r') as cache_f:
+                cache_data = json.load(cache_f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cache_data, dict) or cache_data.get('version') != PRODUCT_CATALOGUE_VERSION \
+                or cache_data.get('paths') != paths:
+            return None
+        sources = cache_data.get('sources', {})
+        for path, key in sources.items():
+            if _stat_key(path) != key:
+                return None
+        return cls(cache_data.get('products', []), sources)
+
+    def _write_cache(self, cache_file: str, paths: list):
+        cache_data = {
+            'version': PRODUCT_CATALOGUE_VERSION,
+            'paths': paths,
+            'sources': self.sources,
+            'products': self.products
+        }
+        tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+            with open(tmp_file, 'w') as cache_f:
+                json.dump(cache_data, cache_f, separators=(',', ':'))
+            os.replace(tmp_file, cache_file)
+        except OSError as err:
+            LogUtil.hb_warning('write product catalogue {} failed: {}'.format(cache_file, err))
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
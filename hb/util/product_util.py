@@ -20,6 +20,7 @@ import re
 from collections import defaultdict
 
 from util.io_util import IoUtil
+from util.product_catalogue import ProductCatalogue, PRODUCT_CATALOGUE_FILE
 from exceptions.ohos_exception import OHOSException
 from resources.config import Config
 from containers.status import throw_exception
@@ -41,131 +42,16 @@ class ProductUtil(metaclass=NoInstance):
         return 'x86_64'
 
     @staticmethod
-    def get_products():
+    def get_product_catalogue() -> ProductCatalogue:
         config = Config()
-        # ext products configuration
-        _ext_scan_path = os.path.join(config.root_path,
-                                      'out/products_ext/vendor')
-        if os.path.exists(_ext_scan_path):
-            for company in os.listdir(_ext_scan_path):
-                company_path = os.path.join(_ext_scan_path, company)
-                if not os.path.isdir(company_path):
-                    continue
-
-                for product in os.listdir(company_path):
-                    p_config_path = os.path.join(company_path, product)
-                    config_path = os.path.join(p_config_path, 'config.json')
-
-                    if os.path.isfile(config_path):
-                        info = IoUtil.read_json_file(config_path)
-                        product_name = info.get('product_name')
-                        if info.get('product_path'):
-                            product_path = os.path.join(
-                                config.root_path, info.get('product_path'))
-                        else:
-                            product_path = p_config_path
-                        if product_name is not None:
-                            subsystem_config_overlay_path = os.path.join(product_path,
-                                'subsystem_config_overlay.json')
-                            if os.path.isfile(subsystem_config_overlay_path):
-                                yield {
-                                    'company': company,
-                                    "name": product_name,
-                                    'product_config_path': p_config_path,
-                                    'product_path': product_path,
-                                    'version': info.get('version', '3.0'),
-                                    'os_level': info.get('type', "mini"),
-                                    'build_out_path': info.get('build_out_path'),
-                                    'subsystem_config_json':
-                                    info.get('subsystem_config_json'),
-                                    'subsystem_config_overlay_json':
-                                    subsystem_config_overlay_path,
-                                    'config': config_path,
-                                    'component_type': info.get('component_type', ''),
-                                    'compile_mode': info.get('compile_mode', 'cross')
-                                }
-                            else:
-                                yield {
-                                    'company': company,
-                                    "name": product_name,
-                                    'product_config_path': p_config_path,
-                                    'product_path': product_path,
-                                    'version': info.get('version', '3.0'),
-                                    'os_level': info.get('type', "mini"),
-                                    'build_out_path': info.get('build_out_path'),
-                                    'subsystem_config_json':
-                                    info.get('subsystem_config_json'),
-                                    'config': config_path,
-                                    'component_type': info.get('component_type', ''),
-                                    'compile_mode': info.get('compile_mode', 'cross')
-                                }
-        if config.vendor_path != '':
-            for company in os.listdir(config.vendor_path):
-                company_path = os.path.join(config.vendor_path, company)
-                if not os.path.isdir(company_path):
-                    continue
-
-                for product in os.listdir(company_path):
-                    product_path = os.path.join(company_path, product)
-                    config_path = os.path.join(product_path, 'config.json')
-
-                    if os.path.isfile(config_path):
-                        info = IoUtil.read_json_file(config_path)
-                        product_name = info.get('product_name')
-                        if product_name is not None:
-                            yield {
-                                'company': company,
-                                "name": product_name,
-                                'product_config_path': product_path,
-                                'product_path': product_path,
-                                'version': info.get('version', '3.0'),
-                                'os_level': info.get('type', "mini"),
-                                'config': config_path,
-                                'component_type': info.get('component_type', ''),
-                                'compile_mode': info.get('compile_mode', 'cross')
-                            }
-        bip_path = config.built_in_product_path
-        for item in os.listdir(bip_path):
-            if item[0] in ".":
-                continue
-            else:
-                product_name = item[0:-len('.json')
-                                    ] if item.endswith('.json') else item
-                config_path = os.path.join(bip_path, item)
-                info = IoUtil.read_json_file(config_path)
-                yield {
-                    'company': 'built-in',
-                    "name": product_name,
-                    'product_config_path': bip_path,
-                    'product_path': bip_path,
-                    'version': info.get('version', '2.0'),
-                    'os_level': info.get('type', 'standard'),
-                    'config': config_path,
-                    'component_type': info.get('component_type', ''),
-                    'compile_mode': info.get('compile_mode', 'cross')
-                }
+        return ProductCatalogue.get(config.root_path,
+                                    config.built_in_product_path,
+                                    config.built_in_product_path_for_llvm,
+                                    os.path.join(config.root_path, 'out', PRODUCT_CATALOGUE_FILE))
 
-        bipl_path = config.built_in_product_path_for_llvm
-        if os.path.isdir(bipl_path):
-            for item in os.listdir(bipl_path):
-                if item[0] in ".":
-                    continue
-                else:
-                    product_name = item[0:-len('.json')
-                                        ] if item.endswith('.json') else item
-                    config_path = os.path.join(bipl_path, item)
-                    info = IoUtil.read_json_file(config_path)
-                    yield {
-                        'company': 'built-in',
-                        "name": product_name,
-                        'product_config_path': bipl_path,
-                        'product_path': bipl_path,
-                        'version': info.get('version', '2.0'),
-                        'os_level': info.get('type', 'standard'),
-                        'config': config_path,
-                        'component_type': info.get('component_type', ''),
-                        'compile_mode': info.get('compile_mode', 'cross')
-                    }
+    @staticmethod
+    def get_products():
+        yield from ProductUtil.get_product_catalogue().iter_products()
 
     @staticmethod
     @throw_exception
@@ -338,15 +224,9 @@ class ProductUtil(metaclass=NoInstance):
     @staticmethod
     @throw_exception
     def get_product_info(product_name: str, company=None):
-        for product_info in ProductUtil.get_products():
-            cur_company = product_info['company']
-            cur_product = product_info['name']
-            if company:
-                if cur_company == company and cur_product == product_name:
-                    return product_info
-            else:
-                if cur_product == product_name:
-                    return product_info
+        product_info = ProductUtil.get_product_catalogue().find(product_name, company)
+        if product_info is not None:
+            return product_info
 
         raise OHOSException(f'product {product_name}@{company} not found')
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import time
+import threading
+from array import array
+
+from scripts.util.resource_samples import SAMPLE_COLUMNS, write_samples
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+MB_CONSTANT = 1024 * 1024
+PRESSURE_RESOURCES = ('cpu', 'memory', 'io')
+# 10 hours at the default interval, older samples are overwritten
+DEFAULT_CAPACITY = 36000
+
+
+def read_cpu_times():
+    """Total and idle+iowait and iowait jiffies of all cpus from /proc/stat."""
+    with open('/proc/stat', 'r') as stat_f:
+        fields = stat_f.readline().split()[1:]
+    values = [int(field) for field in fields[:8]]
+    idle, iowait = values[3], values[4]
+    return sum(values), idle + iowait, iowait
+
+
+def read_meminfo():
+    """Used memory and used swap in bytes from /proc/meminfo."""
+    info = {}
+    with open('/proc/meminfo', 'r') as meminfo_f:
+        for line in meminfo_f:
+            key, _, value = line.partition(':')
+            if key in ('MemTotal', 'MemAvailable', 'SwapTotal', 'SwapFree'):
+                info[key] = int(value.split()[0]) * 1024
+    return (info.get('MemTotal', 0) - info.get('MemAvailable', 0),
+            info.get('SwapTotal', 0) - info.get('SwapFree', 0))
+
+
+def read_pressure(resource: str):
+    """Total stall time in microseconds of some and of all tasks, None
+    when the kernel has no pressure stall information."""
+    try:
+        with open('/proc/pressure/{}'.format(resource), 'r') as pressure_f:
+            totals = {}
+            for line in pressure_f:
+                kind, *fields = line.split()
+                totals[kind] = int(fields[-1].split('=')[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return totals.get('some', 0), totals.get('full', 0)
+
+
+def read_process_tree_rss(root_pid: int):
+    """Resident memory in bytes and number of the processes in the tree of root_pid."""
+    children = {}
+    rss_pages = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(entry), 'rb') as stat_f:
+                data = stat_f.read()
+        except OSError:
+            continue
+        # the command name may contain spaces, the fields follow its closing parenthesis
+        fields = data[data.rfind(b')') + 2:].split()
+        pid = int(entry)
+        children.setdefault(int(fields[1]), []).append(pid)
+        rss_pages[pid] = int(fields[21])
+    total_pages = 0
+    count = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total_pages += rss_pages.get(pid, 0)
+        count += 1
+        stack.extend(children.get(pid, ()))
+    return total_pages * PAGE_SIZE, count
+
+
+class PhaseStat():
+    __slots__ = ('samples', 'seconds', 'cpu_busy', 'peak_build_rss', 'peak_mem_used', 'stalls')
+
+    def __init__(self):
+        self.samples = 0
+        self.seconds = 0.0
+        self.cpu_busy = 0.0
+        self.peak_build_rss = 0.0
+        self.peak_mem_used = 0.0
+        self.stalls = [0.0] * 4
+
+
+class ResourceSampler():
+    """Background sampler of the machine and of the process tree of hb.
+
+    Reads /proc/stat, /proc/meminfo, /proc/pressure/* and /proc/<pid>/stat
+    directly every interval seconds and keeps the samples in a columnar ring
+    buffer, together with the hb phase running at that time. The per phase
+    statistics are accumulated as the samples are taken, so they cover the
+    whole build even when the ring buffer wrapped.
+    """
+
+    def __init__(self, interval: float = 1.0, capacity: int = DEFAULT_CAPACITY, root_pid: int = None):
+        self.interval = interval
+        self.capacity = capacity
+        self.root_pid = root_pid or os.getpid()
+        self.phases = ['NONE']
+        self.phase_stats = {}
+        self._phase = 0
+        self._columns = {name: array('d', [0.0]) * capacity for name in SAMPLE_COLUMNS}
+        self._phase_indices = array('B', [0]) * capacity
+        self._count = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_cpu = None
+        self._last_pressure = None
+        self._last_time = None
+
+    @staticmethod
+    def is_supported() -> bool:
+        return os.path.isfile('/proc/stat') and os.path.isfile('/proc/meminfo')
+
+    def start(self) -> bool:
+        if not self.is_supported() or self._thread is not None:
+            return False
+        self._take_sample()
+        self._thread = threading.Thread(target=self._run, name='resource-sampler', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            self._take_sample()
+        except (OSError, ValueError, IndexError):
+            pass
+
+    def set_phase(self, phase: str):
+        with self._lock:
+            if phase not in self.phases:
+                self.phases.append(phase)
+            self._phase = self.phases.index(phase)
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._take_sample()
+            except (OSError, ValueError, IndexError):
+                # a process exiting while it is read, skip this sample
+                continue
+
+    def _pressure_totals(self):
+        totals = []
+        for resource in PRESSURE_RESOURCES:
+            pressure = read_pressure(resource)
+            totals.append(pressure if pressure is not None else (0, 0))
+        # cpu some, memory some, memory full, io some
+        return totals[0][0], totals[1][0], totals[1][1], totals[2][0]
+
+    def _take_sample(self):
+        now = time.time()
+        cpu_times = read_cpu_times()
+        mem_used, swap_used = read_meminfo()
+        build_rss, build_processes = read_process_tree_rss(self.root_pid)
+        pressure = self._pressure_totals()
+
+        cpu_busy = cpu_iowait = 0.0
+        stalls = [0.0] * 4
+        if self._last_cpu is not None:
+            total = cpu_times[0] - self._last_cpu[0]
+            if total > 0:
+                cpu_busy = 100.0 * (total - (cpu_times[1] - self._last_cpu[1])) / total
+                cpu_iowait = 100.0 * (cpu_times[2] - self._last_cpu[2]) / total
+            stalls = [(current - last) / 1000.0 for current, last in zip(pressure, self._last_pressure)]
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        self._last_cpu, self._last_pressure, self._last_time = cpu_times, pressure, now
+
+        values = (now, cpu_busy, cpu_iowait, mem_used / MB_CONSTANT, swap_used / MB_CONSTANT,
+                  build_rss / MB_CONSTANT, build_processes) + tuple(stalls)
+        with self._lock:
+            slot = self._count % self.capacity
+            for name, value in zip(SAMPLE_COLUMNS, values):
+                self._columns[name][slot] = value
+            self._phase_indices[slot] = self._phase
+            self._count += 1
+            self._accumulate(self.phases[self._phase], elapsed, cpu_busy, build_rss / MB_CONSTANT,
+                             mem_used / MB_CONSTANT, stalls)
+
+    def _accumulate(self, phase, elapsed, cpu_busy, build_rss, mem_used, stalls):
+        phase_stat = self.phase_stats.get(phase)
+        if phase_stat is None:
+            phase_stat = PhaseStat()
+            self.phase_stats[phase] = phase_stat
+        if elapsed > 0:
+            phase_stat.samples += 1
+            phase_stat.seconds += elapsed
+            phase_stat.cpu_busy += cpu_busy * elapsed
+            phase_stat.stalls = [total + stall for total, stall in zip(phase_stat.stalls, stalls)]
+        phase_stat.peak_build_rss = max(phase_stat.peak_build_rss, build_rss)
+        phase_stat.peak_mem_used = max(phase_stat.peak_mem_used, mem_used)
+
+    def save(self, sample_file: str):
+        """Write the samples in the ring buffer, oldest first."""
+        with self._lock:
+            count = min(self._count, self.capacity)
+            first = self._count - count
+            order = [(first + i) % self.capacity for i in range(count)]
+            columns = {name: [values[slot] for slot in order] for name, values in self._columns.items()}
+            phase_indices = array('B', [self._phase_indices[slot] for slot in order])
+            phases = list(self.phases)
+        write_samples(sample_file, columns, phase_indices, phases)
+
+    def summary(self) -> list:
+        lines = ['{:<10} {:>9} {:>9} {:>14} {:>14} {:>10} {:>10} {:>10} {:>10}'.format(
+            'phase', 'time(s)', 'cpu(%)', 'peak rss(MB)', 'peak mem(MB)',
+            'cpu stall', 'mem stall', 'mem full', 'io stall')]
+        with self._lock:
+            for phase in self.phases:
+                phase_stat = self.phase_stats.get(phase)
+                if phase_stat is None or not phase_stat.samples:
+                    continue
+                lines.append('{:<10} {:>9.1f} {:>9.1f} {:>14.0f} {:>14.0f} {:>9.1f}s {:>9.1f}s {:>9.1f}s {:>9.1f}s'.format(
+                    phase, phase_stat.seconds, phase_stat.cpu_busy / phase_stat.seconds,
+                    phase_stat.peak_build_rss, phase_stat.peak_mem_used,
+                    *[stall / 1000.0 for stall in phase_stat.stalls]))
+            peak_rss = max((stat.peak_build_rss for stat in self.phase_stats.values()), default=0)
+        lines.append('peak RSS of the build processes: {:.0f} MB'.format(peak_rss))
+        return lines
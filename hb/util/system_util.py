@@ -111,6 +111,8 @@ class SystemUtil(metaclass=NoInstance):
 
         HandleKwargs.print_pre_msg(custom_kwargs)
         hidden_pattern = SensitiveHidden.load_sensitive_conf()
+        # only the output of this command is analyzed if it fails
+        log_start_offset = os.path.getsize(log_path) if os.path.exists(log_path) else 0
         max_try = custom_kwargs.get("max_try", 1)
         while max_try > 0:
             with open(log_path, 'at', encoding='utf-8') as log_file:
@@ -139,7 +141,7 @@ class SystemUtil(metaclass=NoInstance):
         if ret_code != 0:
             cmd_str = " ".join(cmd)
             LogUtil.hb_error(f"command failed: \"{cmd_str}\" , ret_code: {ret_code}")
-            LogUtil.get_failed_log(log_path, cmd)
+            LogUtil.get_failed_log(log_path, cmd, log_start_offset)
 
     @staticmethod
     def get_current_time(time_type: str = 'default'):
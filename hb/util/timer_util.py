@@ -17,6 +17,7 @@
 #
 import time
 from util.log_util import LogUtil
+from util.build_timeline import BuildTimeline
 
 
 class TimerUtil():
@@ -27,7 +28,8 @@ class TimerUtil():
     def cost_time(func):
         def inner(*arg, **kwarg):
             s_time = time.monotonic()
-            res = func(*arg, **kwarg)
+            with BuildTimeline.span(func.__name__):
+                res = func(*arg, **kwarg)
             e_time = time.monotonic()
             LogUtil.hb_info("The run time for {} is {} s".format(func.__name__, round(e_time - s_time, 2)))
             return res
@@ -15,10 +15,13 @@
 
 import sys
 import os
+import io
 import stat
 import json
+import hashlib
 import argparse
 import zipfile
+import multiprocessing
 
 from collections import Counter
 
@@ -80,6 +83,10 @@ _INVALID_EVENT_PARAM_DEF = "invalid definition type for event param"
 _INVALID_PARAM_TYPE_DEF = "invalid definition type for param type"
 _INVALID_PARAM_ARRSIZE_DEF = "invalid definition type for param arrsize"
 _INVALID_PARAM_DESC_DEF = "invalid definition type for param desc"
+_YAML_CACHE_FILE = "hisysevent_yaml_cache.json"
+_ZIP_TIMESTAMP = (2001, 1, 1, 0, 0, 0)
+# yaml files parsed in the main process below this number of changed files
+_PARALLEL_MIN_FILES = 8
 _WARNING_MAP = {
     _EMPTY_YAML :
         "The yaml file list is empty.",
@@ -227,7 +234,7 @@ _hisysevent_parse_res = True
 _deprecated_dict = {}
 
 
-class _UniqueKeySafeLoader(yaml.SafeLoader):
+class _UniqueKeyMixin():
     def construct_mapping(self, node, deep=False):
         mapping = []
         for key_node, value_node in node.value:
@@ -242,6 +249,26 @@ class _UniqueKeySafeLoader(yaml.SafeLoader):
         return super().construct_mapping(node, deep)
 
 
+class _UniqueKeySafeLoader(_UniqueKeyMixin, yaml.SafeLoader):
+    pass
+
+
+if getattr(yaml, "__with_libyaml__", False):
+    class _UniqueKeyCSafeLoader(_UniqueKeyMixin, yaml.CSafeLoader):
+        pass
+
+    _YAML_LOADER = _UniqueKeyCSafeLoader
+else:
+    _YAML_LOADER = _UniqueKeySafeLoader
+
+
+class _NamedBytesIO(io.BytesIO):
+    # the name of the yaml file in the marks of the loader
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+
+
 def _build_header(info_dict: dict):
     table_header = "HiSysEvent yaml file: <<%s>>" % _yaml_file_path
     info_dict[_yaml_file_path] = [table_header]
@@ -346,6 +373,7 @@ def _check_domain_duplicate(domain: str) -> bool:
 
 
 def _check_event_domain(yaml_info: dict) -> bool:
+    # the duplicate check over all yaml files is done when they are merged
     if not "domain" in yaml_info:
         _build_warning_info(_INVALID_DOMAIN_NUMBER, ())
         return False
@@ -364,8 +392,6 @@ def _check_event_domain(yaml_info: dict) -> bool:
     if invalid_ch:
         _build_warning_info(_INVALID_DOMAIN_CHAR, (domain, invalid_ch))
         check_res = False
-    if not _check_domain_duplicate(domain):
-        check_res = False
     return check_res
 
 
@@ -711,6 +737,140 @@ def _check_events_info(domain: str, yaml_info: str) -> bool:
     return check_res
 
 
+def _check_yaml_file(yaml_path: str) -> dict:
+    """Load and check one yaml file on its own.
+
+    Returns the warnings of the domain checks and of the event checks apart,
+    as the event checks only count when the domain is not defined twice in
+    the merged yaml files.
+    """
+    global _warning_dict, _deprecated_dict, _yaml_file_path, _hisysevent_parse_res
+    saved_state = (_warning_dict, _deprecated_dict, _yaml_file_path, _hisysevent_parse_res)
+    _warning_dict, _deprecated_dict, _hisysevent_parse_res = {}, {}, True
+    _yaml_file_path = yaml_path.replace("../", "")
+    try:
+        _build_warning_header()
+        header_size = len(_warning_dict[_yaml_file_path])
+        with os.fdopen(os.open(yaml_path, os.O_RDWR | os.O_CREAT, stat.S_IWUSR | stat.S_IRUSR),
+            'rb') as yaml_file:
+            data = yaml_file.read()
+        with io.TextIOWrapper(_NamedBytesIO(data, yaml_path), encoding='utf-8') as yaml_stream:
+            yaml_info = yaml.load(yaml_stream, Loader=_YAML_LOADER)
+        result = {"sha256": hashlib.sha256(data).hexdigest(),
+                  "load_ok": _hisysevent_parse_res, "format_ok": False, "domain": None,
+                  "domain_ok": False, "events_ok": False, "events": None, "deprecated": None}
+        warnings = _warning_dict[_yaml_file_path]
+        if _check_yaml_format(yaml_info):
+            result["format_ok"] = True
+            if isinstance(yaml_info.get("domain"), str):
+                result["domain"] = yaml_info["domain"]
+            result["domain_ok"] = _check_event_domain(yaml_info)
+        result["domain_warnings"] = warnings[header_size:]
+        if result["domain_ok"]:
+            del warnings[header_size:]
+            domain = yaml_info["domain"]
+            del yaml_info["domain"]
+            result["events_ok"] = _check_events_info(domain, yaml_info)
+            if result["events_ok"]:
+                result["events"] = yaml_info
+            result["deprecated"] = _deprecated_dict.get(_yaml_file_path)
+        result["event_warnings"] = warnings[header_size:] if result["domain_ok"] else []
+        return result
+    finally:
+        _warning_dict, _deprecated_dict, _yaml_file_path, _hisysevent_parse_res = saved_state
+
+
+def _yaml_file_hash(yaml_path: str):
+    if not os.path.isfile(yaml_path):
+        return None
+    sha256 = hashlib.sha256()
+    with open(yaml_path, 'rb') as yaml_file:
+        sha256.update(yaml_file.read())
+    return sha256.hexdigest()
+
+
+def _checker_version() -> str:
+    # cached results are dropped when the checks or the loader change
+    sha256 = hashlib.sha256(_YAML_LOADER.__name__.encode())
+    with open(os.path.abspath(__file__), 'rb') as script_file:
+        sha256.update(script_file.read())
+    return sha256.hexdigest()
+
+
+def _load_yaml_cache(cache_file: str, version: str) -> dict:
+    try:
+        with open(cache_file, 'r') as cache_f:
+            cache = json.load(cache_f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != version:
+        return {}
+    return cache.get("files", {})
+
+
+def _save_yaml_cache(cache_file: str, version: str, files: dict):
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        with open(tmp_file, 'w') as cache_f:
+            json.dump({"version": version, "files": files}, cache_f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError):
+        # the cache is optional, events json cannot dump fail the merge below
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _check_yaml_files(yaml_list: list, output_path: str) -> list:
+    """Results of _check_yaml_file in the order of yaml_list, reusing the
+    cached results of the yaml files whose content did not change."""
+    cache_file = os.path.join(output_path, _YAML_CACHE_FILE)
+    version = _checker_version()
+    cached_files = _load_yaml_cache(cache_file, version)
+    results = {}
+    file_hashes = {}
+    changed = []
+    for yaml_path in yaml_list:
+        if yaml_path in file_hashes:
+            continue
+        file_hashes[yaml_path] = _yaml_file_hash(yaml_path)
+        cached = cached_files.get(yaml_path)
+        if file_hashes[yaml_path] is not None and isinstance(cached, dict) and \
+                cached.get("sha256") == file_hashes[yaml_path]:
+            results[yaml_path] = cached["result"]
+        else:
+            changed.append(yaml_path)
+
+    jobs = min(os.cpu_count() or 1, len(changed))
+    if jobs > 1 and len(changed) >= _PARALLEL_MIN_FILES:
+        with multiprocessing.Pool(jobs) as pool:
+            results.update(zip(changed, pool.map(_check_yaml_file, changed)))
+    else:
+        results.update((yaml_path, _check_yaml_file(yaml_path)) for yaml_path in changed)
+
+    if changed:
+        _save_yaml_cache(cache_file, version, {
+            yaml_path: {"sha256": result["sha256"], "result": result}
+            for yaml_path, result in results.items()})
+    return [results[yaml_path] for yaml_path in yaml_list]
+
+
+def _write_def_zip(yaml_info_dict: dict, hisysevent_def_zip_file: str):
+    # fixed timestamp and mode, unchanged events keep the bytes of the zip
+    def_info = zipfile.ZipInfo('hisysevent.def', date_time=_ZIP_TIMESTAMP)
+    def_info.external_attr = (0o644 << 16)
+    def_info.compress_type = zipfile.ZIP_DEFLATED
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as def_zip_file:
+        def_zip_file.writestr(def_info, json.dumps(yaml_info_dict, indent=4))
+    zip_data = zip_buffer.getvalue()
+    if os.path.isfile(hisysevent_def_zip_file):
+        with open(hisysevent_def_zip_file, 'rb') as zip_file:
+            if zip_file.read() == zip_data:
+                return
+    with open(hisysevent_def_zip_file, 'wb') as zip_file:
+        zip_file.write(zip_data)
+
+
 def merge_hisysevent_config(yaml_list: str, output_path: str) -> str:
     if (len(output_path) == 0):
         present_path = os.path.dirname(os.path.abspath(__file__))
@@ -724,43 +884,38 @@ def merge_hisysevent_config(yaml_list: str, output_path: str) -> str:
 
     yaml_info_dict = {}
     global _hisysevent_parse_res
-    for yaml_path in yaml_list:
+    for yaml_path, result in zip(yaml_list, _check_yaml_files(yaml_list, output_path)):
         global _yaml_file_path
         _yaml_file_path = yaml_path.replace("../", "")
         _build_warning_header()
-        with os.fdopen(os.open(yaml_path, os.O_RDWR | os.O_CREAT, stat.S_IWUSR | stat.S_IRUSR),
-            'r', encoding='utf-8') as yaml_file:
-            yaml_info = yaml.load(yaml_file, Loader=_UniqueKeySafeLoader)
-        if not _check_yaml_format(yaml_info):
+        _warning_dict[_yaml_file_path].extend(result["domain_warnings"])
+        if not result["load_ok"]:
+            _hisysevent_parse_res = False
+        if not result["format_ok"]:
             _hisysevent_parse_res = False
             continue
-        if not _check_event_domain(yaml_info):
+        domain_ok = result["domain_ok"]
+        if result["domain"] is not None and not _check_domain_duplicate(result["domain"]):
+            domain_ok = False
+        if not domain_ok:
             _hisysevent_parse_res = False
             continue
-        domain = yaml_info["domain"]
-        del yaml_info["domain"]
-        if not _check_events_info(domain, yaml_info):
+        _warning_dict[_yaml_file_path].extend(result["event_warnings"])
+        if result["deprecated"]:
+            _deprecated_dict[_yaml_file_path] = list(result["deprecated"])
+        if not result["events_ok"]:
             _hisysevent_parse_res = False
             continue
-        yaml_info_dict[domain] = yaml_info
+        yaml_info_dict[result["domain"]] = result["events"]
     _output_deprecated(output_path)
     if not _hisysevent_parse_res:
         _exit_sys()
 
-    hisysevent_def_file = os.path.join(output_path, 'hisysevent.def')
-    with open(hisysevent_def_file, 'w') as j:
-        json.dump(yaml_info_dict, j, indent=4)
-    print("The hisysevent.def {} is generated successfully."
-        .format(hisysevent_def_file))
-    _close_warning_file()
-
-    # zip def file
     hisysevent_def_zip_file = os.path.join(output_path, 'hisysevent.zip')
-    def_zip_file = zipfile.ZipFile(hisysevent_def_zip_file, "w", zipfile.ZIP_DEFLATED)
-    def_zip_file.write(hisysevent_def_file, arcname=os.path.basename(hisysevent_def_file))
-    def_zip_file.close()
-    # remove def file
-    os.remove(hisysevent_def_file)
+    _write_def_zip(yaml_info_dict, hisysevent_def_zip_file)
+    print("The hisysevent.zip {} is generated successfully."
+        .format(hisysevent_def_zip_file))
+    _close_warning_file()
 
     return hisysevent_def_zip_file
 
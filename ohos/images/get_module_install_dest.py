@@ -50,25 +50,43 @@ def gen_install_dests(system_base_dir: str, source_file_name: str, install_image
     return dest
 
 
+def read_allowed_lib_list(allowed_lib_list: str):
+    """read install dests from allowed lib list, leading '/' removed"""
+    with open(allowed_lib_list, 'r') as f:
+        lines = f.readlines()
+    return [line.strip()[1:] for line in lines]
+
+
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--system-base-dir', required=True,
+    parser.add_argument('--system-base-dir', required=False,
                         help='system base dir')
     parser.add_argument('--install-images', nargs='+', help='install images')
     parser.add_argument('--module-install-dir', required=False,
                         default='', help='module install dir')
     parser.add_argument('--relative-install-dir', required=False,
                         default='', help='relative install dir')
-    parser.add_argument('--type', required=True, help='module type')
-    parser.add_argument('--install-name', required=True,
+    parser.add_argument('--type', required=False, help='module type')
+    parser.add_argument('--install-name', required=False,
                         help='module install name')
     parser.add_argument('--prefix-override', dest='prefix_override',
                         action='store_true', help='prefix override')
     parser.set_defaults(prefix_override=False)
     parser.add_argument('--suffix', required=False, default='', help='suffix')
     parser.add_argument('--allowed-lib-list', help='')
+    parser.add_argument('--list-allowed-libs', action='store_true',
+                        help='print all allowed install dests, one per line')
     args = parser.parse_args()
 
+    if args.list_allowed_libs:
+        for line in read_allowed_lib_list(args.allowed_lib_list):
+            print(line)
+        return 0
+    for required_arg in ('system_base_dir', 'type', 'install_name'):
+        if getattr(args, required_arg) is None:
+            parser.error('the following arguments are required: --{}'.format(
+                required_arg.replace('_', '-')))
+
     source_file_name = ''
     source_file_name, alt_source_file_name = get_source_name(
         args.type, args.install_name, args.prefix_override, args.suffix)
@@ -76,9 +94,7 @@ def main():
     if args.install_images:
         install_dest = gen_install_dests(args.system_base_dir, source_file_name, args.install_images,
                                          args.module_install_dir, args.relative_install_dir, args.type)
-    with open(args.allowed_lib_list, 'r') as f:
-        lines = f.readlines()
-    lines = [line.strip()[1:] for line in lines]
+    lines = read_allowed_lib_list(args.allowed_lib_list)
     if install_dest in lines:
         return 0
     else:
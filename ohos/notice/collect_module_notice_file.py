@@ -16,8 +16,10 @@
 import sys
 import argparse
 import os
+import json
 import shutil
 import stat
+import hashlib
 
 sys.path.append(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
 from scripts.util.file_utils import read_json_file, write_json_file  # noqa: E402
@@ -68,11 +70,113 @@ def find_file_recursively(current_dir: str, target_files: list):
     return find_file_recursively(os.path.dirname(current_dir), target_files)
 
 
+class LicenseIndex():
+    """Index of directory -> license file and README.OpenSource found by
+    find_file_recursively, shared by the actions of all modules.
+
+    Every directory walked gets one entry in the index dir with the file
+    found for it and the mtimes of the directories from it up to the one the
+    file (or .gn) was found in. Adding, removing or renaming a file in any of
+    them changes that mtime, so a stale entry is walked again. The entries of
+    the parent directories are reused, sibling modules only walk the levels
+    that no module walked before.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self._memo = {}
+
+    def find(self, kind: str, current_dir: str, target_files: list):
+        abs_dir = os.path.abspath(current_dir)
+        entry = self._lookup(kind, abs_dir, target_files)
+        # map the result back to the form of current_dir, walking its
+        # dirnames in step with the directories of the entry
+        found_dir = current_dir
+        for index, (level, _) in enumerate(entry['chain']):
+            if os.path.abspath(found_dir) != level:
+                return find_file_recursively(current_dir, target_files)
+            if index < len(entry['chain']) - 1:
+                found_dir = os.path.dirname(found_dir)
+        if entry['file'] is None:
+            return None
+        return os.path.join(found_dir, entry['file'])
+
+    def _entry_file(self, kind: str, abs_dir: str):
+        key = hashlib.sha1(abs_dir.encode('utf-8', errors='surrogateescape')).hexdigest()
+        return os.path.join(self.index_dir, kind, key[:2], '{}.json'.format(key))
+
+    def _lookup(self, kind: str, abs_dir: str, target_files: list):
+        memo_key = (kind, abs_dir)
+        entry = self._memo.get(memo_key)
+        if entry is None:
+            entry = self._load(kind, abs_dir)
+            if entry is None:
+                entry = self._walk(kind, abs_dir, target_files)
+            self._memo[memo_key] = entry
+        return entry
+
+    def _load(self, kind: str, abs_dir: str):
+        try:
+            with open(self._entry_file(kind, abs_dir), 'r') as entry_f:
+                entry = json.load(entry_f)
+            if entry.get('dir') != abs_dir:
+                return None
+            for level, mtime_ns in entry['chain']:
+                if os.stat(level).st_mtime_ns != mtime_ns:
+                    return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return entry
+
+    def _walk(self, kind: str, abs_dir: str, target_files: list):
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        entry = {'dir': abs_dir, 'file': None, 'chain': [[abs_dir, mtime_ns]]}
+        if not is_top_dir(abs_dir):
+            for file in target_files:
+                if os.path.isfile(os.path.join(abs_dir, file)):
+                    entry['file'] = file
+                    break
+            else:
+                parent_dir = os.path.dirname(abs_dir)
+                if parent_dir == abs_dir:
+                    # no .gn up to the root, fail as the walk without index does
+                    return find_file_recursively(abs_dir, target_files)
+                parent_entry = self._lookup(kind, parent_dir, target_files)
+                entry['file'] = parent_entry['file']
+                entry['chain'].extend(parent_entry['chain'])
+        if all(level_mtime is not None for _, level_mtime in entry['chain']):
+            self._save(kind, entry)
+        return entry
+
+    def _save(self, kind: str, entry: dict):
+        entry_file = self._entry_file(kind, entry['dir'])
+        tmp_file = '{}.{}.tmp'.format(entry_file, os.getpid())
+        try:
+            os.makedirs(os.path.dirname(entry_file), exist_ok=True)
+            with open(tmp_file, 'w') as entry_f:
+                json.dump(entry, entry_f)
+            os.replace(tmp_file, entry_file)
+        except OSError:
+            # the index is only a cache
+            if os.path.exists(tmp_file):
+                os.unlink(tmp_file)
+
+
+_license_index = None
+
+
 def find_license(current_dir: str):
+    if _license_index is not None:
+        return _license_index.find('license', current_dir, LICENSE_CANDIDATES)
     return find_file_recursively(current_dir, LICENSE_CANDIDATES)
 
 
 def find_opensource(current_dir: str):
+    if _license_index is not None:
+        return _license_index.find('opensource', current_dir, [README_FILE_NAME])
     return find_file_recursively(current_dir, [README_FILE_NAME])
 
 
@@ -253,10 +357,17 @@ def main(args):
     parser.add_argument('--module-source-dir',
                         help='source directory of this module',
                         required=True)
+    parser.add_argument('--license-index-dir',
+                        help='directory of the license discovery index shared by all modules',
+                        required=False)
 
     options = parser.parse_args()
     depfiles = []
 
+    global _license_index
+    if options.license_index_dir:
+        _license_index = LicenseIndex(options.license_index_dir)
+
     if options.sdk_install_info_file:
         install_dir = ''
         sdk_install_info = read_json_file(options.sdk_install_info_file)
@@ -20,10 +20,12 @@ import os
 import os.path
 import sys
 import gzip
+import locale
 import shutil
 import glob
 import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(
     os.path.dirname(os.path.dirname(os.path.dirname(
@@ -38,6 +40,7 @@ xml_escape_table = {
     ">": "&gt;",
     "<": "&lt;",
 }
+HASH_CHUNK_SIZE = 1024 * 1024
 
 
 def move_static_library_notices(options):
@@ -126,17 +129,36 @@ def write_file(file: str, string: str):
 def compute_hash(file: str):
     sha256 = hashlib.sha256()
     with open(file, 'rb') as file_fd:
-        for line in file_fd:
-            sha256.update(line)
+        for chunk in iter(lambda: file_fd.read(HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
     return sha256.hexdigest()
 
 
+def hash_notice_file(file: str):
+    """Hash of a notice file and the contents of its .json, None for an empty file."""
+    if os.stat(file).st_size == 0:
+        return None
+    return compute_hash(file), read_json_file('{}.json'.format(file))
+
+
+def hashable_contents(contents):
+    """Hashable form of json contents, equal exactly when the contents are equal."""
+    if isinstance(contents, dict):
+        return frozenset((key, hashable_contents(value)) for key, value in contents.items())
+    if isinstance(contents, list):
+        return tuple(hashable_contents(value) for value in contents)
+    return contents
+
+
 def get_entity(text: str):
-    return "".join(xml_escape_table.get(c, c) for c in text)
+    # '&' first, the other entities add it
+    for char, entity in xml_escape_table.items():
+        text = text.replace(char, entity)
+    return text
 
 
 def generate_txt_notice_files(file_hash: str, input_dir: str, output_filename: str,
-                              notice_title: str):
+                              notice_title: str, notice_infos: dict = None):
     with open(output_filename, "w") as output_file:
         write_file(output_file, notice_title)
         for value in file_hash:
@@ -150,10 +172,17 @@ def generate_txt_notice_files(file_hash: str, input_dir: str, output_filename: s
             write_file(output_file, '-' * 60)
             write_file(output_file, "Notices for software(s):")
             software_list = []
+            software_keys = set()
             for filename in value:
-                json_filename = '{}.json'.format(filename)
-                contents = read_json_file(json_filename)
-                if contents is not None and contents not in software_list:
+                if notice_infos is not None and filename in notice_infos:
+                    contents = notice_infos[filename]
+                else:
+                    contents = read_json_file('{}.json'.format(filename))
+                if contents is None:
+                    continue
+                contents_key = hashable_contents(contents)
+                if contents_key not in software_keys:
+                    software_keys.add(contents_key)
                     software_list.append(contents)
             software_dict = {}
             for contents_value in software_list:
@@ -190,7 +219,9 @@ def generate_xml_notice_files(files_with_same_hash: dict, input_dir: str,
     for file_key in files_with_same_hash.keys():
         for filename in files_with_same_hash[file_key]:
             id_table[filename] = file_key
-    with open(output_filename, "w") as output_file:
+    # a .xml.gz is written through the gzip stream, without the plain xml
+    open_output = GzipLineWriter if output_filename.endswith('.gz') else open
+    with open_output(output_filename, "w") as output_file:
         write_file(output_file, '<?xml version="1.0" encoding="utf-8"?>')
         write_file(output_file, "<licenses>")
 
@@ -208,13 +239,13 @@ def generate_xml_notice_files(files_with_same_hash: dict, input_dir: str,
         write_file(output_file, '')
         write_file(output_file, '')
 
-        processed_file_keys = []
+        processed_file_keys = set()
         # write the notice file lists
         for filename in sorted_filenames:
             file_key = id_table.get(filename)
             if file_key in processed_file_keys:
                 continue
-            processed_file_keys.append(file_key)
+            processed_file_keys.add(file_key)
 
             with open(filename, errors='ignore') as temp_file_hd:
                 write_file(
@@ -227,10 +258,34 @@ def generate_xml_notice_files(files_with_same_hash: dict, input_dir: str,
         write_file(output_file, "</licenses>")
 
 
-def compress_file_to_gz(src_file_name: str, gz_file_name: str):
-    with open(src_file_name, mode='rb') as src_file_fd:
-        with gzip.open(gz_file_name, mode='wb') as gz_file_fd:
-            gz_file_fd.writelines(src_file_fd)
+class GzipLineWriter():
+    """Text file like writer of a .gz file.
+
+    The compressor is fed one line at a time, as gzipping the plain text file
+    line by line did, which keeps the compressed bytes the same.
+    """
+
+    def __init__(self, gz_file_name: str, mode: str = 'w'):
+        self._gz_file = gzip.open(gz_file_name, mode='wb')
+        self._encoding = locale.getpreferredencoding(False)
+        self._pending = b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, text: str):
+        lines = (self._pending + text.encode(self._encoding)).split(b'\n')
+        self._pending = lines.pop()
+        self._gz_file.writelines(line + b'\n' for line in lines)
+
+    def close(self):
+        if self._pending:
+            self._gz_file.write(self._pending)
+            self._pending = b''
+        self._gz_file.close()
 
 
 def handle_zipfile_notices(zip_file: str):
@@ -239,10 +294,12 @@ def handle_zipfile_notices(zip_file: str):
         build_utils.extract_all(zip_file, tmp_dir, no_clobber=False)
         files = build_utils.get_all_files(tmp_dir)
         contents = []
+        seen_contents = set()
         for file in files:
             with open(file, 'r') as fd:
                 data = fd.read()
-                if data not in contents:
+                if data not in seen_contents:
+                    seen_contents.add(data)
                     contents.append(data)
         with open(notice_file, 'w') as merged_notice:
             merged_notice.write('\n\n'.join(contents))
@@ -262,17 +319,17 @@ def do_merge_notice(args, zipfiles: str, txt_files: str):
         raise Exception(
             'Error: input variable output_notice_gz must ends with .xml.gz')
 
-    notice_xml = notice_gz.replace('.gz', '')
-
     files_with_same_hash = defaultdict(list)
     for file in zipfiles:
         txt_files.append(handle_zipfile_notices(file))
 
-    for file in txt_files:
-        if os.stat(file).st_size == 0:
-            continue
-        file_hash = compute_hash(file)
-        files_with_same_hash[file_hash].append(file)
+    notice_infos = {}
+    with ThreadPoolExecutor(max_workers=min(16, os.cpu_count() or 1)) as executor:
+        for file, result in zip(txt_files, executor.map(hash_notice_file, txt_files)):
+            if result is None:
+                continue
+            file_hash, notice_infos[file] = result
+            files_with_same_hash[file_hash].append(file)
 
     file_sets = [
         sorted(files_with_same_hash[hash])
@@ -281,11 +338,10 @@ def do_merge_notice(args, zipfiles: str, txt_files: str):
 
     if file_sets is not None:
         generate_txt_notice_files(file_sets, notice_dir, notice_txt,
-                                  notice_title)
+                                  notice_title, notice_infos)
 
     if files_with_same_hash is not None:
-        generate_xml_notice_files(files_with_same_hash, notice_dir, notice_xml)
-        compress_file_to_gz(notice_xml, args.output_notice_gz)
+        generate_xml_notice_files(files_with_same_hash, notice_dir, notice_gz)
 
     if args.notice_module_info:
         module_install_info_list = []
@@ -17,6 +17,9 @@ import sys
 import argparse
 import os
 import shutil
+import stat
+import filecmp
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(
     os.path.dirname(os.path.dirname(os.path.dirname(
@@ -30,6 +33,126 @@ from categorized_libraries_utils import update_module_info
 from bootpath_collection import BootPathCollection
 
 
+# ioctl of linux/fs.h cloning a file by sharing its extents (reflink)
+FICLONE = 0x40049409
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def _is_same_file(source: str, source_stat, dest: str) -> bool:
+    try:
+        dest_stat = os.lstat(dest)
+    except OSError:
+        return False
+    if not stat.S_ISREG(dest_stat.st_mode) or dest_stat.st_size != source_stat.st_size \
+            or stat.S_IMODE(dest_stat.st_mode) != stat.S_IMODE(source_stat.st_mode):
+        return False
+    # copy2 keeps the mtime, an unchanged install is detected without reading
+    if dest_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    if filecmp.cmp(source, dest, shallow=False):
+        shutil.copystat(source, dest)
+        return True
+    return False
+
+
+def _clone_file(source: str, dest: str):
+    """copy2() that shares the data extents with the source where the
+    filesystem supports reflinks."""
+    if fcntl is not None and not os.path.islink(dest):
+        try:
+            with open(source, 'rb') as src_f, open(dest, 'wb') as dest_f:
+                fcntl.ioctl(dest_f.fileno(), FICLONE, src_f.fileno())
+            shutil.copystat(source, dest)
+            return
+        except OSError:
+            pass
+    shutil.copy2(source, dest)
+
+
+class ModuleInstaller(object):
+    """Install module files with a thread pool.
+
+    Copies are queued in install order and run in batches. A copy onto a
+    destination that is still pending replaces the pending one, as the
+    sequential copy would have. Symlink steps call sync() on the paths
+    they look at, which runs the pending copies first when they touch it.
+    """
+
+    def __init__(self, jobs: int = None):
+        self.jobs = jobs or min(32, (os.cpu_count() or 1) * 2)
+        self._pending_files = {}
+        self._pending_trees = {}
+        self._source_stats = {}
+        self.copied_count = 0
+        self.skipped_count = 0
+
+    def _source_stat(self, source: str):
+        source_stat = self._source_stats.get(source)
+        if source_stat is None:
+            source_stat = os.stat(source)
+            self._source_stats[source] = source_stat
+        return source_stat
+
+    def _is_pending(self, path: str) -> bool:
+        if path in self._pending_files or path in self._pending_trees:
+            return True
+        for tree_dest in self._pending_trees:
+            if path.startswith(tree_dest + os.sep) or tree_dest.startswith(path + os.sep):
+                return True
+        return False
+
+    def copy_file(self, source: str, dest: str):
+        # copy2 writes through a symlink to its target, keep that in order
+        if (self._is_pending(dest) and dest not in self._pending_files) or os.path.islink(dest):
+            self.sync()
+        self._pending_files[dest] = source
+
+    def copy_tree(self, source: str, dest: str):
+        if self._is_pending(dest):
+            self.sync()
+        self._pending_trees[dest] = source
+
+    def sync(self, path: str = None):
+        if path is not None and not self._is_pending(path):
+            return
+        file_tasks = list(self._pending_files.items())
+        tree_tasks = list(self._pending_trees.items())
+        self._pending_files = {}
+        self._pending_trees = {}
+        if not file_tasks and not tree_tasks:
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            results = list(executor.map(lambda task: self._install_file(*task), file_tasks))
+            results.extend(executor.map(lambda task: self._install_tree(*task), tree_tasks))
+        self.copied_count += results.count(True)
+        self.skipped_count += results.count(False)
+
+    def _install_file(self, dest: str, source: str) -> bool:
+        if _is_same_file(source, self._source_stat(source), dest):
+            return False
+        _clone_file(source, dest)
+        return True
+
+    def _install_tree(self, dest: str, source: str) -> bool:
+        shutil.copytree(source, dest, dirs_exist_ok=True,
+                        copy_function=self._copy_tree_file)
+        return True
+
+    def _copy_tree_file(self, source: str, dest: str):
+        if not _is_same_file(source, os.stat(source), dest):
+            _clone_file(source, dest)
+
+
+def _read_module_info(module_info_file: str) -> dict:
+    module_info = read_json_file(module_info_file)
+    if not module_info:
+        raise Exception("read module install info file '{}' error.".format(module_info_file))
+    return module_info
+
+
 def _get_modules_info(system_install_info: dict, depfiles: list):
     modules_info_dict = {}
     for subsystem_info in system_install_info:
@@ -76,15 +199,15 @@ def copy_modules(system_install_info: dict, install_modules_info_file: str,
     symlink_dest = []
 
     modules_info_dict = _get_modules_info(system_install_info, depfiles)
-    for value in modules_info_dict.values():
-        module_info = read_json_file(value)
-        if not module_info:
-            raise Exception("read module install info file '{}' error.".format(value))
+    installer = ModuleInstaller()
+    arm64e_whitelist = read_json_file(arm64e_whitelist_file)
+    with ThreadPoolExecutor(max_workers=installer.jobs) as executor:
+        modules_info = list(executor.map(_read_module_info, modules_info_dict.values()))
+    for module_info in modules_info:
         install = module_info.get('install_enable')
         if not install:
             continue
         update_module_info(module_info, categorized_libraries)
-        arm64e_whitelist = read_json_file(arm64e_whitelist_file)
         if "arm64e" in module_info.get("label", []) and arm64e_whitelist:
             for label in arm64e_whitelist:
                 if label in module_info.get('label', []):
@@ -137,12 +260,12 @@ def copy_modules(system_install_info: dict, install_modules_info_file: str,
                 for filename in os.listdir(source):
                     if filename.endswith('.hap') or filename.endswith('.hsp'):
                         is_hvigor_hap = True
-                        shutil.copy2(os.path.join(source, filename),
-                                     os.path.join(platform_installed_path, dest, filename))
+                        installer.copy_file(os.path.join(source, filename),
+                                            os.path.join(platform_installed_path, dest, filename))
                 if not is_hvigor_hap:
-                    shutil.copytree(source, os.path.join(platform_installed_path, dest), dirs_exist_ok=True)
+                    installer.copy_tree(source, os.path.join(platform_installed_path, dest))
             else:
-                shutil.copy2(source, os.path.join(platform_installed_path, dest))
+                installer.copy_file(source, os.path.join(platform_installed_path, dest))
 
         # add symlink
         if 'symlink' in module_info:
@@ -157,6 +280,7 @@ def copy_modules(system_install_info: dict, install_modules_info_file: str,
                     src_file_relpath = os.path.relpath(symlink_src_file_path, os.path.dirname(symlink_dest_file))
                     if not os.path.exists(os.path.dirname(symlink_dest_file)):
                         os.makedirs(os.path.dirname(symlink_dest_file), exist_ok=True)
+                    installer.sync(symlink_dest_file)
                     if not os.path.exists(symlink_dest_file):
                         os.symlink(src_file_relpath, symlink_dest_file)
                         module_info.setdefault("symlink_file", []).append(os.path.relpath(symlink_dest_file, platform_installed_path))
@@ -169,12 +293,14 @@ def copy_modules(system_install_info: dict, install_modules_info_file: str,
                     relpath = os.path.relpath(os.path.dirname(symlink_src_file), os.path.dirname(symlink_dest_file))
                     if not os.path.exists(os.path.dirname(symlink_dest_file)):
                         os.makedirs(os.path.dirname(symlink_dest_file), exist_ok=True)
+                    installer.sync(symlink_dest_file)
                     if not os.path.exists(symlink_dest_file):
                         os.symlink(os.path.join(relpath, os.path.basename(dest)), symlink_dest_file)
                         module_info.setdefault("symlink_file", []).append(os.path.relpath(symlink_dest_file, platform_installed_path))
         if 'symlink_path' in module_info:
             symlink_path = module_info.get('symlink_path')
             dest_file = os.path.join(platform_installed_path, dests[0])
+            installer.sync(dest_file)
             if os.path.exists(dest_file):
                 os.remove(dest_file)
             os.symlink(symlink_path, dest_file)
@@ -200,11 +326,16 @@ def copy_modules(system_install_info: dict, install_modules_info_file: str,
                         relative_path = os.path.relpath(os.path.dirname(dest_file), os.path.dirname(link_path))
                         os.makedirs(os.path.dirname(link_path), exist_ok=True)
                         src_file = os.path.join(relative_path, file_name)
+                        installer.sync(link_path)
                         os.symlink(src_file, link_path)
                         module_info.setdefault("symlink_file", []).append(os.path.relpath(link_path, platform_installed_path))
                     else:
                         raise FileExistsError(f"{link_path} create failed, src_file:{dest_file} and {dest_file} is same")
 
+    installer.sync()
+    print('install modules: {} files copied, {} files unchanged'.format(
+        installer.copied_count, installer.skipped_count))
+
     # write install module info to file
     write_json_file(install_modules_info_file, modules_info_dict)
 
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Northeastern University
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class CsrGraph:
+    """
+    Directed target graph with integer node ids and CSR adjacency.
+
+    Successors and predecessors of the targets are stored in two pairs of
+    offset/index arrays, in the order networkx would report them for the same
+    edge insertions. Virtual nodes added after construction keep their edges
+    in small overlay lists. Reachability queries are memoized per queried node,
+    the least recently used closures are dropped once the cached closures hold
+    more than CLOSURE_CACHE_IDS ids, so querying every node of a large graph
+    does not keep a quadratic number of ids.
+    """
+
+    CLOSURE_CACHE_IDS = 1 << 23
+
+    def __init__(self, targets: Sequence[Any]) -> None:
+        self._names: List[Optional[str]] = [t.target_name for t in targets]
+        self._targets: List[Any] = list(targets)
+        self._ids: Dict[str, int] = {}
+        for node_id, name in enumerate(self._names):
+            self._ids.setdefault(name, node_id)
+        self._real_count = len(self._names)
+
+        edges_by_source = []
+        in_degree = [0] * self._real_count
+        for node_id, target in enumerate(self._targets):
+            children = []
+            seen = set()
+            for dep in target.deps:
+                dep_id = self._ids.get(dep)
+                if dep_id is not None and dep_id not in seen:
+                    seen.add(dep_id)
+                    children.append(dep_id)
+                    in_degree[dep_id] += 1
+            edges_by_source.append(children)
+
+        self._succ_offsets, self._succ_indices = self._to_csr(edges_by_source)
+
+        # predecessors keep the order in which their edges were added
+        pred_offsets = array('l', [0]) * (self._real_count + 1)
+        for node_id in range(self._real_count):
+            pred_offsets[node_id + 1] = pred_offsets[node_id] + in_degree[node_id]
+        pred_indices = array('l', [0]) * pred_offsets[self._real_count]
+        fill = array('l', pred_offsets[:self._real_count])
+        for node_id, children in enumerate(edges_by_source):
+            for child in children:
+                pred_indices[fill[child]] = node_id
+                fill[child] += 1
+        self._pred_offsets, self._pred_indices = pred_offsets, pred_indices
+
+        self._virtual_succ: Dict[int, List[int]] = {}
+        self._virtual_pred: Dict[int, List[int]] = {}
+        self._closure_cache: 'OrderedDict[Tuple[int, bool], array]' = OrderedDict()
+        self._closure_cache_ids = 0
+
+    @staticmethod
+    def _to_csr(adjacency: List[List[int]]) -> Tuple[array, array]:
+        offsets = array('l', [0])
+        indices = array('l')
+        for children in adjacency:
+            indices.extend(children)
+            offsets.append(len(indices))
+        return offsets, indices
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def node_id(self, name: str) -> int:
+        return self._ids[name]
+
+    def name_of(self, node_id: int) -> str:
+        return self._names[node_id]
+
+    def target_of(self, name: str) -> Any:
+        return self._targets[self._ids[name]]
+
+    def nodes(self) -> List[str]:
+        return [name for node_id, name in enumerate(self._names) if name is not None and self._ids.get(name) == node_id]
+
+    def edges(self) -> List[Tuple[str, str]]:
+        names = self._names
+        return [(names[node_id], names[child])
+                for node_id in range(len(names)) if names[node_id] is not None
+                for child in self.successor_ids(node_id)]
+
+    def successor_ids(self, node_id: int) -> List[int]:
+        if node_id >= self._real_count:
+            return list(self._virtual_succ.get(node_id, ()))
+        return self._succ_indices[self._succ_offsets[node_id]:self._succ_offsets[node_id + 1]].tolist()
+
+    def predecessor_ids(self, node_id: int) -> List[int]:
+        if node_id >= self._real_count:
+            return []
+        preds = self._pred_indices[self._pred_offsets[node_id]:self._pred_offsets[node_id + 1]].tolist()
+        extra = self._virtual_pred.get(node_id)
+        return preds + extra if extra else preds
+
+    def add_virtual_node(self, name: str, target: Any, children: List[str]) -> None:
+        node_id = len(self._names)
+        self._names.append(name)
+        self._targets.append(target)
+        self._ids[name] = node_id
+        self._virtual_succ[node_id] = []
+        self._clear_closure_cache()
+        seen = set()
+        for child in children:
+            if child not in self._ids:
+                raise ValueError(f"virtual root '{child}' not exist in graph")
+            child_id = self._ids[child]
+            if child_id in seen:
+                continue
+            seen.add(child_id)
+            self._virtual_succ[node_id].append(child_id)
+            self._virtual_pred.setdefault(child_id, []).append(node_id)
+
+    def remove_node(self, name: str) -> None:
+        node_id = self._ids.get(name)
+        if node_id is None:
+            return
+        if node_id < self._real_count:
+            raise ValueError(f"only virtual nodes can be removed, '{name}' is a target")
+        for child_id in self._virtual_succ.pop(node_id, []):
+            preds = self._virtual_pred.get(child_id, [])
+            preds.remove(node_id)
+            if not preds:
+                del self._virtual_pred[child_id]
+        del self._ids[name]
+        self._names[node_id] = None
+        self._targets[node_id] = None
+        self._clear_closure_cache()
+
+    def _clear_closure_cache(self) -> None:
+        self._closure_cache.clear()
+        self._closure_cache_ids = 0
+
+    def _cache_closure(self, key: Tuple[int, bool], closure: array) -> None:
+        if len(closure) > self.CLOSURE_CACHE_IDS:
+            return
+        while self._closure_cache and self._closure_cache_ids + len(closure) > self.CLOSURE_CACHE_IDS:
+            _, evicted = self._closure_cache.popitem(last=False)
+            self._closure_cache_ids -= len(evicted)
+        self._closure_cache[key] = closure
+        self._closure_cache_ids += len(closure)
+
+    def reachable(self, name: str, downstream: bool = True) -> Sequence[int]:
+        """Ids of all nodes reachable from name, without name itself."""
+        start = self._ids[name]
+        key = (start, downstream)
+        cached = self._closure_cache.get(key)
+        if cached is not None:
+            self._closure_cache.move_to_end(key)
+            return cached
+        neighbors = self.successor_ids if downstream else self.predecessor_ids
+        closure_cache = self._closure_cache
+        visited = bytearray(len(self._names))
+        visited[start] = 1
+        stack = [start]
+        result = []
+        while stack:
+            for neighbor in neighbors(stack.pop()):
+                if visited[neighbor]:
+                    continue
+                visited[neighbor] = 1
+                result.append(neighbor)
+                # reuse the closure of a subtree queried before
+                known = closure_cache.get((neighbor, downstream))
+                if known is None:
+                    stack.append(neighbor)
+                    continue
+                for node in known:
+                    if not visited[node]:
+                        visited[node] = 1
+                        result.append(node)
+        closure = array('l', result)
+        self._cache_closure(key, closure)
+        return closure
+
+    def dfs(
+            self,
+            start: str,
+            downstream: bool,
+            max_depth: Optional[int],
+            pre_visit: Optional[Callable[[str, int, Optional[str]], bool]],
+            post_visit: Optional[Callable[[str, int, Optional[str]], None]]
+    ) -> List[str]:
+        """Same traversal and callback order as DependGraphAnalyzer._dfs, on node ids."""
+        if start not in self._ids:
+            raise ValueError(f"node {start} not exist in graph")
+        names = self._names
+        neighbors = self.successor_ids if downstream else self.predecessor_ids
+        visited = bytearray(len(names))
+        traversal_order = []
+        stack = [(self._ids[start], 0, None, False)]
+
+        while stack:
+            node, depth, parent, is_processed = stack.pop()
+            if max_depth is not None and depth > max_depth:
+                continue
+
+            if is_processed:
+                if post_visit is not None:
+                    try:
+                        post_visit(names[node], depth, parent)
+                    except Exception as e:
+                        raise RuntimeError(f"post_visit execute failed: {e}") from e
+                continue
+
+            if visited[node]:
+                continue
+            visited[node] = 1
+            traversal_order.append(names[node])
+
+            continue_traverse = True
+            if pre_visit is not None:
+                try:
+                    continue_traverse = pre_visit(names[node], depth, parent)
+                except Exception as e:
+                    raise RuntimeError(f"pre_visit execute failed: {e}") from e
+            stack.append((node, depth, parent, True))
+
+            if continue_traverse:
+                for neighbor in reversed(neighbors(node)):
+                    if not visited[neighbor]:
+                        stack.append((neighbor, depth + 1, parent, False))
+
+        return traversal_order
@@ -18,34 +18,66 @@
 
 from typing import List, Iterable, Tuple, Union, Optional, Callable, Set
 
-import networkx as nx
-from networkx import DiGraph
-
+try:
+    import networkx as nx
+    from networkx import DiGraph
+except ImportError:
+    nx = None
+    DiGraph = None
+
+from ohos.sbom.analysis.csr_graph import CsrGraph
 from ohos.sbom.data.ninja_json import NinjaJson
 from ohos.sbom.data.target import Target
 
 
 class DependGraphAnalyzer:
     """
-     Dependency graph service based on networkx.DiGraph
+     Dependency graph service.
+
+     The default "csr" backend stores the graph in integer indexed CSR arrays
+     and only builds a networkx.DiGraph when graph, shortest_path, sub_graph
+     or depend_subgraph is used. The "networkx" backend is the former
+     networkx.DiGraph based implementation.
     """
 
-    def __init__(self, src: Union[NinjaJson, List[Target]]) -> None:
+    BACKENDS = ("csr", "networkx")
+
+    def __init__(self, src: Union[NinjaJson, List[Target]], backend: str = "csr") -> None:
         if isinstance(src, NinjaJson):
             targets = list(src.all_targets())
         elif isinstance(src, list):
             targets = src
         else:
             raise TypeError("src must be NinjaJson or List[Target]")
+        if backend not in self.BACKENDS:
+            raise ValueError(f"unknown graph backend '{backend}', expected one of {self.BACKENDS}")
 
-        self._graph = self._build_graph(targets)
+        self._csr = None
+        self._graph = None
+        if backend == "csr":
+            self._csr = CsrGraph(targets)
+        else:
+            self._graph = self._build_graph(targets)
 
     @property
     def graph(self) -> DiGraph:
+        if self._graph is None:
+            self._graph = self._csr_to_networkx()
         return self._graph
 
+    def _csr_to_networkx(self) -> DiGraph:
+        if nx is None:
+            raise ImportError("networkx is required for this graph query")
+        g = nx.DiGraph()
+        for name in self._csr.nodes():
+            g.add_node(name, data=self._csr.target_of(name))
+        g.add_edges_from(self._csr.edges())
+        return g
+
     @staticmethod
     def _build_graph(targets: List[Target]) -> DiGraph:
+        if nx is None:
+            raise ImportError("networkx is required for the networkx graph backend")
         g = nx.DiGraph()
         for t in targets:
             g.add_node(t.target_name, data=t)
@@ -57,31 +89,45 @@ class DependGraphAnalyzer:
         return g
 
     def nodes(self) -> List[str]:
+        if self._csr is not None:
+            return self._csr.nodes()
         return list(self._graph.nodes)
 
     def edges(self) -> List[Tuple[str, str]]:
+        if self._csr is not None:
+            return self._csr.edges()
         return list(self._graph.edges)
 
     def get_target(self, name: str) -> Target:
+        if self._csr is not None:
+            return self._csr.target_of(name)
         return self._graph.nodes[name]["data"]
 
     def predecessors(self, name: str) -> List[str]:
+        if self._csr is not None:
+            return [self._csr.name_of(i) for i in self._csr.predecessor_ids(self._csr.node_id(name))]
         return list(self._graph.predecessors(name))
 
     def successors(self, name: str) -> List[str]:
+        if self._csr is not None:
+            return [self._csr.name_of(i) for i in self._csr.successor_ids(self._csr.node_id(name))]
         return list(self._graph.successors(name))
 
     def ancestors(self, name: str) -> List[str]:
+        if self._csr is not None:
+            return [self._csr.name_of(i) for i in self._csr.reachable(name, downstream=False)]
         return list(nx.ancestors(self._graph, name))
 
     def descendants(self, name: str) -> List[str]:
+        if self._csr is not None:
+            return [self._csr.name_of(i) for i in self._csr.reachable(name, downstream=True)]
         return list(nx.descendants(self._graph, name))
 
     def shortest_path(self, source: str, target: str) -> List[str]:
-        return nx.shortest_path(self._graph, source, target)
+        return nx.shortest_path(self.graph, source, target)
 
     def sub_graph(self, nodes: Iterable[str]):
-        return self._graph.subgraph(nodes).copy()
+        return self.graph.subgraph(nodes).copy()
 
     def add_virtual_root(self, root_name: str, children: List[str]):
         virtual_target = type("VirtualTarget", (), {
@@ -90,6 +136,11 @@ class DependGraphAnalyzer:
             "outputs": [],
             "source_outputs": {}
         })()
+        if self._csr is not None:
+            # a networkx view built from the csr graph is out of date now
+            self._graph = None
+            self._csr.add_virtual_node(root_name, virtual_target, children)
+            return
         self._graph.add_node(root_name, data=virtual_target)
 
         for child in children:
@@ -98,6 +149,10 @@ class DependGraphAnalyzer:
             self._graph.add_edge(root_name, child)
 
     def remove_virtual_root(self, root_name: str):
+        if self._csr is not None:
+            self._graph = None
+            self._csr.remove_node(root_name)
+            return
         if root_name in self._graph:
             self._graph.remove_node(root_name)
 
@@ -108,10 +163,10 @@ class DependGraphAnalyzer:
             max_depth: int,
     ) -> DiGraph:
 
-        if isinstance(src, Target):
+        if not isinstance(src, str):
             src = src.target_name
         if max_depth is None:
-            max_depth = len(self._graph)
+            max_depth = len(self.graph)
         return nx.ego_graph(self.graph, src, radius=max_depth, center=True, undirected=False)
 
     def dfs_downstream(
@@ -136,6 +191,9 @@ class DependGraphAnalyzer:
         Returns:
             List of nodes in traversal order
         """
+        if self._csr is not None:
+            start_name = start if isinstance(start, str) else start.target_name
+            return self._csr.dfs(start_name, True, max_depth, pre_visit, post_visit)
         return self._dfs(
             start=start,
             neighbor_func=lambda n: self.successors(n),
@@ -151,6 +209,9 @@ class DependGraphAnalyzer:
             pre_visit: Optional[Callable[[str, int, Optional[str]], bool]] = None,
             post_visit: Optional[Callable[[str, int, Optional[str]], None]] = None
     ) -> List[str]:
+        if self._csr is not None:
+            start_name = start if isinstance(start, str) else start.target_name
+            return self._csr.dfs(start_name, False, max_depth, pre_visit, post_visit)
         return self._dfs(
             start=start,
             neighbor_func=lambda n: self.predecessors(n),
@@ -167,11 +228,11 @@ class DependGraphAnalyzer:
             pre_visit: Optional[Callable[[str, int, Optional[str]], bool]],
             post_visit: Optional[Callable[[str, int, Optional[str]], None]]
     ) -> List[str]:
-        if isinstance(start, Target):
-            start_name = start.target_name
-        else:
+        if isinstance(start, str):
             start_name = start
-        if start_name not in self.nodes():
+        else:
+            start_name = start.target_name
+        if start_name not in self._graph:
             raise ValueError(f"node {start_name} not exist in graph")
 
         visited = set()
@@ -19,7 +19,7 @@
 import os
 from collections import defaultdict
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 
 from ohos.sbom.analysis.depend_graph import DependGraphAnalyzer
 from ohos.sbom.data.file_dependence import File, FileType
@@ -66,6 +66,42 @@ class FileDependencyAnalyzer:
         finally:
             self._depend_graph.remove_virtual_root(virtual_root)
 
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Plain form of the collected files, restored by restore() in a later run
+        with the same install closure. Files keep their insertion order.
+        """
+        records = []
+        for path, file in self._file_dependencies.items():
+            source_target = file.source_target
+            dependencies = tuple(
+                (dep_type.value, tuple(dep.relative_path for dep in dep_files))
+                for dep_type, dep_files in file.get_dependencies().items() if dep_files
+            )
+            records.append((path, source_target.target_name if source_target is not None else None,
+                            file.get_file_type_name(), dependencies))
+        target_files = {
+            target_name: [file.relative_path for file in files]
+            for target_name, files in self._target_name_map_file.items()
+        }
+        return {"files": records, "target_files": target_files}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        """Rebuild the collected files from snapshot() instead of traversing the graph."""
+        self._file_dependencies.clear()
+        self._target_name_map_file.clear()
+        for path, target_name, file_type, _ in snapshot["files"]:
+            source_target = self._depend_graph.get_target(target_name) if target_name is not None else None
+            self._file_dependencies[path] = File(
+                path, source_target, file_type=FileType[file_type.upper()] if file_type else None)
+        files = self._file_dependencies
+        for path, _, _, dependencies in snapshot["files"]:
+            file = files[path]
+            for dep_type, dep_paths in dependencies:
+                file.add_dependency_list(RelationshipType(dep_type), [files[dep] for dep in dep_paths])
+        for target_name, paths in snapshot["target_files"].items():
+            self._target_name_map_file[target_name] = [files[path] for path in paths]
+
     def extract_outputs_and_source_outputs(self, target: Target) -> list:
         raw_outputs = getattr(target, 'outputs', None)
         raw_source_outputs = getattr(target, 'source_outputs', None)
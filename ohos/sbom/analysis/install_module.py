@@ -16,9 +16,10 @@
 # limitations under the License.
 #
 
+import hashlib
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Dict, Any, DefaultDict, Optional, Union
+from typing import List, Dict, Any, DefaultDict, Optional, Tuple, Union
 
 from ohos.sbom.data.ninja_json import NinjaJson
 from ohos.sbom.data.target import Target
@@ -49,12 +50,22 @@ class OutputIndex:
 
 
 class InstallModuleAnalyzer:
-    def __init__(self, nj: NinjaJson) -> None:
+    def __init__(self, nj: NinjaJson, module_info_cache: Optional[Dict[str, Tuple[bytes, bool, List[str]]]] = None) -> None:
+        """
+        Args:
+            nj: Parsed gn_gen.json
+            module_info_cache: install_enable and dest of module info targets by target name, keyed by
+                the fingerprint of their args. Entries of unchanged targets are reused, the others are
+                regenerated and updated in place.
+        """
         self._nj = nj
         self._index = OutputIndex(self._nj.all_targets())
         self._matched_install_module = None
         self._install_enable = None
         self._install_dest = None
+        self._module_info_cache = module_info_cache if module_info_cache is not None else {}
+        self._module_info_parser = None
+        self.reused_module_infos = 0
 
     def get_matched_install_module(self) -> Dict[str, InstallMatchResult]:
         if self._matched_install_module is None:
@@ -74,16 +85,19 @@ class InstallModuleAnalyzer:
         enabled_modules = set(self.get_enabled_modules(install_enable=True))
         return self._nj.filter_targets(lambda t: t.target_name in enabled_modules)
 
+    @staticmethod
+    def args_key(args) -> bytes:
+        return hashlib.blake2b('\0'.join(args).encode('utf-8'), digest_size=16).digest()
+
     def generate_module_info(self, target: Union[Target, str]) -> Optional[Dict[str, Any]]:
         if isinstance(target, str):
             target = next((t for t in self._nj.all_targets() if t.target_name == target), None)
             if not target:
                 print(f"[Error] not found analyze target: {target}")
                 return None
-        create_module_info_parser()
-        args = target.args
-
-        args = create_module_info_parser().parse_args(args)
+        if self._module_info_parser is None:
+            self._module_info_parser = create_module_info_parser()
+        args = self._module_info_parser.parse_args(list(target.args))
         module_info_data = gen_module_info_data(args)
         return module_info_data
 
@@ -122,12 +136,19 @@ class InstallModuleAnalyzer:
         matched_modules = self.get_matched_install_module()
 
         def process_target(src_target_name: str, target: Target) -> None:
-            module_info = self.generate_module_info(target)
-            install_enable = False
-            dest = []
-            if module_info:
-                install_enable = module_info.get("install_enable", False)
-                dest = module_info.get("dest", [])
+            key = self.args_key(target.args)
+            cached = self._module_info_cache.get(target.target_name)
+            if cached is not None and cached[0] == key:
+                _, install_enable, dest = cached
+                self.reused_module_infos += 1
+            else:
+                module_info = self.generate_module_info(target)
+                install_enable = False
+                dest = []
+                if module_info:
+                    install_enable = module_info.get("install_enable", False)
+                    dest = module_info.get("dest", [])
+                self._module_info_cache[target.target_name] = (key, install_enable, dest)
             install_results[src_target_name] = install_enable
             dest_results[src_target_name] = dest
 
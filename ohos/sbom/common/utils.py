@@ -16,13 +16,17 @@
 # limitations under the License.
 #
 
+import gzip
+import io
 import json
 import mimetypes
 import os
 import re
+import shutil
+import tempfile
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Tuple, List
+from typing import Any, Dict, Tuple, List
 from typing import Union
 from urllib.parse import urlparse
 
@@ -69,6 +73,116 @@ def remove_empty(obj: Any) -> Any:
         return obj
 
 
+class JsonStreamWriter:
+    """
+    Write a JSON object with very large list members one item at a time.
+
+    The file is the same as write_json(remove_empty(obj)) of the complete
+    object. Members are written in sorted key order: the scalar members and
+    the first list are written as they come, the other lists are spooled to
+    temporary files next to the output and appended on close(). The file is
+    written under a temporary name and renamed on close(), with compress it
+    is gzip-compressed (without timestamp, so the output is reproducible).
+    """
+
+    _INDENT = "    "
+
+    def __init__(self, file_path: Union[str, Path], members: Dict[str, Any], list_keys: List[str],
+                 *, compress: bool = False):
+        self.file_path = str(file_path)
+        self._tmp_path = f"{self.file_path}.{os.getpid()}.tmp"
+        self._members = remove_empty(members)
+        self._list_keys = sorted(list_keys)
+        self._streamed_key = self._list_keys[0] if self._list_keys else None
+        self._counts = {key: 0 for key in self._list_keys}
+        self._spools = {}
+        self._has_member = False
+
+        self._raw = open(self._tmp_path, "wb")
+        if compress:
+            buffer = gzip.GzipFile(filename=os.path.basename(self.file_path), mode="wb", fileobj=self._raw, mtime=0)
+        else:
+            buffer = self._raw
+        self._out = io.TextIOWrapper(buffer, encoding="utf-8")
+        self._out.write("{")
+        for key in sorted(self._members):
+            if self._streamed_key is not None and key > self._streamed_key:
+                break
+            self._write_scalar(key, self._members.pop(key))
+
+    def add(self, key: str, item: Any) -> None:
+        """Append an item to the list member key."""
+        item = remove_empty(item)
+        if item in (None, "", [], {}, ()):
+            return
+        text = json.dumps(item, indent=4, sort_keys=True, ensure_ascii=False)
+        prefix = "," if self._counts[key] else ""
+        chunk = prefix + "\n" + self._INDENT * 2 + text.replace("\n", "\n" + self._INDENT * 2)
+        if key == self._streamed_key:
+            if not self._counts[key]:
+                self._begin_member(key)
+                self._out.write("[")
+            self._out.write(chunk)
+        else:
+            spool = self._spools.get(key)
+            if spool is None:
+                spool = tempfile.TemporaryFile("w+", encoding="utf-8", dir=os.path.dirname(self._tmp_path) or None)
+                self._spools[key] = spool
+            spool.write(chunk)
+        self._counts[key] += 1
+
+    def count(self, key: str) -> int:
+        return self._counts[key]
+
+    def close(self) -> None:
+        """Write the remaining members and move the file into place."""
+        try:
+            if self._streamed_key is not None and self._counts[self._streamed_key]:
+                self._out.write("\n" + self._INDENT + "]")
+            remaining = set(self._members) | {key for key in self._spools if self._counts[key]}
+            for key in sorted(remaining):
+                if key in self._members:
+                    self._write_scalar(key, self._members[key])
+                    continue
+                spool = self._spools[key]
+                spool.seek(0)
+                self._begin_member(key)
+                self._out.write("[")
+                shutil.copyfileobj(spool, self._out, 1 << 20)
+                self._out.write("\n" + self._INDENT + "]")
+            self._out.write("\n}" if self._has_member else "}")
+            self._close_files()
+            os.replace(self._tmp_path, self.file_path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._close_files()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def _close_files(self) -> None:
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+        if not self._out.closed:
+            self._out.close()
+        if not self._raw.closed:
+            self._raw.close()
+
+    def _begin_member(self, key: str) -> None:
+        self._out.write(("," if self._has_member else "") + "\n" + self._INDENT
+                        + json.dumps(key, ensure_ascii=False) + ": ")
+        self._has_member = True
+
+    def _write_scalar(self, key: str, value: Any) -> None:
+        self._begin_member(key)
+        text = json.dumps(value, indent=4, sort_keys=True, ensure_ascii=False)
+        self._out.write(text.replace("\n", "\n" + self._INDENT))
+
+
 def generate_purl(pkg_type: str, namespace: str, name: str,
                   version: str = None, qualifiers: dict = None,
                   subpath: str = None) -> str:
@@ -1 +1 @@
-from .spdx23 import SPDX23Converter
+from .spdx23 import SPDX23Converter, SPDX23StreamWriter
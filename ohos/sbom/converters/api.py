@@ -16,10 +16,12 @@
 # limitations under the License.
 #
 
-from typing import Dict, Any, Type
+from pathlib import Path
+from typing import Dict, Any, Type, Union, Optional
 
-from ohos.sbom.converters.base import SBOMFormat, SBOMConverterFactory, ISBOMConverter
-from ohos.sbom.sbom.metadata.sbom_meta_data import SBOMMetaData
+from ohos.sbom.common.utils import JsonStreamWriter
+from ohos.sbom.converters.base import SBOMFormat, SBOMConverterFactory, ISBOMConverter, ISBOMStreamWriter
+from ohos.sbom.sbom.metadata.sbom_meta_data import SBOMMetaData, Document, Package, File, Relationship
 
 
 class SBOMConverter:
@@ -52,6 +54,33 @@ class SBOMConverter:
         """
         SBOMConverterFactory.register(sbom_format, converter)
 
+    @staticmethod
+    def register_stream_format(sbom_format: SBOMFormat, writer: Type['ISBOMStreamWriter']) -> None:
+        """
+        Register a new stream writer for a specific SBOM format.
+
+        Args:
+            sbom_format: Format to register (from SBOMFormat enum)
+            writer: Writer class implementing ISBOMStreamWriter interface
+        """
+        SBOMConverterFactory.register_stream_writer(sbom_format, writer)
+
+    @staticmethod
+    def open_stream(sbom_format: SBOMFormat, file_path: Union[str, Path], **options: Any) -> ISBOMStreamWriter:
+        """
+        Open a writer exporting SBOM metadata to a file of the specified format
+        while it is being built.
+
+        Args:
+            sbom_format: Target format (from SBOMFormat enum)
+            file_path: Output file
+            options: Writer options, e.g. compress and validate
+
+        Returns:
+            Writer implementing ISBOMStreamWriter
+        """
+        return SBOMConverterFactory.create_stream_writer(sbom_format, file_path, **options)
+
     def convert(self, sbom_format: SBOMFormat) -> Dict[str, Any]:
         """
         Convert the SBOM metadata to the specified format.
@@ -63,3 +92,37 @@ class SBOMConverter:
             Dictionary containing the converted SBOM data
         """
         return SBOMConverterFactory.create(sbom_format).convert(self.sbom_meta)
+
+
+class SBOMMetaDataStreamWriter(ISBOMStreamWriter):
+    """
+    Stream writer for the SBOM metadata itself, the file has the same content
+    as SBOMMetaData.to_dict().
+    """
+
+    def __init__(self, file_path: Union[str, Path], compress: bool = False):
+        self.file_path = file_path
+        self.compress = compress
+        self._writer: Optional[JsonStreamWriter] = None
+
+    def write_document(self, document: Document) -> None:
+        self._writer = JsonStreamWriter(self.file_path, {"document": document.to_dict()},
+                                        ["packages", "files", "relationships"], compress=self.compress)
+
+    def add_package(self, package: Package) -> None:
+        self._writer.add("packages", package.to_dict())
+
+    def add_file(self, file: File) -> None:
+        self._writer.add("files", file.to_dict())
+
+    def add_relationship(self, relationship: Relationship) -> None:
+        self._writer.add("relationships", relationship.to_dict())
+
+    def close(self) -> None:
+        if self._writer is None:
+            raise ValueError("Document metadata must be provided")
+        self._writer.close()
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
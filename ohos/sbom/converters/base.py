@@ -18,9 +18,10 @@
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, Any, Type, List
+from pathlib import Path
+from typing import Dict, Any, Type, List, Union
 
-from ohos.sbom.sbom.metadata.sbom_meta_data import SBOMMetaData
+from ohos.sbom.sbom.metadata.sbom_meta_data import SBOMMetaData, Document, Package, File, Relationship
 
 
 class SBOMFormat(Enum):
@@ -54,6 +55,63 @@ class ISBOMConverter(ABC):
         pass
 
 
+class ISBOMStreamWriter(ABC):
+    """
+    Abstract base class for writers exporting SBOM metadata one component at a time.
+
+    The document is written first, then packages, files and relationships as
+    they are produced, so that the complete SBOM is never held in memory.
+    Used as a context manager, the output is completed on success and
+    discarded on error.
+    """
+
+    @abstractmethod
+    def write_document(self, document: Document) -> None:
+        """
+        Start the output with the document information.
+
+        Args:
+            document: Document metadata of the SBOM
+        """
+        pass
+
+    @abstractmethod
+    def add_package(self, package: Package) -> None:
+        pass
+
+    @abstractmethod
+    def add_file(self, file: File) -> None:
+        pass
+
+    @abstractmethod
+    def add_relationship(self, relationship: Relationship) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Complete the output.
+
+        Raises:
+            ValueError: If validation is enabled and the SBOM is invalid
+        """
+        pass
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Discard the output."""
+        pass
+
+    def __enter__(self) -> "ISBOMStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
 class SBOMConverterFactory:
     """
     Factory class for creating SBOM format converters.
@@ -62,6 +120,7 @@ class SBOMConverterFactory:
     """
 
     _registry: Dict[SBOMFormat, Type[ISBOMConverter]] = {}
+    _stream_registry: Dict[SBOMFormat, Type[ISBOMStreamWriter]] = {}
 
     @classmethod
     def register(cls, sbom_format: SBOMFormat, converter: Type[ISBOMConverter]) -> None:
@@ -93,6 +152,39 @@ class SBOMConverterFactory:
             raise ValueError(f"Unsupported format: {sbom_format}")
         return cls._registry[sbom_format]()
 
+    @classmethod
+    def register_stream_writer(cls, sbom_format: SBOMFormat, writer: Type[ISBOMStreamWriter]) -> None:
+        """
+        Register a stream writer for a specific SBOM format.
+
+        Args:
+            sbom_format: Target format from SBOMFormat enum
+            writer: Writer class implementing ISBOMStreamWriter
+        """
+        if not isinstance(writer, type):
+            raise TypeError("Stream writer must be a class")
+        if not issubclass(writer, ISBOMStreamWriter):
+            raise ValueError(f"{writer.__name__} must implement ISBOMStreamWriter interface")
+        cls._stream_registry[sbom_format] = writer
+
+    @classmethod
+    def create_stream_writer(cls, sbom_format: SBOMFormat, file_path: Union[str, Path],
+                             **options: Any) -> ISBOMStreamWriter:
+        """
+        Create a stream writer for the specified format.
+
+        Args:
+            sbom_format: Target format from SBOMFormat enum
+            file_path: Output file
+            options: Writer options, e.g. compress and validate
+
+        Returns:
+            New writer instance implementing ISBOMStreamWriter
+        """
+        if sbom_format not in cls._stream_registry:
+            raise ValueError(f"Unsupported streaming format: {sbom_format}")
+        return cls._stream_registry[sbom_format](file_path, **options)
+
     @classmethod
     def supported_formats(cls) -> List[SBOMFormat]:
         """
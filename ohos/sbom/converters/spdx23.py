@@ -17,12 +17,14 @@
 #
 
 from collections import OrderedDict
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Union
 
-from ohos.sbom.common.utils import remove_empty
+from ohos.sbom.common.utils import JsonStreamWriter, remove_empty
 from ohos.sbom.converters.api import SBOMConverter
-from ohos.sbom.converters.base import SBOMFormat, ISBOMConverter
-from ohos.sbom.sbom.metadata.sbom_meta_data import Document, SBOMMetaData, Package, File, Hash, RelationshipType
+from ohos.sbom.converters.base import SBOMFormat, ISBOMConverter, ISBOMStreamWriter
+from ohos.sbom.sbom.metadata.sbom_meta_data import (Document, SBOMMetaData, Package, File, Hash, RelationshipType,
+                                                    Relationship)
 
 
 class SPDX23Converter(ISBOMConverter):
@@ -248,5 +250,122 @@ class SPDX23Converter(ISBOMConverter):
         }
 
 
+class SPDX23StreamWriter(ISBOMStreamWriter):
+    """
+    Stream writer for SPDX 2.3 JSON.
+
+    Every component is converted by SPDX23Converter as soon as it is added and
+    written out, the file is the same as the one of SPDX23Converter.convert().
+    With validate, the stream is checked while it is written: required fields
+    of the document and of every element, and relationships referring to
+    elements that are never written. Only the SPDX ids are kept for that.
+    """
+
+    # Values allowed as relatedSpdxElement without a matching element
+    SPECIAL_ELEMENTS = {"NONE", "NOASSERTION"}
+    # Number of validation errors reported in detail
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, file_path: Union[str, Path], compress: bool = False, validate: bool = False):
+        self.file_path = file_path
+        self.compress = compress
+        self.validate = validate
+        self._converter = SPDX23Converter()
+        self._writer: Optional[JsonStreamWriter] = None
+        self._errors: List[str] = []
+        self._error_count = 0
+        self._element_ids: Set[str] = set()
+        self._referenced_ids: Dict[str, str] = {}
+        self._duplicate_ids = 0
+
+    def write_document(self, document: Document) -> None:
+        doc_data = remove_empty(self._converter._convert_document(document))  # pylint: disable=protected-access
+        if self.validate:
+            self._check_required("Document", doc_data, ["SPDXID", "spdxVersion", "name", "dataLicense",
+                                                        "documentNamespace", "creationInfo"])
+            self._check_required("Document creationInfo", doc_data.get("creationInfo", {}),
+                                 ["created", "creators"])
+            self._add_element_id(doc_data.get("SPDXID"))
+        self._writer = JsonStreamWriter(self.file_path, doc_data, ["packages", "files", "relationships"],
+                                        compress=self.compress)
+
+    def add_package(self, package: Package) -> None:
+        pkg_data = self._converter._convert_package(package)  # pylint: disable=protected-access
+        if self.validate:
+            self._check_required(f"Package {package.name}", pkg_data, ["SPDXID", "name", "downloadLocation"])
+            self._add_element_id(pkg_data.get("SPDXID"))
+        self._writer.add("packages", pkg_data)
+
+    def add_file(self, file: File) -> None:
+        file_data = self._converter._convert_file(file)  # pylint: disable=protected-access
+        if self.validate:
+            self._check_required(f"File {file.file_name}", file_data, ["SPDXID", "fileName"])
+            self._add_element_id(file_data.get("SPDXID"))
+        self._writer.add("files", file_data)
+
+    def add_relationship(self, relationship: Relationship) -> None:
+        for target in relationship.depends_on:
+            rel_data = self._converter._convert_single_relationship(  # pylint: disable=protected-access
+                relationship.bom_ref, target, relationship.relationship_type)
+            if self.validate:
+                self._check_reference(relationship.bom_ref, rel_data)
+                if target not in self.SPECIAL_ELEMENTS:
+                    self._check_reference(target, rel_data)
+            self._writer.add("relationships", rel_data)
+
+    def close(self) -> None:
+        if self._writer is None:
+            raise ValueError("Document metadata must be provided")
+        self._writer.close()
+        if not self.validate:
+            return
+
+        if not (self._writer.count("packages") or self._writer.count("files")):
+            self._add_error("SBOM must contain at least one component (package or file)")
+        for ref, rel_data in self._referenced_ids.items():
+            if ref not in self._element_ids:
+                self._add_error(f"Invalid reference: {ref} (no matching component) in relationship "
+                                f"{rel_data['spdxElementId']} {rel_data['relationshipType']} "
+                                f"{rel_data['relatedSpdxElement']}")
+        if self._duplicate_ids:
+            print(f"Warning: {self._duplicate_ids} SPDX elements reuse the SPDXID of an earlier element")
+        if self._error_count:
+            errors = list(self._errors)
+            if self._error_count > len(errors):
+                errors.append(f"... and {self._error_count - len(errors)} more errors")
+            raise ValueError(f"{self.file_path} is not a valid SPDX 2.3 document:\n" + "\n".join(errors))
+        print(f"Validated {self.file_path}")
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
+
+    def _add_error(self, message: str) -> None:
+        self._error_count += 1
+        if len(self._errors) < self.MAX_REPORTED_ERRORS:
+            self._errors.append(message)
+
+    def _check_required(self, element: str, data: Dict[str, Any], fields: List[str]) -> None:
+        missing = [name for name in fields if not data.get(name)]
+        if missing:
+            self._add_error(f"{element} missing: {', '.join(missing)}")
+
+    def _add_element_id(self, spdx_id: Optional[str]) -> None:
+        if not spdx_id:
+            return
+        if spdx_id in self._element_ids:
+            self._duplicate_ids += 1
+        self._element_ids.add(spdx_id)
+
+    def _check_reference(self, ref: str, rel_data: Dict[str, Any]) -> None:
+        # elements may be written after the relationships referring to them, resolved on close()
+        if ref and ref not in self._element_ids and ref not in self._referenced_ids:
+            self._referenced_ids[ref] = rel_data
+        elif not ref:
+            self._add_error(f"Relationship {rel_data['relationshipType']} missing an element: "
+                            f"{rel_data['spdxElementId']} -> {rel_data['relatedSpdxElement']}")
+
+
 # Register the converter with the factory
 SBOMConverter.register_format(SBOMFormat.SPDX, SPDX23Converter)
+SBOMConverter.register_stream_format(SBOMFormat.SPDX, SPDX23StreamWriter)
@@ -53,3 +53,51 @@ class Target:
         data = asdict(self)
         data.pop('target_name', None)
         return data
+
+
+class CompactTarget:
+    """
+    Memory-lean Target holding only the fields used by the SBOM analyzers.
+
+    List fields are tuples sharing one empty tuple, strings are interned and
+    metadata only keeps the install_modules entry.
+    """
+
+    __slots__ = ('target_name', 'type', 'args', 'deps', 'metadata', 'outputs',
+                 'source_outputs', 'sources', 'libs', 'ldflags', 'testonly')
+
+    LIST_FIELDS = ('args', 'deps', 'outputs', 'sources', 'libs', 'ldflags')
+    METADATA_KEYS = ('install_modules',)
+
+    def __init__(self, target_name: str = "", type: str = "", args: tuple = (), deps: tuple = (),
+                 metadata: Dict[str, Any] = None, outputs: tuple = (), source_outputs: Dict[str, Any] = None,
+                 sources: tuple = (), libs: tuple = (), ldflags: tuple = (), testonly: bool = False):
+        self.target_name = target_name
+        self.type = type
+        self.args = args
+        self.deps = deps
+        self.metadata = metadata or {}
+        self.outputs = outputs
+        self.source_outputs = source_outputs or {}
+        self.sources = sources
+        self.libs = libs
+        self.ldflags = ldflags
+        self.testonly = testonly
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in self.__slots__}
+        for name in self.LIST_FIELDS:
+            data[name] = list(data[name])
+        return data
+
+    def to_dict_without_name(self) -> Dict[str, Any]:
+        data = self.to_dict()
+        data.pop('target_name', None)
+        return data
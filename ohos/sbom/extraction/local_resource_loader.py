@@ -26,6 +26,7 @@ from ohos.sbom.common.utils import read_json, is_text_file
 from ohos.sbom.data.manifest import Manifest
 from ohos.sbom.data.ninja_json import NinjaJson
 from ohos.sbom.data.opensource import OpenSource
+from ohos.sbom.extraction.ninja_json_loader import NinjaJsonLoader
 
 
 class LocalResourceLoader:
@@ -125,8 +126,10 @@ class LocalResourceLoader:
             )
 
         try:
-            # Read and parse the JSON file
-            data = json.loads(gn_gen_path.read_text(encoding="utf-8"))
+            # Stream the JSON file into compact targets, reusing the compact
+            # form saved by a previous run on the same gn output
+            loader = NinjaJsonLoader(gn_gen_path, gn_gen_path.with_name("gn_gen.compact.pickle"))
+            ninja_json = loader.load()
         except json.JSONDecodeError as e:
             raise json.JSONDecodeError(
                 f"Invalid JSON in build configuration at {gn_gen_path}: {str(e)}",
@@ -136,17 +139,14 @@ class LocalResourceLoader:
             raise IOError(
                 f"Failed to read build configuration from {gn_gen_path}: {str(e)}"
             )
-
-        try:
-            # Create and cache the parsed object
-            ninja_json = NinjaJson.from_dict(data)
-            cls._add_cache_obj(cache_key, ninja_json)
-            return ninja_json
         except (TypeError, ValueError) as e:
             raise ValueError(
                 f"Failed to convert build configuration data from {gn_gen_path}: {str(e)}"
             )
 
+        cls._add_cache_obj(cache_key, ninja_json)
+        return ninja_json
+
     @classmethod
     def load_manifest(cls) -> Manifest:
         """
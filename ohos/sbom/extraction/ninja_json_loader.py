@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Northeastern University
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from ohos.sbom.data.build_setting import BuildSetting
+from ohos.sbom.data.ninja_json import NinjaJson
+from ohos.sbom.data.target import CompactTarget
+
+# Bump when CompactTarget or the retained fields change.
+COMPACT_NINJA_JSON_VERSION = 1
+
+
+class _JsonObjectStream:
+    """
+    Incremental reader of one JSON object, decoding one member value at a
+    time so that only the member being processed is held in memory.
+    """
+
+    _WHITESPACE = ' \t\n\r'
+
+    def __init__(self, file_obj, chunk_size: int = 4 * 1024 * 1024):
+        self._file = file_obj
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        # grow geometrically so that a large value is not decoded over and over
+        chunk = self._file.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def _expect(self, chars: str) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buf) or self._buf[self._pos] not in chars:
+            found = self._buf[self._pos:self._pos + 20] if self._pos < len(self._buf) else 'end of file'
+            raise ValueError(f"Expected one of '{chars}' in JSON stream, found '{found}'")
+        char = self._buf[self._pos]
+        self._pos += 1
+        return char
+
+    def _decode_value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # the value continues in the next chunk
+                if not self._fill():
+                    raise
+                continue
+            # a number may continue in the next chunk as well
+            if end < len(self._buf) or self._eof or not self._fill():
+                break
+        self._pos = end
+        return value
+
+    def begin_object(self):
+        self._expect('{')
+
+    def iter_members(self) -> Iterator[str]:
+        """Yield member names, the caller must consume each value."""
+        self._skip_whitespace()
+        if self._pos < len(self._buf) and self._buf[self._pos] == '}':
+            self._pos += 1
+            return
+        while True:
+            name = self._decode_value()
+            self._expect(':')
+            yield name
+            if self._expect(',}') == '}':
+                return
+
+    def read_value(self) -> Any:
+        return self._decode_value()
+
+
+class NinjaJsonLoader:
+    """
+    Streaming loader of the gn --ide=json output (gn_gen.json).
+
+    Targets are decoded one at a time into CompactTarget objects with interned
+    strings. The compact form can be persisted next to gn_gen.json and is
+    reused while the content of gn_gen.json is unchanged.
+    """
+
+    def __init__(self, gn_gen_path: Union[str, Path], cache_path: Optional[Union[str, Path]] = None):
+        self.gn_gen_path = Path(gn_gen_path)
+        self.cache_path = Path(cache_path) if cache_path else None
+
+    def load(self) -> NinjaJson:
+        fingerprint = self._fingerprint()
+        ninja_json = self._load_cache(fingerprint)
+        if ninja_json is not None:
+            print(f"Loaded compact build configuration from {self.cache_path}")
+            return ninja_json
+        build_setting, targets = self._parse()
+        ninja_json = NinjaJson(_build_setting=build_setting, _targets=targets)
+        self._save_cache(fingerprint, build_setting, targets)
+        return ninja_json
+
+    def _fingerprint(self) -> str:
+        sha256 = hashlib.sha256()
+        with open(self.gn_gen_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(4 * 1024 * 1024), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def _parse(self) -> Tuple[BuildSetting, Dict[str, CompactTarget]]:
+        build_setting = None
+        targets = {}
+        with open(self.gn_gen_path, 'r', encoding='utf-8') as f:
+            stream = _JsonObjectStream(f)
+            stream.begin_object()
+            for name in stream.iter_members():
+                if name == 'targets':
+                    stream.begin_object()
+                    for target_name in stream.iter_members():
+                        target_name = sys.intern(target_name)
+                        targets[target_name] = self.compact_target(target_name, stream.read_value())
+                elif name == 'build_settings':
+                    build_setting = BuildSetting.from_dict(stream.read_value())
+                else:
+                    stream.read_value()
+        if build_setting is None:
+            build_setting = BuildSetting.from_dict({})
+        return build_setting, targets
+
+    @staticmethod
+    def compact_target(target_name: str, data: Dict[str, Any]) -> CompactTarget:
+        intern = sys.intern
+        fields = {}
+        for name in CompactTarget.LIST_FIELDS:
+            values = data.get(name)
+            if values:
+                fields[name] = tuple(intern(v) if isinstance(v, str) else v for v in values)
+        metadata = data.get('metadata')
+        if metadata:
+            fields['metadata'] = {key: metadata[key] for key in CompactTarget.METADATA_KEYS if key in metadata}
+        source_outputs = data.get('source_outputs')
+        if source_outputs:
+            fields['source_outputs'] = {
+                intern(source): [intern(v) for v in outputs] for source, outputs in source_outputs.items()
+            }
+        return CompactTarget(target_name=target_name, type=intern(data.get('type', '')),
+                             testonly=data.get('testonly', False), **fields)
+
+    def _load_cache(self, fingerprint: str) -> Optional[NinjaJson]:
+        if not self.cache_path or not self.cache_path.is_file():
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                version, cached_fingerprint = pickle.load(f)
+                if version != COMPACT_NINJA_JSON_VERSION or cached_fingerprint != fingerprint:
+                    return None
+                build_setting, targets = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+            return None
+        return NinjaJson(_build_setting=build_setting, _targets=targets)
+
+    def _save_cache(self, fingerprint: str, build_setting: BuildSetting, targets: Dict[str, CompactTarget]):
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((COMPACT_NINJA_JSON_VERSION, fingerprint), f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump((build_setting, targets), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Warning: failed to save compact build configuration {self.cache_path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
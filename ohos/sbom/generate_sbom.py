@@ -29,9 +29,10 @@ sys.path.append(
         os.path.abspath(__file__)))))
 
 from ohos.sbom.common.utils import write_json
-from ohos.sbom.converters.api import SBOMConverter
+from ohos.sbom.converters.api import SBOMConverter, SBOMMetaDataStreamWriter
 from ohos.sbom.converters.base import SBOMFormat
 from ohos.sbom.extraction.local_resource_loader import LocalResourceLoader
+from ohos.sbom.pipeline.incremental_state import IncrementalState
 from ohos.sbom.pipeline.sbom_generator import SBOMGenerator
 
 
@@ -92,6 +93,15 @@ def set_path(args):
 def generate_sbom(args):
     """
     Generate SBOM (Software Bill of Materials) and clean up temporary files afterward.
+
+    With args.incremental, the intermediate results of the previous run are read from
+    <out_dir>/sbom/sbom_state.pickle, only what changed since then is analyzed again,
+    and the updated results are saved for the next run.
+
+    With args.streaming, the SBOM metadata and the SPDX document are written while they are
+    built instead of being converted in memory first. args.gzip compresses both files
+    (sbom_meta_data.json.gz, spdx.json.gz) and args.validate checks the SPDX document while
+    it is written; both imply streaming.
     """
     # Define the output directory for SBOM artifacts
     sbom_dir = os.path.join(args.out_dir, "sbom")
@@ -100,21 +110,44 @@ def generate_sbom(args):
     # Paths to temporary files/directories to be cleaned up
     manifests_dir = os.path.join(sbom_dir, "manifests")
     gn_gen_file = os.path.join(sbom_dir, "gn_gen.json")
+    state_file = os.path.join(sbom_dir, "sbom_state.pickle")
 
     try:
-        # Generate SBOM metadata using the provided arguments
-        sbom_meta_data = SBOMGenerator(args).build_sbom()
+        state = None
+        if getattr(args, "incremental", False):
+            state = IncrementalState.load(state_file)
+            if state is None:
+                print(f"No previous SBOM state in {state_file}, running a full generation")
+                state = IncrementalState()
 
-        # Convert SBOM metadata to SPDX format
-        spdx_data = SBOMConverter(sbom_meta_data).convert(SBOMFormat.SPDX)
+        compress = getattr(args, "gzip", False)
+        validate = getattr(args, "validate", False)
+        streaming = getattr(args, "streaming", False) or compress or validate
 
         # Define output file paths
-        output_file_meta_data = os.path.join(sbom_dir, "sbom_meta_data.json")
-        output_file_spdx = os.path.join(sbom_dir, "spdx.json")
-
-        # Write SBOM metadata and SPDX data to JSON files
-        write_json(sbom_meta_data.to_dict(), output_file_meta_data)
-        write_json(spdx_data, output_file_spdx)
+        suffix = ".gz" if compress else ""
+        output_file_meta_data = os.path.join(sbom_dir, "sbom_meta_data.json" + suffix)
+        output_file_spdx = os.path.join(sbom_dir, "spdx.json" + suffix)
+
+        if streaming:
+            # Write SBOM metadata and SPDX data while the SBOM is generated
+            with SBOMMetaDataStreamWriter(output_file_meta_data, compress=compress) as meta_data_writer, \
+                    SBOMConverter.open_stream(SBOMFormat.SPDX, output_file_spdx,
+                                              compress=compress, validate=validate) as spdx_writer:
+                SBOMGenerator(args, state).stream_sbom([meta_data_writer, spdx_writer])
+        else:
+            # Generate SBOM metadata using the provided arguments
+            sbom_meta_data = SBOMGenerator(args, state).build_sbom()
+
+            # Convert SBOM metadata to SPDX format
+            spdx_data = SBOMConverter(sbom_meta_data).convert(SBOMFormat.SPDX)
+
+            # Write SBOM metadata and SPDX data to JSON files
+            write_json(sbom_meta_data.to_dict(), output_file_meta_data)
+            write_json(spdx_data, output_file_spdx)
+
+        if state is not None:
+            state.save(state_file)
 
     finally:
         # Ensure cleanup runs regardless of success or failure
@@ -142,6 +175,16 @@ def main():
     parser.add_argument("--out-dir", type=str, required=True, help="SBOM output directory")
     parser.add_argument("--product", type=str, required=True, help="Product name")
     parser.add_argument("--platform", type=str, required=True, help="Target platform")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Number of processes scanning file copyrights and licenses, defaults to the CPU count")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the analysis results of the previous run for unchanged targets, files and packages")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Write the SBOM files while they are generated instead of building them in memory")
+    parser.add_argument("--gzip", action="store_true",
+                        help="Write gzip-compressed sbom_meta_data.json.gz and spdx.json.gz, implies --streaming")
+    parser.add_argument("--validate", action="store_true",
+                        help="Validate the SPDX document while it is written, implies --streaming")
     args = parser.parse_args()
     set_path(args)
     generate_manifest(args)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Northeastern University
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+# Bump when the layout of the state or the analysis results stored in it change.
+INCREMENTAL_STATE_VERSION = 1
+
+
+def target_fingerprint(target: Any) -> bytes:
+    """Digest of every field of a target the SBOM analyzers read."""
+    if hasattr(target, '__getstate__') and hasattr(target, '__slots__'):
+        state = target.__getstate__()
+    else:
+        state = sorted(target.to_dict().items())
+    return hashlib.blake2b(pickle.dumps(state, protocol=4), digest_size=16).digest()
+
+
+def closure_fingerprint(install_roots: List[str], closure: Iterable[str], fingerprints: Dict[str, bytes]) -> bytes:
+    """Digest of the install targets and of all targets reachable from them."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name in install_roots:
+        digest.update(name.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(b'\1')
+    for name in sorted(closure):
+        digest.update(name.encode('utf-8'))
+        digest.update(fingerprints.get(name, b''))
+    return digest.digest()
+
+
+def directory_fingerprint(directory: Union[str, Path], names: Iterable[str]) -> Optional[Tuple]:
+    """
+    Stat key of a directory and of the given entries in it, None when the
+    directory does not exist. Adding or removing an entry changes the mtime
+    of the directory, rewriting one changes its own stat.
+    """
+    try:
+        dir_stat = os.stat(directory)
+    except OSError:
+        return None
+    entries = []
+    for name in sorted(names):
+        try:
+            entry_stat = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        entries.append((name, entry_stat.st_ino, entry_stat.st_size, entry_stat.st_mtime_ns))
+    return dir_stat.st_mtime_ns, tuple(entries)
+
+
+@dataclass
+class TargetDiff:
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    changed: Set[str] = field(default_factory=set)
+
+    @property
+    def affected(self) -> Set[str]:
+        return self.added | self.removed | self.changed
+
+    def __str__(self) -> str:
+        return f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed targets"
+
+
+class IncrementalState:
+    """
+    Intermediate results of an SBOM run, reused by the next incremental run.
+
+    - target_fingerprints: target name -> target_fingerprint() of gn_gen.json
+    - module_infos: module info target -> (InstallModuleAnalyzer.args_key, install_enable, dest)
+    - file_closure / file_snapshot: fingerprint of the install closure and the
+      FileDependencyAnalyzer snapshot built from it
+    - project_licenses: project path -> (directory_fingerprint, license)
+
+    Every entry is a pure function of its key, so reusing it gives the same
+    result as recomputing it.
+    """
+
+    def __init__(self):
+        self.target_fingerprints: Dict[str, bytes] = {}
+        self.module_infos: Dict[str, Tuple[bytes, bool, List[str]]] = {}
+        self.file_closure: Optional[bytes] = None
+        self.file_snapshot: Optional[Dict[str, Any]] = None
+        self.project_licenses: Dict[str, Tuple[Any, str]] = {}
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional['IncrementalState']:
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                version = pickle.load(f)
+                if version != INCREMENTAL_STATE_VERSION:
+                    return None
+                state = cls()
+                state.__dict__.update(pickle.load(f))
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError) as e:
+            print(f"Warning: ignoring unreadable SBOM state {path}: {e}")
+            return None
+        return state
+
+    def save(self, path: Union[str, Path]) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(INCREMENTAL_STATE_VERSION, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: failed to save SBOM state {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def diff(self, fingerprints: Dict[str, bytes]) -> TargetDiff:
+        previous = self.target_fingerprints
+        result = TargetDiff()
+        for name, fingerprint in fingerprints.items():
+            old = previous.get(name)
+            if old is None:
+                result.added.add(name)
+            elif old != fingerprint:
+                result.changed.add(name)
+        result.removed = {name for name in previous if name not in fingerprints}
+        return result
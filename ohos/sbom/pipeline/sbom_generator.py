@@ -19,18 +19,22 @@
 import os
 from argparse import ArgumentParser
 from pathlib import Path
-from typing import Dict, List, Union, Set, Optional
+from typing import Any, Dict, List, Union, Set, Optional, Tuple
 
 from ohos.sbom.analysis.depend_graph import DependGraphAnalyzer
 from ohos.sbom.analysis.file_dependency import FileDependencyAnalyzer
 from ohos.sbom.analysis.install_module import InstallModuleAnalyzer
 from ohos.sbom.analysis.project_dependency import ProjectDependencyAnalyzer
 from ohos.sbom.common.utils import generate_purl, get_purl_type_from_url, commit_url_of
+from ohos.sbom.converters.base import ISBOMStreamWriter
 from ohos.sbom.data.file_dependence import File
 from ohos.sbom.data.manifest import Project
 from ohos.sbom.data.opensource import OpenSource
-from ohos.sbom.extraction.copyright_and_license_scanner import LicenseFileScanner, FileScanner
+from ohos.sbom.extraction.copyright_and_license_scanner import LicenseDetector, LicenseFileScanner, FileScanner
 from ohos.sbom.extraction.local_resource_loader import LocalResourceLoader
+from ohos.sbom.pipeline.incremental_state import (IncrementalState, closure_fingerprint, directory_fingerprint,
+                                                  target_fingerprint)
+from ohos.sbom.sbom.builder.document_builder import DocumentBuilder
 from ohos.sbom.sbom.builder.file_builder import FileBuilder
 from ohos.sbom.sbom.builder.package_builder import PackageBuilder
 from ohos.sbom.sbom.builder.relationship_builder import RelationshipBuilder
@@ -39,15 +43,26 @@ from ohos.sbom.sbom.metadata.sbom_meta_data import RelationshipType, SBOMMetaDat
 
 
 class SBOMGenerator:
-    def __init__(self, args: ArgumentParser):
+    def __init__(self, args: ArgumentParser, state: Optional[IncrementalState] = None):
+        """
+        Args:
+            args: Parsed command-line arguments
+            state: Intermediate results of the previous run. When given, only the targets, files and
+                packages changed since then are analyzed again and the state is updated in place for
+                the next run.
+        """
         self.args = args
+        self.state = state
         self.source_ninja_json = None
         self.manifest = None
         self.file_dependence_analyzer = None
         self._install_target_name_dest_map: Dict[str, List[str]] = {}
         self._file_ref_map: Dict[str, str] = {}
         self._file_dep_filter: Dict[str, File] = {}
+        self._project_licenses: Dict[str, Tuple[Any, str]] = {}
         self.sbom_builder: SBOMMetaDataBuilder = SBOMMetaDataBuilder()
+        self._stream_writers: Optional[List[ISBOMStreamWriter]] = None
+        self._stream_counts: Dict[str, int] = {}
         self.license_scanner = LicenseFileScanner()
         self.file_scanner = FileScanner()
         self.init()
@@ -58,14 +73,54 @@ class SBOMGenerator:
         print("Initializing [1/4]: Loading Manifest and gn-generated JSON ...")
         self.source_ninja_json = LocalResourceLoader.load_ninja_json()
         self.manifest = LocalResourceLoader.load_manifest()
+        fingerprints = None
+        if self.state is not None:
+            fingerprints = {t.target_name: target_fingerprint(t) for t in self.source_ninja_json.all_targets()}
+            print(f"Incremental: {self.state.diff(fingerprints)} since the previous SBOM")
+            self.state.target_fingerprints = fingerprints
         print("Initializing [2/4]: Determining whether Targets are installed to the image ...")
-        install_module_analyzer = InstallModuleAnalyzer(self.source_ninja_json)
+        install_module_analyzer = InstallModuleAnalyzer(
+            self.source_ninja_json, self.state.module_infos if self.state is not None else None)
         self._install_target_name_dest_map = install_module_analyzer.get_install_with_dest()
+        if self.state is not None:
+            print(f"Incremental: reused {install_module_analyzer.reused_module_infos} module infos")
+            self.state.module_infos = {name: info for name, info in self.state.module_infos.items()
+                                       if name in fingerprints}
         print("Initializing [3/4]: Building Target dependency network ...")
         depend_graph_analyzer = DependGraphAnalyzer(self.source_ninja_json)
         print("Initializing [4/4]: Building dependencies for files installed on the image ...")
         self.file_dependence_analyzer = FileDependencyAnalyzer(depend_graph_analyzer)
-        self.file_dependence_analyzer.build_all_install_deps_optimized(self._install_target_name_dest_map.keys())
+        install_targets = list(self._install_target_name_dest_map.keys())
+        if self.state is None:
+            self.file_dependence_analyzer.build_all_install_deps_optimized(install_targets)
+        else:
+            self._build_file_dependencies_incremental(depend_graph_analyzer, install_targets, fingerprints)
+
+    def _build_file_dependencies_incremental(self, depend_graph_analyzer: DependGraphAnalyzer,
+                                             install_targets: List[str], fingerprints: Dict[str, bytes]):
+        """
+        The file dependencies are collected by one traversal in which the
+        first target reaching an output owns it, so a change anywhere in the
+        install closure may move files between targets. They are restored
+        from the previous run when no target in the closure changed and
+        collected again otherwise.
+        """
+        closure_root = "__SBOM_CLOSURE_ROOT__"
+        depend_graph_analyzer.add_virtual_root(closure_root, install_targets)
+        try:
+            closure = depend_graph_analyzer.descendants(closure_root)
+        finally:
+            depend_graph_analyzer.remove_virtual_root(closure_root)
+        closure_key = closure_fingerprint(install_targets, closure, fingerprints)
+
+        if self.state.file_snapshot is not None and self.state.file_closure == closure_key:
+            print(f"Incremental: no change in the {len(closure)} installed targets and their dependencies, "
+                  f"reusing the file dependencies of the previous SBOM")
+            self.file_dependence_analyzer.restore(self.state.file_snapshot)
+            return
+        self.file_dependence_analyzer.build_all_install_deps_optimized(install_targets)
+        self.state.file_snapshot = self.file_dependence_analyzer.snapshot()
+        self.state.file_closure = closure_key
 
     def build_filtered_files(self):
         """
@@ -105,10 +160,14 @@ class SBOMGenerator:
 
     def build_file_information(self):
         all_files = self._file_dep_filter
+        scan_results = self.file_scanner.scan_files(
+            list(all_files.keys()),
+            jobs=getattr(self.args, "jobs", None),
+            cache_file=os.path.join(self.args.out_dir, "sbom", "file_scan_cache.json"))
 
         for file_path, file_obj in all_files.items():
             file_id = self._file_ref_map[file_path]
-            file_scanner_ret = self._extract_scanner_info(file_path)
+            file_scanner_ret = self._extract_scanner_info(file_path, scan_results.get(file_path))
             file = (FileBuilder()
                     .with_file_name(os.path.basename(file_path))
                     .with_file_id(file_id)
@@ -116,7 +175,7 @@ class SBOMGenerator:
                     .with_copyright_text(file_scanner_ret["copyright_text"])
                     )
 
-            self.sbom_builder.add_file(file)
+            self._emit_file(file)
 
         for file_path, file_obj in all_files.items():
             for relationship_type in RelationshipType:
@@ -128,11 +187,13 @@ class SBOMGenerator:
                 for dep in dependencies:
                     dep_id = self._file_ref_map[dep.relative_path]
                     dep_file_id_list.append(dep_id)
+                # dependencies are a set, keep the output independent of its iteration order
+                dep_file_id_list.sort()
                 relationship_builder = (RelationshipBuilder().with_relationship_type(relationship_type)
                                         .with_bom_ref(file_id)
                                         .with_depends_on(dep_file_id_list)
                                         )
-                self.sbom_builder.add_relationship(relationship_builder)
+                self._emit_relationship(relationship_builder)
 
     def build_package_information(self):
         """Build package information and dependencies for SBOM generation."""
@@ -142,10 +203,12 @@ class SBOMGenerator:
 
         project_bom_refs = self._build_main_packages(all_project_dependence)
         self._build_dependencies(all_project_dependence, project_bom_refs)
+        if self.state is not None:
+            self.state.project_licenses = self._project_licenses
 
     def build_document_information(self):
         doc_builder = self.sbom_builder.start_document()
-        doc_builder.with_name(f"{self.args.product}-{self.manifest.default['revision']}").end()
+        doc_builder.with_name(self._document_name()).end()
 
     def build_sbom(self) -> SBOMMetaData:
         print("Building file information...")
@@ -162,14 +225,94 @@ class SBOMGenerator:
         print("• Relationships:", len(sbom_meta_data.relationships))
         return sbom_meta_data
 
+    def stream_sbom(self, writers: List[ISBOMStreamWriter]) -> None:
+        """
+        Build the SBOM like build_sbom(), but hand every component to the writers as soon
+        as it is built instead of collecting the complete SBOMMetaData in memory. The
+        writers receive the same components in the same order as build_sbom() returns them.
+
+        Like build_sbom(), which builds the SBOMMetaData with validate=False, the components
+        are not checked against their field configurations: the pipeline does not set required
+        fields such as file checksums and the document namespace, so every file and the
+        document would fail that check. References between components are checked by the
+        writers themselves (see the validate option of the SPDX stream writer).
+        """
+        self._stream_writers = writers
+        self._stream_counts = {"packages": 0, "files": 0, "relationships": 0}
+        try:
+            print("Building document information...")
+            document = DocumentBuilder().with_name(self._document_name()).build(validate=False)
+            for writer in writers:
+                writer.write_document(document)
+            print("Building file information...")
+            self.build_file_information()
+            print("Building package information...")
+            self.build_package_information()
+        finally:
+            self._stream_writers = None
+        print("Generation completed:")
+        print("• Packages:", self._stream_counts["packages"])
+        print("• Files:", self._stream_counts["files"])
+        print("• Relationships:", self._stream_counts["relationships"])
+
+    def _document_name(self) -> str:
+        return f"{self.args.product}-{self.manifest.default['revision']}"
+
+    def _emit_file(self, file: FileBuilder) -> None:
+        if self._stream_writers is None:
+            self.sbom_builder.add_file(file)
+            return
+        built = file.build(validate=False)
+        for writer in self._stream_writers:
+            writer.add_file(built)
+        self._stream_counts["files"] += 1
+
+    def _emit_package(self, package: PackageBuilder) -> None:
+        if self._stream_writers is None:
+            self.sbom_builder.add_package(package)
+            return
+        built = package.build(validate=False)
+        for writer in self._stream_writers:
+            writer.add_package(built)
+        self._stream_counts["packages"] += 1
+
+    def _emit_relationship(self, relationship: RelationshipBuilder) -> None:
+        if self._stream_writers is None:
+            self.sbom_builder.add_relationship(relationship)
+            return
+        built = relationship.build(validate=False)
+        for writer in self._stream_writers:
+            writer.add_relationship(built)
+        self._stream_counts["relationships"] += 1
+
     def _get_file_reference(self, dep: File) -> Optional[str]:
         """Get the file reference for a file dependency."""
         return self._file_ref_map.get(dep.relative_path)
 
     def _get_project_license(self, source_project) -> str:
-        """Get the license for a project, defaulting to NOASSERTION if not found."""
+        """
+        Get the license for a project, defaulting to NOASSERTION if not found.
+        In incremental runs the license is reused while the license files of the project are unchanged.
+        """
+        key = None
+        if self.state is not None:
+            directory = LocalResourceLoader.to_local_path(source_project.path)
+            try:
+                names = [name for name in os.listdir(directory)
+                         if name.lower() in LicenseDetector.LICENSE_FILE_NAMES]
+            except OSError:
+                names = []
+            key = directory_fingerprint(directory, names)
+            cached = self.state.project_licenses.get(source_project.path)
+            if key is not None and cached is not None and cached[0] == key:
+                self._project_licenses[source_project.path] = cached
+                return cached[1]
+
         license_scanner_ret = self.license_scanner.scan(source_project.path)
-        return license_scanner_ret[0]["license_type"] if len(license_scanner_ret) >= 1 else NOASSERTION
+        license_type = license_scanner_ret[0]["license_type"] if len(license_scanner_ret) >= 1 else NOASSERTION
+        if key is not None:
+            self._project_licenses[source_project.path] = (key, license_type)
+        return license_type
 
     def _add_relationship(self, source_bom_ref: str, depends_on_refs: List[str], rel_type: RelationshipType) -> None:
         """Add a relationship to the SBOM builder."""
@@ -177,7 +320,7 @@ class SBOMGenerator:
               .with_bom_ref(source_bom_ref)
               .with_depends_on(depends_on_refs)
               .with_relationship_type(rel_type))
-        self.sbom_builder.add_relationship(rb)
+        self._emit_relationship(rb)
 
     def _add_install_dest_file(self):
         target_name_map_file = self.file_dependence_analyzer.get_target_name_map_file()
@@ -211,12 +354,14 @@ class SBOMGenerator:
             for src_file in matched_files:
                 dest_file.add_dependency(RelationshipType.COPY_OF, src_file)
 
-    def _extract_scanner_info(self, file_path: Union[str, Path]) -> Dict:
+    def _extract_scanner_info(self, file_path: Union[str, Path], scan_result: Optional[Dict] = None) -> Dict:
         """
         Extract license and copyright information from the scan result of a file.
 
         Args:
             file_path (str or Path): Path to the file being scanned.
+            scan_result (Dict, optional): Result of FileScanner.scan_files() for the file,
+                the file is scanned when not given.
 
         Returns:
             Dict: A dictionary containing:
@@ -226,7 +371,7 @@ class SBOMGenerator:
                 - fileAuthor: Comma-separated list of filtered authors/holders
         """
         # Scan the file and extract results
-        ret = self.file_scanner.scan(file_path)
+        ret = scan_result if scan_result is not None else self.file_scanner.scan(file_path)
         licenses = ret.get("licenses", [])
         copyrights = ret.get("copyrights", [])
 
@@ -301,7 +446,8 @@ class SBOMGenerator:
         """Process dependencies and return list of bom_refs."""
         depends_on_refs = []
 
-        for dep in dependencies:
+        # dependencies are a set, keep the output independent of its iteration order
+        for dep in sorted(dependencies, key=self._dependency_sort_key):
             if isinstance(dep, Project):
                 if dep.name in project_bom_refs:
                     depends_on_refs.append(project_bom_refs[dep.name])
@@ -316,6 +462,14 @@ class SBOMGenerator:
 
         return depends_on_refs
 
+    @staticmethod
+    def _dependency_sort_key(dep) -> Tuple[str, str]:
+        if isinstance(dep, File):
+            return "file", dep.relative_path
+        if isinstance(dep, OpenSource):
+            return "opensource", repr(dep)
+        return type(dep).__name__, getattr(dep, "name", "")
+
     def _build_main_packages(self, all_project_dependence: Dict) -> Dict:
         """Build main package information and return bom_refs mapping."""
         project_bom_refs = {}
@@ -332,7 +486,7 @@ class SBOMGenerator:
                 purl=purl,
                 package_version=package_version
             )
-            self.sbom_builder.add_package(pb)
+            self._emit_package(pb)
 
         return project_bom_refs
 
@@ -354,7 +508,7 @@ class SBOMGenerator:
                   .with_version(dep.version_number)
                   .with_download_location(dep.upstream_url)
                   .with_type("library"))
-            self.sbom_builder.add_package(pb)
+            self._emit_package(pb)
 
         return purl
 
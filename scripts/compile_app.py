@@ -22,8 +22,13 @@ import shutil
 import json
 import json5
 import uuid
+import time
+import hashlib
 import zipfile
 import tempfile
+import threading
+import contextlib
+import fcntl
 from pathlib import Path
 
 from util import build_utils
@@ -65,6 +70,11 @@ def parse_args(args):
     parser.add_argument('--product', help='set product value of hvigor cmd, default or others')
     parser.add_argument('--host-os', help='host os')
     parser.add_argument('--ohpm-path', help='ohpm path')
+    parser.add_argument('--hvigor-daemon', help='reuse warm hvigor daemons shared by the apps built '
+                        'with the same hvigor, nodejs and sdk, stopped when the last of them finishes',
+                        action='store_true')
+    parser.add_argument('--ohpm-modules-cache', help='reuse the oh_modules installed for the same '
+                        'oh-package files across app projects', action='store_true')
 
     options = parser.parse_args(args)
     return options
@@ -84,6 +94,125 @@ def get_root_dir():
                 current_dir = new_dir
 
 
+@contextlib.contextmanager
+def record_time(timings: dict, step: str):
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        timings[step] = round(time.monotonic() - start, 3)
+
+
+def write_timings(cwd: str, timings: dict, hash_value: str):
+    '''
+    Print the time of the compile steps of this app and write them to build/compile_app_timing.json
+    '''
+    print(f"[0/0] [{hash_value}] compile app timing: " +
+          ', '.join(f'{step} {seconds:.1f}s' for step, seconds in timings.items()))
+    os.makedirs(os.path.join(cwd, 'build'), exist_ok=True)
+    file_utils.write_json_file(os.path.join(cwd, 'build', 'compile_app_timing.json'), timings)
+
+
+def get_shared_cache_dir(name: str) -> str:
+    cache_base = os.environ.get('CACHE_BASE')
+    if cache_base:
+        return os.path.join(cache_base, name)
+    return os.path.join(get_root_dir(), 'out', name)
+
+
+def _oh_modules_dirs(cwd: str, modules_list: list) -> list:
+    rel_dirs = ['.']
+    for module in modules_list or []:
+        src_path = module.get('srcPath')
+        if src_path and os.path.normpath(src_path) not in rel_dirs:
+            rel_dirs.append(os.path.normpath(src_path))
+    return rel_dirs
+
+
+_OH_PACKAGE_DEPENDENCY_KEYS = ('dependencies', 'devDependencies', 'dynamicDependencies', 'overrides')
+
+
+def _local_dependencies(package_file: str) -> list:
+    '''
+    Paths of the "file:" dependencies of an oh-package.json5, resolved against its directory
+    '''
+    with open(package_file, 'r') as package_f:
+        package_info = json5.load(package_f)
+    local_deps = []
+    for dep_key in _OH_PACKAGE_DEPENDENCY_KEYS:
+        for spec in (package_info.get(dep_key) or {}).values():
+            if isinstance(spec, str) and spec.startswith('file:'):
+                local_dep = os.path.join(os.path.dirname(package_file), spec[len('file:'):])
+                local_deps.append(os.path.normpath(local_dep))
+    return local_deps
+
+
+def get_oh_modules_key(cwd: str, modules_list: list, ohpm_install_cmd: list):
+    '''
+    Content address of the oh_modules of a project: the oh-package.json5 and
+    oh-package-lock.json5 files of the project and its modules, the content of their
+    local .har/.tgz dependencies and the ohpm command.
+    :return: the key, None if the project has no lock file to pin the installed packages
+        or depends on a local module directory, whose sources are not hashed
+    '''
+    if not os.path.isfile(os.path.join(cwd, 'oh-package-lock.json5')):
+        return None
+    sha256 = hashlib.sha256()
+    sha256.update(' '.join(ohpm_install_cmd).encode())
+    for rel_dir in _oh_modules_dirs(cwd, modules_list):
+        for file_name in ('oh-package.json5', 'oh-package-lock.json5'):
+            package_file = os.path.join(cwd, rel_dir, file_name)
+            sha256.update(f'\0{rel_dir}/{file_name}\0'.encode())
+            if os.path.isfile(package_file):
+                with open(package_file, 'rb') as package_f:
+                    sha256.update(package_f.read())
+        package_file = os.path.join(cwd, rel_dir, 'oh-package.json5')
+        if not os.path.isfile(package_file):
+            continue
+        try:
+            local_deps = _local_dependencies(package_file)
+        except ValueError:
+            return None
+        for local_dep in local_deps:
+            if not os.path.isfile(local_dep):
+                return None
+            sha256.update(f'\0{os.path.relpath(local_dep, cwd)}\0'.encode())
+            with open(local_dep, 'rb') as dep_f:
+                for chunk in iter(lambda: dep_f.read(1024 * 1024), b''):
+                    sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def restore_oh_modules(cache_dir: str, cwd: str, modules_list: list) -> bool:
+    if not os.path.isdir(cache_dir):
+        return False
+    for rel_dir in _oh_modules_dirs(cwd, modules_list):
+        cached = os.path.join(cache_dir, rel_dir, 'oh_modules')
+        if os.path.isdir(cached):
+            shutil.rmtree(os.path.join(cwd, rel_dir, 'oh_modules'), ignore_errors=True)
+            shutil.copytree(cached, os.path.join(cwd, rel_dir, 'oh_modules'), symlinks=True)
+    return True
+
+
+def save_oh_modules(cache_dir: str, cwd: str, modules_list: list):
+    if os.path.isdir(cache_dir):
+        return
+    tmp_dir = '{}.{}.tmp'.format(cache_dir, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_dir), exist_ok=True)
+        for rel_dir in _oh_modules_dirs(cwd, modules_list):
+            installed = os.path.join(cwd, rel_dir, 'oh_modules')
+            if os.path.isdir(installed):
+                shutil.copytree(installed, os.path.join(tmp_dir, rel_dir, 'oh_modules'), symlinks=True)
+        os.makedirs(tmp_dir, exist_ok=True)
+        # another app with the same packages may have saved them meanwhile
+        os.rename(tmp_dir, cache_dir)
+    except OSError:
+        pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
 def make_env(build_profile: str, cwd: str, ohpm_registry: str, options, hash_value: str, node_home: str):
     '''
     Set up the application compilation environment and run "ohpm install"
@@ -118,6 +247,15 @@ def make_env(build_profile: str, cwd: str, ohpm_registry: str, options, hash_val
             subprocess.run(['chmod', '+x', 'hvigorw'])
         if os.path.exists(os.path.join(cwd, '.arkui-x/android/gradlew')):
             subprocess.run(['chmod', '+x', '.arkui-x/android/gradlew'])
+        cache_dir = None
+        if options.ohpm_modules_cache:
+            oh_modules_key = get_oh_modules_key(cwd, modules_list, ohpm_install_cmd)
+            if oh_modules_key:
+                cache_dir = os.path.join(get_shared_cache_dir('ohpm_modules_cache'), oh_modules_key)
+                if restore_oh_modules(cache_dir, cwd, modules_list):
+                    print(f"[0/0] [{hash_value}] oh_modules restored from {cache_dir}")
+                    os.chdir(cur_dir)
+                    return
         proc = subprocess.Popen(ohpm_install_cmd,
                                 stdout=subprocess.PIPE,
                                 stderr=subprocess.PIPE,
@@ -127,6 +265,8 @@ def make_env(build_profile: str, cwd: str, ohpm_registry: str, options, hash_val
         if proc.returncode:
             raise Exception('ReturnCode:{}. ohpm install failed. {}'.format(
                 proc.returncode, stdout))
+        if cache_dir:
+            save_oh_modules(cache_dir, cwd, modules_list)
     os.chdir(cur_dir)
 
 
@@ -245,25 +385,46 @@ def copy_libs(cwd: str, system_lib_module_info_list: list, ohos_app_abi: str, mo
 
 
 def hvigor_write_log(cmd, cwd, env, hash_value):
-    proc = subprocess.Popen(cmd, 
-                            cwd=cwd, 
+    os.makedirs(os.path.join(cwd, 'build'), exist_ok=True)
+    proc = subprocess.Popen(cmd,
+                            cwd=cwd,
                             env=env,
                             stdout=subprocess.PIPE,
                             stderr=subprocess.PIPE,
                             encoding='utf-8')
-    stdout, stderr = proc.communicate()
-    for line in stdout.splitlines():
-        print(f"[1/1] [{hash_value}] Hvigor info: {line}")
-    for line in stderr.splitlines():
-        print(f"[2/2] [{hash_value}] Hvigor warning: {line}")
-    os.makedirs(os.path.join(cwd, 'build'), exist_ok=True)
+    # the lines are printed as hvigor writes them, stderr is read in a thread
+    # so that neither pipe fills up while the other one is read
+    print_lock = threading.Lock()
+    stderr_lines = []
+    build_failed = False
+
+    def read_stderr():
+        nonlocal build_failed
+        for line in proc.stderr:
+            line = line.rstrip('\n')
+            stderr_lines.append(line)
+            build_failed = build_failed or "ERROR: BUILD FAILED" in line
+            with print_lock:
+                print(f"[2/2] [{hash_value}] Hvigor warning: {line}", flush=True)
+
+    stderr_thread = threading.Thread(target=read_stderr, daemon=True)
+    stderr_thread.start()
     with os.fdopen(os.open(os.path.join(cwd, 'build', 'build.log'),
                             os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
                             stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH),
                     'w') as f:
-        f.write(f'{stdout}\n')
+        for line in proc.stdout:
+            f.write(line)
+            line = line.rstrip('\n')
+            build_failed = build_failed or "ERROR: BUILD FAILED" in line
+            with print_lock:
+                print(f"[1/1] [{hash_value}] Hvigor info: {line}", flush=True)
+        proc.wait()
+        stderr_thread.join()
+        stderr = '\n'.join(stderr_lines)
+        f.write('\n')
         f.write(f'{stderr}\n')
-    if proc.returncode or "ERROR: BUILD FAILED" in stderr or "ERROR: BUILD FAILED" in stdout:
+    if proc.returncode or build_failed:
         raise Exception('ReturnCode:{}. Hvigor build failed: {}'.format(proc.returncode, stderr))
     print(f"[0/0] [{hash_value}] Hvigor build end")
 
@@ -372,7 +533,7 @@ def build_hvigor_cmd(cwd: str, model_version: str, options, hash_val: str):
             output_dir = os.path.join(target_out_dir, options.target_app_dir)
             cmd.extend(['-c', f'properties.ohos.buildDir="{output_dir}"'])
         
-    cmd.extend(['--no-daemon'])
+    cmd.extend(['--daemon' if options.hvigor_daemon else '--no-daemon'])
     
     print(f"[0/0] [{hash_val}] hvigor cmd: " + ' '.join(cmd))
     return cmd
@@ -403,20 +564,82 @@ def write_env_sdk(options, env):
     env['DEVECO_SDK_HOME'] = sdk_dir
 
 
-def hvigor_sync(cwd: str, model_version: str, env):
+def get_hvigor_daemon_home(cmd: list, cwd: str, options, node_home: str) -> str:
+    '''
+    Hvigor user home shared by the apps built with the same hvigor, nodejs and sdk,
+    the hvigor daemons started in it stay warm for the apps built meanwhile, see hvigor_daemon_lease
+    '''
+    hvigorw = os.path.realpath(os.path.join(cwd, cmd[1]))
+    key = hashlib.sha256('\n'.join([hvigorw, os.path.realpath(node_home),
+                                    os.path.realpath(options.sdk_home)]).encode()).hexdigest()[:16]
+    daemon_home = os.path.join(get_shared_cache_dir('hvigor_daemons'), key)
+    os.makedirs(daemon_home, exist_ok=True)
+    return daemon_home
+
+
+def _live_leases(lease_dir: str) -> list:
+    live = []
+    for name in os.listdir(lease_dir):
+        try:
+            os.kill(int(name), 0)
+        except ValueError:
+            continue
+        except ProcessLookupError:
+            # the build holding it was killed
+            os.unlink(os.path.join(lease_dir, name))
+            continue
+        except PermissionError:
+            pass
+        live.append(name)
+    return live
+
+
+@contextlib.contextmanager
+def hvigor_daemon_lease(daemon_home: str, cmd: list, cwd: str, env, hash_value: str):
+    '''
+    Bound the lifetime of the hvigor daemons of daemon_home to the app builds using them.
+    Every build holds a lease file named by its pid while it runs hvigor, the last one
+    to finish stops the daemons with "hvigorw --stop-daemon-all". A build starting
+    after that starts new daemons. Leases of killed builds are dropped.
+    '''
+    lease_dir = os.path.join(daemon_home, 'leases')
+    os.makedirs(lease_dir, exist_ok=True)
+    lease_file = os.path.join(lease_dir, str(os.getpid()))
+    with open(os.path.join(daemon_home, 'leases.lock'), 'w') as lock_f:
+        fcntl.flock(lock_f, fcntl.LOCK_EX)
+        with open(lease_file, 'w'):
+            pass
+    try:
+        yield
+    finally:
+        with open(os.path.join(daemon_home, 'leases.lock'), 'w') as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+            if os.path.exists(lease_file):
+                os.unlink(lease_file)
+            if not _live_leases(lease_dir):
+                print(f"[0/0] [{hash_value}] stop the hvigor daemons of {daemon_home}")
+                subprocess.run(cmd[:2] + ['--stop-daemon-all'],
+                               cwd=cwd,
+                               env=env,
+                               stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+
+
+def hvigor_sync(cwd: str, model_version: str, env, daemon: bool = False):
     if not model_version:
-        subprocess.run(['bash', './hvigorw', '--sync', '--no-daemon'],
+        subprocess.run(['bash', './hvigorw', '--sync', '--daemon' if daemon else '--no-daemon'],
                    cwd=cwd,
                    env=env,
                    stdout=subprocess.DEVNULL,
                    stderr=subprocess.DEVNULL)
 
 
-def hvigor_build(cwd: str, options, hash_value: str, node_home: str):
+def hvigor_build(cwd: str, options, hash_value: str, node_home: str, timings: dict):
     '''
     Run hvigorw to build the app or hap
     :param cwd: app project directory
     :param options: command line parameters
+    :param timings: the time of the sync and of the build are recorded in it
     :return: None
     '''
     model_version = get_integrated_project_config(cwd, hash_value)
@@ -433,11 +656,18 @@ def hvigor_build(cwd: str, options, hash_value: str, node_home: str):
     library_path = os.path.join(os.path.abspath(options.sdk_home), '20/ets/static/build-tools/ets2panda/lib/')
     env['LD_LIBRARY_PATH'] = library_path
     set_sdk_path(cwd, model_version, options, env, node_home)
+    daemon_lease = contextlib.nullcontext()
+    if options.hvigor_daemon:
+        env['HVIGOR_USER_HOME'] = get_hvigor_daemon_home(cmd, cwd, options, node_home)
+        daemon_lease = hvigor_daemon_lease(env['HVIGOR_USER_HOME'], cmd, cwd, env, hash_value)
 
-    hvigor_sync(cwd, model_version, env)
-    
-    print(f"[0/0] [{hash_value}] Hvigor build start")
-    hvigor_write_log(cmd, cwd, env, hash_value)
+    with daemon_lease:
+        with record_time(timings, 'hvigor_sync'):
+            hvigor_sync(cwd, model_version, env, options.hvigor_daemon)
+
+        print(f"[0/0] [{hash_value}] Hvigor build start")
+        with record_time(timings, 'hvigor_build'):
+            hvigor_write_log(cmd, cwd, env, hash_value)
 
 
 def strip_rpcid_from_haps(build_profile: str, cwd: str, options, hash_value: str):
@@ -522,11 +752,16 @@ def main(args):
     # add arkui-x to PATH
     os.environ['PATH'] = f'{cwd}/.arkui-x/android:{os.environ.get("PATH")}'
 
+    timings = {}
     # generate unsigned_hap_path_list and run ohpm install
-    make_env(options.build_profile, cwd, options.ohpm_registry, options, hash_value, nodejs_home)
+    with record_time(timings, 'ohpm_install'):
+        make_env(options.build_profile, cwd, options.ohpm_registry, options, hash_value, nodejs_home)
 
     # invoke hvigor to build hap or app
-    hvigor_build(cwd, options, hash_value, nodejs_home)
+    try:
+        hvigor_build(cwd, options, hash_value, nodejs_home, timings)
+    finally:
+        write_timings(cwd, timings, hash_value)
 
     # strip rpcid.sc from unsigned haps
     strip_rpcid_from_haps(options.build_profile, cwd, options, hash_value)
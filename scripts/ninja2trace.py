@@ -13,17 +13,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""
+Usage: ninja2trace.py --ninja-log out/rk3568/.ninja_log \
+           --trace-file out/rk3568/build.trace \
+           --duration-file out/rk3568/sorted_action_duration.txt \
+           [--report-file out/rk3568/build_analysis.txt \
+            --parts-path-info out/rk3568/build_configs/parts_info/parts_path_info.json \
+            --part-subsystem-info out/rk3568/build_configs/parts_info/part_subsystem.json] \
+           [--resource-samples out/rk3568/resource_samples.bin]
+
+Convert .ninja_log into a chrome trace (build.trace.gz) and a list of actions
+sorted by duration. With --report-file, the critical path, the build time
+aggregated per subsystem and part, and the parallelism over time are written
+as well. With --resource-samples, the cpu, memory and pressure stall samples
+taken by hb during ninja are added to the trace as counter tracks.
+"""
+
 import os
 import sys
 import json
 import gzip
+import heapq
 import shutil
+import bisect
 import argparse
+from json.encoder import encode_basestring_ascii
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.util.resource_samples import read_samples  # noqa: E402
 
 KFILESIGNATURE = "# ninja log v5\n"
 
+# counter tracks of build.trace and the resource sample columns shown in them
+RESOURCE_COUNTERS = (
+    ('cpu', ('cpu_busy_percent', 'cpu_iowait_percent')),
+    ('memory', ('mem_used_mb', 'swap_used_mb', 'build_rss_mb')),
+    ('build processes', ('build_processes',)),
+    ('pressure stall', ('cpu_stall_ms', 'mem_stall_ms', 'mem_full_stall_ms', 'io_stall_ms')),
+)
+
 
 class StoringDataLine(object):
+    __slots__ = ('start', 'end', 'target_obj_names')
+
     def __init__(self, start, end):
         self.start = int(start)
         self.end = int(end)
@@ -38,11 +70,19 @@ class NinjaToTrace(object):
         self.datalist = list()
         self.durations = list()
 
+    @staticmethod
+    def _start_time_threshold(ninja_start_time):
+        if ninja_start_time is None:
+            return -1
+        # "%f" formatted nanoseconds, keep the integer part to avoid float rounding
+        return int(str(ninja_start_time).split('.')[0])
+
     def parse_file(self, filename, ninja_start_time):
         # ensure file exist
         if not os.path.exists(filename):
             print("file: {} not exists".format(filename))
             return False
+        start_threshold = self._start_time_threshold(ninja_start_time)
         storing_data = {}
         with open(filename, mode='r') as f:
             firstline = f.readline()
@@ -50,12 +90,14 @@ class NinjaToTrace(object):
                 print("unrecognized ninja log format, we need {}".format(
                     KFILESIGNATURE))
 
-            for _, line in enumerate(f.readlines()):
-                start, end, time_stamp, name, cmdhash = line.strip().split(
-                    '\t')
-                if time_stamp > ninja_start_time:
-                    storing_data.setdefault(cmdhash, StoringDataLine(start, end))
-                    storing_data.get(cmdhash).target_obj_names.append(name)
+            for line in f:
+                start, end, time_stamp, name, cmdhash = line.rstrip('\n').split('\t')
+                if int(time_stamp) > start_threshold:
+                    data_line = storing_data.get(cmdhash)
+                    if data_line is None:
+                        data_line = StoringDataLine(start, end)
+                        storing_data[cmdhash] = data_line
+                    data_line.target_obj_names.append(name)
 
         self.datalist = sorted(storing_data.values(),
                                key=lambda line: line.start)
@@ -69,28 +111,53 @@ class NinjaToTrace(object):
         if os.path.exists(duration_file):
             shutil.move(duration_file, '{}/sorted_action_duration.{}.txt'.format(os.path.dirname(duration_file),
                 os.stat(duration_file).st_mtime))
+        lines = []
+        for item in self.durations:
+            duration = item.end - item.start
+            total_time += duration
+            lines.append('{}: {}\n'.format(item.target_obj_names[0], duration))
+        lines.append('total time: {} ms'.format(total_time))
         with open(duration_file, 'w') as file:
-            for item in self.durations:
-                duration = item.end - item.start
-                total_time += duration
-                file.write('{}: {}\n'.format(item.target_obj_names[0],
-                                             duration))
-            file.write('total time: {} ms'.format(total_time))
-
-    def trans_to_trace_json(self, dest_file_name: str):
+            file.writelines(lines)
+
+    @staticmethod
+    def resource_counter_events(sample_file: str, ninja_start_time):
+        """Counter events of the resource samples taken after ninja started."""
+        if not sample_file or not os.path.isfile(sample_file) or ninja_start_time is None:
+            return []
+        try:
+            columns, phases = read_samples(sample_file)
+        except (OSError, ValueError, KeyError) as err:
+            print("read resource samples {} failed: {}".format(sample_file, err))
+            return []
+        start_us = NinjaToTrace._start_time_threshold(ninja_start_time) // 1000
+        events = []
+        for index, sample_time in enumerate(columns.get('time', [])):
+            ts = int(sample_time * 1000000) - start_us
+            if ts < 0:
+                continue
+            for name, counter_columns in RESOURCE_COUNTERS:
+                args = {column: round(columns[column][index], 1)
+                        for column in counter_columns if column in columns}
+                events.append(json.dumps({"name": name, "cat": "resources", "ph": "C", "ts": ts,
+                                          "pid": "0", "args": args}))
+        return events
+
+    def trans_to_trace_json(self, dest_file_name: str, counter_events: list = None):
         counter = CountingTheTid()
+        # same text as json.dumps() of the event dicts, formatted directly
+        # since building 100k+ dicts dominates the conversion time
+        event_format = '{{"name": {}, "cat": "targets", "ph": "X", "ts": "{}", "dur": "{}", ' \
+                       '"pid": "0", "tid": "{}", "args": {{}}}}'
         tracelist = list()
         for storingdataline in self.datalist:
-            tracelist.append({
-                'name': '%0s' % ', '.join(storingdataline.target_obj_names),
-                'cat': 'targets',
-                'ph': 'X',
-                'ts': str(storingdataline.start * 1000),
-                'dur': str((storingdataline.end - storingdataline.start) * 1000),
-                'pid': str(0),
-                'tid': str(counter.counting_the_new_tid(storingdataline)),
-                'args': {},
-            })
+            tracelist.append(event_format.format(
+                encode_basestring_ascii(', '.join(storingdataline.target_obj_names)),
+                storingdataline.start * 1000,
+                (storingdataline.end - storingdataline.start) * 1000,
+                counter.counting_the_new_tid(storingdataline)))
+        if counter_events:
+            tracelist.extend(counter_events)
 
         if not dest_file_name.endswith('.gz'):
             dest_file_name = dest_file_name + '.gz'
@@ -101,23 +168,169 @@ class NinjaToTrace(object):
                                 (os.path.dirname(dest_file_name),
                                  int(os.stat(dest_file_name).st_mtime)))
 
-        with gzip.open(dest_file_name, "wt") as f:
-            json.dump(tracelist, f)
+        with gzip.open(dest_file_name, "wt", compresslevel=6) as f:
+            f.write('[')
+            f.write(', '.join(tracelist))
+            f.write(']')
 
 
 class CountingTheTid(object):
+    """Assign every action, in start order, the lowest lane that is free."""
+
     def __init__(self):
-        self.tids = []  # store the tid's end time
+        self.busy_tids = []  # heap of (end time, tid)
+        self.free_tids = []  # heap of tids whose action has ended
+        self.tid_count = 0
 
     def counting_the_new_tid(self, storingdataline):
-        for i, tid in enumerate(self.tids):  
-            if tid <= storingdataline.start:  
-                self.tids[i] = storingdataline.end  
-                return i  # renew the endtime and return the current tid
+        while self.busy_tids and self.busy_tids[0][0] <= storingdataline.start:
+            heapq.heappush(self.free_tids, heapq.heappop(self.busy_tids)[1])
+        if self.free_tids:
+            tid = heapq.heappop(self.free_tids)
+        else:
+            # for the end time is newer than all tids so we need a new one
+            tid = self.tid_count
+            self.tid_count += 1
+        heapq.heappush(self.busy_tids, (storingdataline.end, tid))
+        return tid
+
+
+class BuildAnalyzer(object):
+    """Critical path, per part/subsystem build time and parallelism of the
+    actions parsed by NinjaToTrace."""
+
+    _OUTPUT_ROOTS = ('obj', 'gen')
+
+    def __init__(self, datalist, parts_path_info=None, part_subsystem_info=None):
+        self.datalist = datalist
+        self._path_to_part = {}
+        for part_name, part_path in (parts_path_info or {}).items():
+            self._path_to_part[part_path.strip('/')] = part_name
+        self._part_subsystem = part_subsystem_info or {}
+        self._subsystem_part_to_part = {}
+        for part_name, subsystem_name in self._part_subsystem.items():
+            self._subsystem_part_to_part['{}/{}'.format(subsystem_name, part_name)] = part_name
+
+    def critical_path(self):
+        """Without the dependency graph the critical path is approximated by
+        walking back from the last finished action, each time to the action
+        that finished last before the current one started."""
+        if not self.datalist:
+            return []
+        by_end = sorted(self.datalist, key=lambda line: line.end)
+        ends = [line.end for line in by_end]
+        index = len(by_end) - 1
+        path = []
+        while index >= 0:
+            line = by_end[index]
+            path.append(line)
+            index = min(bisect.bisect_right(ends, line.start), index) - 1
+        path.reverse()
+        return path
+
+    def part_of_output(self, output):
+        components = output.split('/')
+        for i, component in enumerate(components[:2]):
+            if component in self._OUTPUT_ROOTS:
+                # obj/<source path>/... or <toolchain>/obj/<source path>/...
+                source_components = components[i + 1:-1]
+                for j in range(len(source_components), 0, -1):
+                    part_name = self._path_to_part.get('/'.join(source_components[:j]))
+                    if part_name:
+                        return part_name
+                return None
+        # installed outputs: [<toolchain>/]<subsystem>/<part>/...
+        for i in range(min(2, len(components) - 2)):
+            part_name = self._subsystem_part_to_part.get('/'.join(components[i:i + 2]))
+            if part_name:
+                return part_name
+        return None
+
+    def aggregate_by_part(self):
+        part_times = {}
+        for line in self.datalist:
+            part_name = None
+            for output in line.target_obj_names:
+                part_name = self.part_of_output(output)
+                if part_name:
+                    break
+            part_name = part_name or 'unknown'
+            part_times[part_name] = part_times.get(part_name, 0) + line.end - line.start
+        subsystem_times = {}
+        for part_name, duration in part_times.items():
+            subsystem_name = self._part_subsystem.get(part_name, 'unknown')
+            subsystem_times[subsystem_name] = subsystem_times.get(subsystem_name, 0) + duration
+        return part_times, subsystem_times
+
+    def parallelism(self, interval):
+        """Average number of running actions per interval (ms) and the peak."""
+        if not self.datalist:
+            return [], 0
+        events = []
+        for line in self.datalist:
+            events.append((line.start, 1))
+            events.append((line.end, -1))
+        events.sort()
+        begin = events[0][0]
+        buckets = [0] * ((events[-1][0] - begin) // interval + 1)
+        running = 0
+        peak = 0
+        last_time = begin
+        for time_ms, delta in events:
+            # spread the running count since the last event over the buckets
+            while last_time < time_ms:
+                bucket = (last_time - begin) // interval
+                bucket_end = min(begin + (bucket + 1) * interval, time_ms)
+                buckets[bucket] += running * (bucket_end - last_time)
+                last_time = bucket_end
+            running += delta
+            peak = max(peak, running)
+        return [busy / interval for busy in buckets], peak
+
+    def save_report(self, report_file, interval, top_count=30):
+        lines = []
+        total_time = sum(line.end - line.start for line in self.datalist)
+        wall_time = 0
+        if self.datalist:
+            wall_time = max(line.end for line in self.datalist) - self.datalist[0].start
+        timeline, peak = self.parallelism(interval)
+        lines.append('actions: {}'.format(len(self.datalist)))
+        lines.append('wall time: {} ms'.format(wall_time))
+        lines.append('total action time: {} ms'.format(total_time))
+        lines.append('average parallelism: {:.2f}, peak parallelism: {}'.format(
+            total_time / wall_time if wall_time else 0, peak))
+
+        critical_path = self.critical_path()
+        lines.append('')
+        lines.append('critical path: {} actions, {} ms of actions'.format(
+            len(critical_path), sum(line.end - line.start for line in critical_path)))
+        for line in critical_path:
+            lines.append('  {:>10} {:>10} {:>8}  {}'.format(
+                line.start, line.end, line.end - line.start, line.target_obj_names[0]))
+
+        part_times, subsystem_times = self.aggregate_by_part()
+        for title, times in (('subsystem', subsystem_times), ('part', part_times)):
+            lines.append('')
+            lines.append('build time by {} (top {}):'.format(title, top_count))
+            for name, duration in sorted(times.items(), key=lambda item: item[1],
+                                         reverse=True)[:top_count]:
+                lines.append('  {:>10} ms  {:5.1f}%  {}'.format(
+                    duration, duration * 100.0 / total_time if total_time else 0, name))
+
+        lines.append('')
+        lines.append('parallelism over time (interval {} ms):'.format(interval))
+        for i, value in enumerate(timeline):
+            lines.append('  {:>10} {:8.2f}'.format(i * interval, value))
+        with open(report_file, 'w') as file:
+            file.write('\n'.join(lines))
+            file.write('\n')
+
 
-        # for the end time is newer than all tids so we need a new one
-        self.tids.append(storingdataline.end)
-        return len(self.tids) - 1  # the last index of the tids
+def _read_json(json_file):
+    if not json_file or not os.path.isfile(json_file):
+        return {}
+    with open(json_file, 'r') as file:
+        return json.load(file)
 
 
 def main():
@@ -128,6 +341,12 @@ def main():
     parser.add_argument(
         '--ninja-start-time',
         help='epoch time of "Starting ninja ..." in nanoseconds')
+    parser.add_argument('--report-file', help='path to build analysis report file')
+    parser.add_argument('--parts-path-info', help='path to parts_path_info.json')
+    parser.add_argument('--part-subsystem-info', help='path to part_subsystem.json')
+    parser.add_argument('--parallelism-interval', type=int, default=10000,
+                        help='interval in ms of the parallelism timeline')
+    parser.add_argument('--resource-samples', help='path to resource_samples.bin written by hb')
 
     options = parser.parse_args()
     myparser = NinjaToTrace()
@@ -135,8 +354,15 @@ def main():
         print("parse file fail")
         return
 
-    myparser.trans_to_trace_json(options.trace_file)
+    myparser.trans_to_trace_json(
+        options.trace_file,
+        myparser.resource_counter_events(options.resource_samples, options.ninja_start_time))
     myparser.save_durations(options.duration_file)
+    if options.report_file:
+        analyzer = BuildAnalyzer(myparser.datalist,
+                                 _read_json(options.parts_path_info),
+                                 _read_json(options.part_subsystem_info))
+        analyzer.save_report(options.report_file, max(options.parallelism_interval, 1))
 
 
 if __name__ == '__main__':
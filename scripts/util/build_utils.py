@@ -10,17 +10,21 @@ import contextlib
 from distutils import extension
 import filecmp
 import fnmatch
+import io
 import json
 import os
 import pipes
 import re
 import shutil
 import stat
+import struct
 import subprocess
 import sys
 import tempfile
 import zipfile
+import zlib
 import optparse
+from concurrent.futures import ThreadPoolExecutor
 
 # Any new non-system import must be added to:
 
@@ -41,6 +45,13 @@ DIR_SOURCE_ROOT = os.environ.get(
 HERMETIC_TIMESTAMP = (2001, 1, 1, 0, 0, 0)
 _HERMETIC_FILE_ATTR = (0o644 << 16)
 
+# Files at least this large are streamed into zips instead of read whole.
+_ZIP_STREAM_THRESHOLD = 16 * 1024 * 1024
+_ZIP_COPY_CHUNK_SIZE = 1024 * 1024
+# zipfile will deflate even when it makes the file bigger. To avoid
+# growing files, disable compression at an arbitrary cut off point.
+_ZIP_MIN_COMPRESS_SIZE = 16
+
 
 @contextlib.contextmanager
 def temp_dir():
@@ -348,6 +359,126 @@ def extract_all(zip_path,
     return extracted
 
 
+def _zip_compress_level(compress_level=6):
+    if os.getenv("ZIP_COMPRESS_LEVEL"):
+        return int(os.getenv("ZIP_COMPRESS_LEVEL"))
+    return compress_level
+
+
+def _zip_worker_count():
+    return min(16, os.cpu_count() or 1)
+
+
+def _hermetic_zipinfo(zip_path, src_path=None):
+    _check_zip_path(zip_path)
+    zipinfo = zipfile.ZipInfo(filename=zip_path, date_time=HERMETIC_TIMESTAMP)
+    zipinfo.external_attr = _HERMETIC_FILE_ATTR
+
+    # we want to use _HERMETIC_FILE_ATTR, so manually set
+    # the few attr bits we care about.
+    if src_path:
+        st = os.stat(src_path)
+        for mode in (stat.S_IXUSR, stat.S_IXGRP, stat.S_IXOTH):
+            if st.st_mode & mode:
+                zipinfo.external_attr |= mode << 16
+    return zipinfo
+
+
+def _zip_compress_type(zip_file, compress, size):
+    if size < _ZIP_MIN_COMPRESS_SIZE:
+        compress = False
+
+    # None converts to ZIP_STORED, when passed explicitly rather than the
+    # default passed to the ZipFile constructor.
+    if compress is None:
+        return zip_file.compression
+    return zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+
+def _write_raw_entry(zip_file, zipinfo, chunks):
+    """Writes an entry whose CRC, sizes and compressed data are known.
+
+    The local header is written with the final values right away, the
+    bytes are the same as ZipFile.writestr() of the uncompressed data.
+    """
+    if zip_file._writing:
+        raise ValueError("Can't write to ZIP archive while an open writing handle exists.")
+    zipinfo.flag_bits = 0x00
+    zip64 = zipinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    with zip_file._lock:
+        if zip_file._seekable:
+            zip_file.fp.seek(zip_file.start_dir)
+        zipinfo.header_offset = zip_file.fp.tell()
+        zip_file._writecheck(zipinfo)
+        zip_file._didModify = True
+        zip_file.fp.write(zipinfo.FileHeader(zip64))
+        for chunk in chunks:
+            zip_file.fp.write(chunk)
+        zip_file.start_dir = zip_file.fp.tell()
+        zip_file.filelist.append(zipinfo)
+        zip_file.NameToInfo[zipinfo.filename] = zipinfo
+
+
+_zip_internals_supported_result = None
+
+
+def _zip_internals_supported():
+    """Whether the private zipfile internals of the fast paths work as expected.
+
+    The raw entries of merge_zips() and add_files_to_zip_hermetic() and the
+    streamed large files of add_to_zip_hermetic() use private attributes of
+    zipfile. They are checked once by writing a small zip both ways, the
+    slower public ZipFile.writestr() path is used when the bytes differ or the
+    internals are missing.
+    """
+    global _zip_internals_supported_result
+    if _zip_internals_supported_result is None:
+        try:
+            _zip_internals_supported_result = _check_zip_internals()
+        except Exception:  # pylint: disable=broad-except
+            _zip_internals_supported_result = False
+    return _zip_internals_supported_result
+
+
+def _check_zip_internals():
+    data = b'hermetic zip internals check\n' * 64
+    level = _zip_compress_level(6)
+    expected = io.BytesIO()
+    with zipfile.ZipFile(expected, 'w') as zip_file:
+        for zip_path, compress_type in (('deflated', zipfile.ZIP_DEFLATED), ('stored', zipfile.ZIP_STORED)):
+            zip_file.writestr(_hermetic_zipinfo(zip_path), data, compress_type, level)
+
+    raw = io.BytesIO()
+    with zipfile.ZipFile(raw, 'w') as zip_file:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+        for zip_path, compress_type, entry_data in (('deflated', zipfile.ZIP_DEFLATED, payload),
+                                                    ('stored', zipfile.ZIP_STORED, data)):
+            zipinfo = _hermetic_zipinfo(zip_path)
+            zipinfo.compress_type = compress_type
+            zipinfo.file_size = len(data)
+            zipinfo.CRC = zlib.crc32(data)
+            zipinfo.compress_size = len(entry_data)
+            _write_raw_entry(zip_file, zipinfo, (entry_data,))
+
+    copied = io.BytesIO()
+    with zipfile.ZipFile(expected, 'r') as in_zip, zipfile.ZipFile(copied, 'w') as zip_file:
+        for info in in_zip.infolist():
+            _copy_raw_entry(zip_file, in_zip, info, info.filename)
+
+    streamed = io.BytesIO()
+    with zipfile.ZipFile(streamed, 'w') as zip_file:
+        for zip_path, compress_type in (('deflated', zipfile.ZIP_DEFLATED), ('stored', zipfile.ZIP_STORED)):
+            zipinfo = _hermetic_zipinfo(zip_path)
+            zipinfo.compress_type = compress_type
+            zipinfo._compresslevel = level
+            zipinfo.file_size = len(data)
+            with zip_file.open(zipinfo, mode='w') as dest:
+                dest.write(data)
+
+    return expected.getvalue() == raw.getvalue() == copied.getvalue() == streamed.getvalue()
+
+
 def add_to_zip_hermetic(zip_file,
                         zip_path,
                         src_path=None,
@@ -366,41 +497,94 @@ def add_to_zip_hermetic(zip_file,
     """
     assert (src_path is None) != (data is None), (
         '|src_path| and |data| are mutually exclusive.')
-    _check_zip_path(zip_path)
-    zipinfo = zipfile.ZipInfo(filename=zip_path, date_time=HERMETIC_TIMESTAMP)
-    zipinfo.external_attr = _HERMETIC_FILE_ATTR
-
     if src_path and os.path.islink(src_path):
-        zipinfo.filename = zip_path
+        zipinfo = _hermetic_zipinfo(zip_path)
         zipinfo.external_attr |= stat.S_IFLNK << 16  # mark as a symlink
         zip_file.writestr(zipinfo, os.readlink(src_path))
         return
 
-    # we want to use _HERMETIC_FILE_ATTR, so manually set
-    # the few attr bits we care about.
-    if src_path:
-        st = os.stat(src_path)
-        for mode in (stat.S_IXUSR, stat.S_IXGRP, stat.S_IXOTH):
-            if st.st_mode & mode:
-                zipinfo.external_attr |= mode << 16
-
+    zipinfo = _hermetic_zipinfo(zip_path, src_path)
     if src_path:
+        size = os.path.getsize(src_path)
+        if size >= _ZIP_STREAM_THRESHOLD and _zip_internals_supported():
+            zipinfo.compress_type = _zip_compress_type(zip_file, compress, size)
+            zipinfo._compresslevel = _zip_compress_level(compress_level)
+            zipinfo.file_size = size
+            with open(src_path, 'rb') as src, zip_file.open(zipinfo, mode='w') as dest:
+                shutil.copyfileobj(src, dest, _ZIP_COPY_CHUNK_SIZE)
+            return
         with open(src_path, 'rb') as f:
             data = f.read()
 
-    # zipfile will deflate even when it makes the file bigger. To avoid
-    # growing files, disable compression at an arbitrary cut off point.
-    if len(data) < 16:
-        compress = False
+    compress_type = _zip_compress_type(zip_file, compress, len(data))
+    zip_file.writestr(zipinfo, data, compress_type, _zip_compress_level(compress_level))
 
-    # None converts to ZIP_STORED, when passed explicitly rather than the
-    # default passed to the ZipFile constructor.
-    compress_type = zip_file.compression
-    if compress is not None:
-        compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
-    if os.getenv("ZIP_COMPRESS_LEVEL"):
-        compress_level = int(os.getenv("ZIP_COMPRESS_LEVEL"))
-    zip_file.writestr(zipinfo, data, compress_type, compress_level)
+
+def _compress_entry_data(data, compress_type, compress_level):
+    """Returns the size, CRC and compressed bytes zipfile would write for data."""
+    size = len(data)
+    crc = zlib.crc32(data)
+    if compress_type == zipfile.ZIP_DEFLATED:
+        # the same stream as zipfile writes
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)
+        data = compressor.compress(data) + compressor.flush()
+    return size, crc, data
+
+
+def add_files_to_zip_hermetic(zip_file, inputs, compress_level=6):
+    """Adds files to the given ZipFile in order, reading and deflating them in threads.
+
+    The zip is the same as adding every file with add_to_zip_hermetic().
+
+    Args:
+      zip_file: ZipFile instance to add the files to.
+      inputs: List of (zip_path, src_path, compress) tuples.
+    """
+    if not _zip_internals_supported():
+        for zip_path, src_path, compress in inputs:
+            add_to_zip_hermetic(zip_file, zip_path, src_path=src_path, compress=compress,
+                                compress_level=compress_level)
+        return
+
+    compress_level = _zip_compress_level(compress_level)
+    workers = _zip_worker_count()
+    # bounds the memory held by read and compressed files waiting to be written
+    window = workers * 4
+    pending = collections.deque()
+
+    def write_next():
+        zip_path, src_path, compress, future = pending.popleft()
+        if future is None:
+            add_to_zip_hermetic(zip_file, zip_path, src_path=src_path, compress=compress,
+                                compress_level=compress_level)
+            return
+        zipinfo, (size, crc, payload) = future.result()
+        zipinfo.file_size = size
+        zipinfo.CRC = crc
+        zipinfo.compress_size = len(payload)
+        _write_raw_entry(zip_file, zipinfo, (payload,))
+
+    def compress_entry(zip_path, src_path, compress_type):
+        zipinfo = _hermetic_zipinfo(zip_path, src_path)
+        zipinfo.compress_type = compress_type
+        with open(src_path, 'rb') as f:
+            data = f.read()
+        return zipinfo, _compress_entry_data(data, compress_type, compress_level)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for zip_path, src_path, compress in inputs:
+            future = None
+            if not os.path.islink(src_path):
+                size = os.path.getsize(src_path)
+                compress_type = _zip_compress_type(zip_file, compress, size)
+                if size < _ZIP_STREAM_THRESHOLD and compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                    _check_zip_path(zip_path)
+                    future = executor.submit(compress_entry, zip_path, src_path, compress_type)
+            pending.append((zip_path, src_path, compress, future))
+            if len(pending) > window:
+                write_next()
+        while pending:
+            write_next()
 
 
 def do_zip(inputs,
@@ -426,15 +610,14 @@ def do_zip(inputs,
 
     # Sort by zip path to ensure stable zip ordering.
     input_tuples.sort(key=lambda tup: tup[0])
+    entries = []
+    for zip_path, fs_path in input_tuples:
+        if zip_prefix_path:
+            zip_path = os.path.join(zip_prefix_path, zip_path)
+        compress = compress_fn(zip_path) if compress_fn else None
+        entries.append((zip_path, fs_path, compress))
     with zipfile.ZipFile(output, 'w') as outfile:
-        for zip_path, fs_path in input_tuples:
-            if zip_prefix_path:
-                zip_path = os.path.join(zip_prefix_path, zip_path)
-            compress = compress_fn(zip_path) if compress_fn else None
-            add_to_zip_hermetic(outfile,
-                                zip_path,
-                                src_path=fs_path,
-                                compress=compress)
+        add_files_to_zip_hermetic(outfile, entries)
 
 
 def zip_dir(output, base_dir, compress_fn=None, zip_prefix_path=None):
@@ -470,6 +653,46 @@ def _strip_dst_name(dst_name, options):
     return False
 
 
+def _can_copy_raw_entry(info):
+    """Whether the compressed bytes of an entry are what add_to_zip_hermetic would write."""
+    if info.flag_bits & 0x1:
+        # encrypted
+        return False
+    if info.CRC == 0 and info.file_size:
+        # ijar creates zips with null CRCs.
+        return False
+    # a deflate stream does not record its level, and zipfile does not set the
+    # level bits of flag_bits, so deflated entries are always deflated again
+    return info.compress_type == zipfile.ZIP_STORED
+
+
+def _read_raw_entry(in_zip, info):
+    """Yields the compressed bytes of an entry, without decompressing them."""
+    fp = in_zip.fp
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[0:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile('Bad local file header of %s' % info.filename)
+    fheader = struct.unpack(zipfile.structFileHeader, header)
+    fp.seek(fheader[zipfile._FH_FILENAME_LENGTH] + fheader[zipfile._FH_EXTRA_FIELD_LENGTH], os.SEEK_CUR)
+    remaining = info.compress_size
+    while remaining > 0:
+        chunk = fp.read(min(_ZIP_COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile('Truncated entry %s' % info.filename)
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _copy_raw_entry(out_zip, in_zip, info, dst_name):
+    zipinfo = _hermetic_zipinfo(dst_name)
+    zipinfo.compress_type = info.compress_type
+    zipinfo.file_size = info.file_size
+    zipinfo.compress_size = info.compress_size
+    zipinfo.CRC = info.CRC
+    _write_raw_entry(out_zip, zipinfo, _read_raw_entry(in_zip, info))
+
+
 def merge_zips(output, input_zips, path_transform=None, merge_args=None):
     """Combines all files from |input_zips| into |output|.
 
@@ -502,28 +725,60 @@ def merge_zips(output, input_zips, path_transform=None, merge_args=None):
     else:
         out_zip = zipfile.ZipFile(output, 'w')
 
+    fast_paths = _zip_internals_supported()
+    compress_level = _zip_compress_level()
+    # bounds the memory held by inflated entries waiting to be written
+    window = _zip_worker_count() * 4
+    pending = collections.deque()
+
+    def write_next():
+        zipinfo, future = pending.popleft()
+        zipinfo.file_size, zipinfo.CRC, payload = future.result()
+        zipinfo.compress_size = len(payload)
+        _write_raw_entry(out_zip, zipinfo, (payload,))
+
     try:
-        for in_file in input_zips:
-            with zipfile.ZipFile(in_file, 'r') as in_zip:
-                # ijar creates zips with null CRCs.
-                in_zip._expected_crc = None
-                for info in in_zip.infolist():
-                    # Ignore directories.
-                    if info.filename[-1] == '/':
-                        continue
-                    dst_name = path_transform(info.filename)
-                    if not dst_name:
-                        continue
-                    if _strip_dst_name(dst_name, options):
-                        continue
-                    already_added = dst_name in added_names
-                    if not already_added:
-                        add_to_zip_hermetic(
-                            out_zip,
-                            dst_name,
-                            data=in_zip.read(info),
-                            compress=info.compress_type != zipfile.ZIP_STORED)
+        with ThreadPoolExecutor(max_workers=_zip_worker_count()) as executor:
+            for in_file in input_zips:
+                with zipfile.ZipFile(in_file, 'r') as in_zip:
+                    # ijar creates zips with null CRCs.
+                    in_zip._expected_crc = None
+                    for info in in_zip.infolist():
+                        # Ignore directories.
+                        if info.filename[-1] == '/':
+                            continue
+                        dst_name = path_transform(info.filename)
+                        if not dst_name:
+                            continue
+                        if _strip_dst_name(dst_name, options):
+                            continue
+                        if dst_name in added_names:
+                            continue
                         added_names.add(dst_name)
+                        compress = info.compress_type != zipfile.ZIP_STORED
+                        if fast_paths and compress and info.file_size >= _ZIP_MIN_COMPRESS_SIZE:
+                            # inflated here and deflated again in threads, at the level
+                            # add_to_zip_hermetic uses whatever the level of the input
+                            zipinfo = _hermetic_zipinfo(dst_name)
+                            zipinfo.compress_type = zipfile.ZIP_DEFLATED
+                            pending.append((zipinfo, executor.submit(
+                                _compress_entry_data, in_zip.read(info), zipfile.ZIP_DEFLATED, compress_level)))
+                            if len(pending) > window:
+                                write_next()
+                            continue
+                        while pending:
+                            write_next()
+                        if fast_paths and _can_copy_raw_entry(info):
+                            # the stored bytes are copied, without computing their CRC again
+                            _copy_raw_entry(out_zip, in_zip, info, dst_name)
+                        else:
+                            add_to_zip_hermetic(
+                                out_zip,
+                                dst_name,
+                                data=in_zip.read(info),
+                                compress=compress)
+            while pending:
+                write_next()
     finally:
         if not output_is_already_open:
             out_zip.close()
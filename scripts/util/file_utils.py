@@ -16,7 +16,6 @@
 import json
 import os
 import subprocess
-import hashlib
 import platform
 
 
@@ -66,6 +65,47 @@ def read_file(input_file):
     return data
 
 
+# Numbers of files written and skipped as unchanged by write_file_if_changed
+_write_stats = {'written': 0, 'unchanged': 0}
+
+
+def get_write_stats():
+    return dict(_write_stats)
+
+
+def merge_write_stats(stats):
+    for key in _write_stats:
+        _write_stats[key] += stats.get(key, 0)
+
+
+# Write text content atomically, keep the file (and its mtime) untouched if
+# the content is unchanged. Return True if the file was written.
+def write_file_if_changed(output_file, content, mode=0o666):
+    file_dir = os.path.dirname(os.path.abspath(output_file))
+    if not os.path.exists(file_dir):
+        os.makedirs(file_dir, exist_ok=True)
+
+    if os.path.isfile(output_file):
+        try:
+            with open(output_file, 'r', encoding='utf-8') as input_f:
+                if input_f.read() == content:
+                    _write_stats['unchanged'] += 1
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+    tmp_file = '{}.{}.tmp'.format(output_file, os.getpid())
+    try:
+        with os.fdopen(os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode),
+                       'w', encoding='utf-8') as output_f:
+            output_f.write(content)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    _write_stats['written'] += 1
+    return True
+
+
 # Write json file data
 def write_json_file(output_file, content, check_changes=False):
     file_dir = os.path.dirname(os.path.abspath(output_file))
@@ -73,45 +113,51 @@ def write_json_file(output_file, content, check_changes=False):
         os.makedirs(file_dir, exist_ok=True)
 
     if check_changes is True:
-        changed = __check_changes(output_file, content)
-    else:
-        changed = True
-    if changed is True:
-        with open(output_file, 'w') as output_f:
-            json.dump(content, output_f, sort_keys=True, indent=2)
-
-
-def __check_changes(output_file, content):
-    if os.path.exists(output_file) and os.path.isfile(output_file):
-        # file content md5 val
-        sha256_obj = hashlib.sha256()
-        sha256_obj.update(str(read_json_file(output_file)).encode())
-        hash_value = sha256_obj.hexdigest()
-        # new content md5 val
-        sha256_obj_new = hashlib.sha256()
-        sha256_obj_new.update(str(content).encode())
-        hash_value_new = sha256_obj_new.hexdigest()
-        if hash_value_new == hash_value:
-            return False
-    return True
+        write_file_if_changed(output_file,
+                              json.dumps(content, sort_keys=True, indent=2))
+        return
+    with open(output_file, 'w') as output_f:
+        json.dump(content, output_f, sort_keys=True, indent=2)
 
 
 # Write file data
-def write_file(output_file, content):
-    code_dir = find_top()
-    os_name = platform.system().lower()
-    if os_name == "linux" and platform.machine().lower() == "aarch64":
-        gn_exe = os.path.join(code_dir, f'prebuilts/build-tools/{os_name}-aarch64/bin/gn')
-    else:
-        gn_exe = os.path.join(code_dir, f'prebuilts/build-tools/{os_name}-x86/bin/gn')
+def write_file(output_file, content, check_changes=False):
     file_dir = os.path.dirname(os.path.abspath(output_file))
     if not os.path.exists(file_dir):
         os.makedirs(file_dir, exist_ok=True)
 
+    is_gn_file = output_file.endswith('.gni') or output_file.endswith('.gn')
+    if check_changes is True:
+        if is_gn_file:
+            # compare the formatted content, the way it ends up on disk
+            file_name, file_ext = os.path.splitext(output_file)
+            format_file = '{}.{}.tmp{}'.format(file_name, os.getpid(), file_ext)
+            try:
+                with open(format_file, 'w') as output_f:
+                    output_f.write(content)
+                _gn_format(format_file)
+                with open(format_file, 'r') as input_f:
+                    content = input_f.read()
+            finally:
+                if os.path.exists(format_file):
+                    os.remove(format_file)
+        write_file_if_changed(output_file, content)
+        return
+
     with open(output_file, 'w') as output_f:
         output_f.write(content)
-    if output_file.endswith('.gni') or output_file.endswith('.gn'):
-        # Call gn format to make the output gn file prettier.
-        cmd = [gn_exe, 'format']
-        cmd.append(output_file)
-        subprocess.check_output(cmd)
+    if is_gn_file:
+        _gn_format(output_file)
+
+
+def _gn_format(gn_file):
+    code_dir = find_top()
+    os_name = platform.system().lower()
+    if os_name == "linux" and platform.machine().lower() == "aarch64":
+        gn_exe = os.path.join(code_dir, f'prebuilts/build-tools/{os_name}-aarch64/bin/gn')
+    else:
+        gn_exe = os.path.join(code_dir, f'prebuilts/build-tools/{os_name}-x86/bin/gn')
+    # Call gn format to make the output gn file prettier.
+    cmd = [gn_exe, 'format']
+    cmd.append(gn_file)
+    subprocess.check_output(cmd)
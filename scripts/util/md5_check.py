@@ -9,6 +9,7 @@ import hashlib
 import itertools
 import json
 import os
+import time
 import zipfile
 from .pycache import pycache_enabled
 from .pycache import pycache
@@ -19,6 +20,32 @@ PRINT_EXPLANATIONS = int(os.environ.get('PRINT_BUILD_EXPLANATIONS', 0))
 # An escape hatch that causes all targets to be rebuilt.
 _FORCE_REBUILD = int(os.environ.get('FORCE_REBUILD', 0))
 
+# When set, the time spent on hashing the inputs of every action is printed.
+PRINT_MD5_DIFFS = int(os.environ.get('PRINT_MD5_DIFFS', 0))
+
+# Use xxhash instead of md5 for input files when it is installed. The file
+# digests also make up the pycache key shared across builds, so nothing
+# weaker than a 128 bit hash is used, md5 is kept without xxhash.
+_FAST_HASH = int(os.environ.get('MD5_CHECK_FAST_HASH', 0))
+
+# Digests of input files shared by all actions of a build, keyed on
+# (path, inode, size, mtime_ns). Defaults to a directory in the out dir
+# when running from it, set to an empty string to disable.
+_DIGEST_CACHE_DIR = os.environ.get('MD5_CHECK_CACHE_DIR')
+if _DIGEST_CACHE_DIR is None and os.path.exists('build.ninja'):
+    _DIGEST_CACHE_DIR = os.path.abspath('.md5_check_cache')
+
+# Files modified less than this many ns ago may still change within the
+# same mtime, their digests are not cached.
+_RACY_MTIME_NS = 2 * 10 ** 9
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+_hash_stats = {'files': 0, 'read': 0, 'bytes': 0}
+
 
 def get_new_metadata(input_strings, input_paths):
     new_metadata = _Metadata()
@@ -86,7 +113,17 @@ def call_and_record_if_stale(
     input_strings = input_strings or []
     output_paths = output_paths or []
 
+    start_time = time.time()
+    hash_stats = dict(_hash_stats)
     new_metadata = get_new_metadata(input_strings, input_paths)
+    if PRINT_MD5_DIFFS:
+        print('md5_check: {:.3f}s hashing {} inputs, {} of {} files read '
+              '({:.1f} MB) for {}'.format(
+                  time.time() - start_time, len(input_paths),
+                  _hash_stats.get('read') - hash_stats.get('read'),
+                  _hash_stats.get('files') - hash_stats.get('files'),
+                  (_hash_stats.get('bytes') - hash_stats.get('bytes')) / 1024 / 1024,
+                  record_path or output_paths[0]))
     force = force or _FORCE_REBUILD
     missing_outputs = [
         x for x in output_paths if force or not os.path.exists(x)
@@ -113,17 +150,17 @@ def call_and_record_if_stale(
         if not pycache_enabled:
             return
         if pycache_enabled and pycache.retrieve(output_paths, prefix=manifest):
+            pycache.touch(record_path)
             return
 
     print_explanations(record_path, changes)
 
     args = (changes, ) if pass_changes else ()
+    if pycache_enabled:
+        pycache.detach(output_paths)
     function(*args)
     if pycache_enabled:
-        try:
-            pycache.report_cache_stat('cache_miss')
-        except:  # noqa: E722 pylint: disable=bare-except
-            pass
+        pycache.record_stat('miss')
         pycache.save(output_paths, prefix=manifest)
 
     with open(record_path, 'w') as record:
@@ -389,6 +426,66 @@ class _Metadata(object):
         return self._file_map.get((path, subpath))    
 
 
+def _new_file_hash():
+    if _FAST_HASH and xxhash is not None:
+        return xxhash.xxh3_128(), 'xxh3:'
+    return hashlib.md5(), ''
+
+
+def _digest_cache_file(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+    return os.path.join(_DIGEST_CACHE_DIR, key[:2], key[2:])
+
+
+def _read_cached_digest(path, stat_key):
+    if not _DIGEST_CACHE_DIR:
+        return None
+    try:
+        with open(_digest_cache_file(path), 'r') as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+    if entry.get('key') != stat_key:
+        return None
+    return entry.get('value')
+
+
+def _write_cached_digest(path, stat_key, file_stat, value):
+    if not _DIGEST_CACHE_DIR or file_stat.st_mtime_ns > time.time_ns() - _RACY_MTIME_NS:
+        return
+    cache_file = _digest_cache_file(path)
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, 'w') as outfile:
+            json.dump({'path': path, 'key': stat_key, 'value': value}, outfile)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        if os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+
+
+def _cached(kind, compute):
+    """Returns compute(path), cached on the stat of path."""
+    def wrapper(path):
+        _hash_stats['files'] += 1
+        try:
+            file_stat = os.stat(path)
+        except OSError:
+            # dead links are hashed by their target name, nothing to cache
+            return compute(path)
+        stat_key = [kind, _FAST_HASH, file_stat.st_ino, file_stat.st_size,
+                    file_stat.st_mtime_ns]
+        value = _read_cached_digest(path, stat_key)
+        if value is None:
+            _hash_stats['read'] += 1
+            _hash_stats['bytes'] += file_stat.st_size
+            value = compute(path)
+            _write_cached_digest(path, stat_key, file_stat, value)
+        return value
+    return wrapper
+
+
 def _update_md5_for_file(md5, path, block_size=2**16):
     # record md5 of linkto for dead link.
     if os.path.islink(path):
@@ -405,18 +502,27 @@ def _update_md5_for_file(md5, path, block_size=2**16):
             md5.update(data)
 
 
+def _compute_file_digest(path):
+    file_hash, prefix = _new_file_hash()
+    _update_md5_for_file(file_hash, path)
+    return prefix + file_hash.hexdigest()
+
+
+_file_digest = _cached('file', _compute_file_digest)
+
+
 def _update_md5_for_directory(md5, dir_path):
+    # Combines the cached digests of the files, unchanged files are not read.
     for root, _, files in os.walk(dir_path):
         for f in files:
-            _update_md5_for_file(md5, os.path.join(root, f))
+            md5.update(_file_digest(os.path.join(root, f)).encode())
 
 
 def _md5_for_path(path):
+    if not os.path.isdir(path):
+        return _file_digest(path)
     md5 = hashlib.md5()
-    if os.path.isdir(path):
-        _update_md5_for_directory(md5, path)
-    else:
-        _update_md5_for_file(md5, path)
+    _update_md5_for_directory(md5, path)
     return md5.hexdigest()
 
 
@@ -433,8 +539,7 @@ def _is_zip_file(path):
     return path[-4:] in ('.zip')
 
 
-def _extract_zip_entries(path):
-    """Returns a list of (path, CRC32) of all files within |path|."""
+def _compute_zip_entries(path):
     entries = []
     with zipfile.ZipFile(path) as zip_file:
         for zip_info in zip_file.infolist():
@@ -443,3 +548,12 @@ def _extract_zip_entries(path):
                 entries.append(
                     (zip_info.filename, zip_info.CRC + zip_info.compress_type))
     return entries
+
+
+_cached_zip_entries = _cached('zip', _compute_zip_entries)
+
+
+def _extract_zip_entries(path):
+    """Returns a list of (path, CRC32) of all files within |path|."""
+    # json turns the cached tuples into lists
+    return [tuple(entry) for entry in _cached_zip_entries(path)]
@@ -15,58 +15,168 @@
 
 import shutil
 import os
+import stat
 import hashlib
 import json
-import http.client as client
-from . import build_utils
+
+# Name of the file describing the outputs of a cache entry. Its mtime is the
+# last use of the entry, pyd.py evicts the least recently used entries.
+ENTRY_META_FILE = 'entry.json'
+
+
+def _clone_file(src, dst):
+    """Hardlink src to dst, fall back to a copy (copy_file_range lets the
+    kernel reflink on filesystems that support it)."""
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                shutil.copymode(src, dst)
+                return
+        except OSError:
+            pass
+    shutil.copy(src, dst)
+
+
+def _file_digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _is_intact(path, size, last_use):
+    """Whether a stored artifact was left alone since the entry was last used.
+
+    Restored hardlinks share their inode with the cache, an action writing to
+    one in place changes the size or moves the mtime past the last use of the
+    entry. The sha256 recorded on store is checked when pyd.py trims the cache,
+    rehashing on every hit would cost more than the restore saves.
+    """
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(file_stat.st_mode) and file_stat.st_size == size and \
+        file_stat.st_mtime <= last_use
+
+
+def _detach_file(path):
+    if os.path.isfile(path) and not os.path.islink(path) and os.stat(path).st_nlink > 1:
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        shutil.copy2(path, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def _remove_path(path):
+    if os.path.islink(path) or os.path.isfile(path):
+        os.unlink(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
 
 
 class Storage():
+    """Content addressed store of action outputs.
+
+    An entry is a directory named by the digest of the action manifest
+    (input strings, input file digests and output names). Every output is
+    kept under a name derived from its path, files as is and directories as
+    file trees, and restored by hardlink when the cache and the out dir share
+    a filesystem. The size and mtime of every stored file are checked before
+    it is restored, its sha256 when the cache is trimmed.
+    """
+
     def __init__(self):
         pass
 
+    @staticmethod
+    def _artifact_name(obj):
+        return hashlib.sha256(obj.encode()).hexdigest()[:32]
+
+    @classmethod
+    def read_entry(cls, entry_dir):
+        try:
+            with open(os.path.join(entry_dir, ENTRY_META_FILE), 'r') as jsonfile:
+                return json.load(jsonfile)
+        except (OSError, ValueError):
+            return None
+
     @classmethod
-    def retrieve_object(cls, cache_artifact, obj):
-        possible_dir_cache_artifact = '{}.directory'.format(cache_artifact)
+    def retrieve_object(cls, entry_dir, obj, artifact, last_use):
+        """Restore one output, return the number of bytes restored or -1."""
+        src = os.path.join(entry_dir, cls._artifact_name(obj))
+        try:
+            if artifact.get('type') == 'file':
+                # a restored hardlink may have been modified in place by a later
+                # action, never hand out an artifact that does not match anymore
+                if not _is_intact(src, artifact.get('size'), last_use):
+                    return -1
+                _remove_path(obj)
+                os.makedirs(os.path.dirname(os.path.abspath(obj)), exist_ok=True)
+                _clone_file(src, obj)
+                os.utime(obj)
+                return artifact.get('size')
 
-        if os.path.exists(cache_artifact):
-            os.makedirs(os.path.dirname(obj), exist_ok=True)
-            shutil.copyfile(cache_artifact, obj)
-            os.utime(cache_artifact)
-            if pycache_debug_enable:
-                print('Retrieve {} from cache'.format(obj))
-        elif os.path.exists(possible_dir_cache_artifact):
-            # Extract zip archive if it's cache artifact for directory.
+            # {relpath: [size, sha256]}
+            files = artifact.get('files', {})
+            for relpath, file_info in files.items():
+                if not isinstance(file_info, list) or \
+                        not _is_intact(os.path.join(src, relpath), file_info[0], last_use):
+                    return -1
+            _remove_path(obj)
             os.makedirs(obj, exist_ok=True)
-            build_utils.extract_all(possible_dir_cache_artifact,
-                                   obj,
-                                   no_clobber=False)
-            os.utime(possible_dir_cache_artifact)
-            if pycache_debug_enable:
-                print('Extract {} from cache'.format(obj))
-        else:
-            if pycache_debug_enable:
-                print('Failed to retrieve {} from cache'.format(obj))
-            return 0
-        return 1
+            for relpath in artifact.get('dirs', []):
+                os.makedirs(os.path.join(obj, relpath), exist_ok=True)
+            for relpath, target in artifact.get('links', {}).items():
+                os.makedirs(os.path.dirname(os.path.join(obj, relpath)), exist_ok=True)
+                os.symlink(target, os.path.join(obj, relpath))
+            for relpath in files:
+                dst_file = os.path.join(obj, relpath)
+                os.makedirs(os.path.dirname(dst_file), exist_ok=True)
+                _clone_file(os.path.join(src, relpath), dst_file)
+            return sum(file_info[0] for file_info in files.values())
+        except OSError:
+            # pyd.py may trim the entry while it is restored, build the action
+            return -1
 
     @classmethod
-    def add_object(cls, cache_artifact, obj):
-        cache_dir = os.path.dirname(cache_artifact)
-        os.makedirs(cache_dir, exist_ok=True)
+    def add_object(cls, entry_dir, obj):
+        """Copy one output into a new entry, return its description."""
+        dst = os.path.join(entry_dir, cls._artifact_name(obj))
+        if os.path.isfile(obj):
+            # copy rather than link, the output may still be rewritten in place
+            shutil.copy(obj, dst)
+            return {'type': 'file', 'size': os.path.getsize(dst), 'sha256': _file_digest(dst)}
 
-        if not os.path.exists(obj):
-            return
-        # If path is directory, store an zip archive.
-        if os.path.isdir(obj):
-            dir_cache_artifact = '{}.directory'.format(cache_artifact)
-            build_utils.zip_dir(dir_cache_artifact, obj)
-            if pycache_debug_enable:
-                print("archive {} to {}".format(obj, dir_cache_artifact))
-        else:
-            shutil.copyfile(obj, cache_artifact)
-            if pycache_debug_enable:
-                print("copying {} to {}".format(obj, cache_artifact))
+        artifact = {'type': 'directory', 'files': {}, 'dirs': [], 'links': {}}
+        for root, dirs, files in os.walk(obj):
+            for name in dirs + files:
+                path = os.path.join(root, name)
+                relpath = os.path.relpath(path, obj)
+                if os.path.islink(path):
+                    artifact['links'][relpath] = os.readlink(path)
+                elif os.path.isdir(path):
+                    artifact['dirs'].append(relpath)
+                    os.makedirs(os.path.join(dst, relpath), exist_ok=True)
+                else:
+                    os.makedirs(os.path.dirname(os.path.join(dst, relpath)), exist_ok=True)
+                    dst_file = os.path.join(dst, relpath)
+                    shutil.copy(path, dst_file)
+                    artifact['files'][relpath] = [os.path.getsize(dst_file), _file_digest(dst_file)]
+        os.makedirs(dst, exist_ok=True)
+        return artifact
 
 
 class PyCache():
@@ -76,6 +186,7 @@ class PyCache():
             self.pycache_dir = cache_dir
         else:
             raise Exception('Error: failed to get PYCACHE_DIR')
+        self.stats_file = os.environ.get('PYCACHE_STATS_FILE')
         self.storage = Storage()
 
     @classmethod
@@ -83,40 +194,92 @@ class PyCache():
         sha256 = hashlib.sha256()
         sha256.update(path.encode())
         return sha256.hexdigest()
-    
+
     def retrieve(self, output_paths, prefix=''):
+        entry_dir = self.descend_directory(prefix)[1]
+        entry = self.storage.read_entry(entry_dir)
+        if entry is None:
+            return 0
+        try:
+            last_use = os.stat(os.path.join(entry_dir, ENTRY_META_FILE)).st_mtime
+        except OSError:
+            return 0
+        artifacts = entry.get('outputs', {})
+        if any(path not in artifacts for path in output_paths):
+            return 0
+        restored_bytes = 0
         for path in output_paths:
-            _, cache_artifact = self.descend_directory('{}{}'.format(
-                prefix, path))
-            result = self.storage.retrieve_object(cache_artifact, path)
-            if not result:
-                return result
+            result = self.storage.retrieve_object(entry_dir, path, artifacts.get(path), last_use)
+            if result < 0:
+                if pycache_debug_enable:
+                    print('Failed to retrieve {} from cache'.format(path))
+                # the entry is corrupted, drop it so it gets stored again
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return 0
+            restored_bytes += result
+            if pycache_debug_enable:
+                print('Retrieve {} from cache'.format(path))
+        self.touch(os.path.join(entry_dir, ENTRY_META_FILE))
+        self.record_stat('hit', restored_bytes)
+        return 1
 
+    def save(self, output_paths, prefix=''):
+        entry_dir = self.descend_directory(prefix)[1]
+        tmp_dir = '{}.{}.tmp'.format(entry_dir, os.getpid())
+        _remove_path(tmp_dir)
+        os.makedirs(tmp_dir)
         try:
-            self.report_cache_stat('cache_hit')
-        except:  # noqa: E722 pylint: disable=bare-except
+            artifacts = {}
+            for path in output_paths:
+                if not os.path.exists(path):
+                    return
+                artifacts[path] = self.storage.add_object(tmp_dir, path)
+            with open(os.path.join(tmp_dir, ENTRY_META_FILE), 'w') as jsonfile:
+                json.dump({'outputs': artifacts}, jsonfile)
+            _remove_path(entry_dir)
+            os.rename(tmp_dir, entry_dir)
+            if pycache_debug_enable:
+                print('Store {} to {}'.format(output_paths, entry_dir))
+        except OSError:
+            # a concurrent action stored the same entry, or the disk is full
             pass
-        return 1
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
 
-    def save(self, output_paths, prefix=''):
+    def record_stat(self, hit_or_miss, saved_bytes=0):
+        """Append one line per action to the stats file of the build,
+        summarized by "pyd.py --stat" at the end of the build."""
+        if not self.stats_file:
+            return
+        try:
+            fd = os.open(self.stats_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                         stat.S_IWUSR | stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            try:
+                os.write(fd, '{} {}\n'.format(hit_or_miss, saved_bytes).encode())
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+    @staticmethod
+    def touch(path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def detach(output_paths):
+        """Give restored outputs, and the files in restored directory
+        outputs, their own inode before an action rewrites them, so the write
+        does not go through to the cache entry."""
         for path in output_paths:
-            _, cache_artifact = self.descend_directory('{}{}'.format(
-                prefix, path))
-            self.storage.add_object(cache_artifact, path)
-
-    def report_cache_stat(self, hit_or_miss):
-        pyd_server, pyd_port = self.get_pyd()
-        conn = client.HTTPConnection(pyd_server, pyd_port)
-        conn.request(hit_or_miss, '/')
-        conn.close()
-
-    def get_pyd(self):
-        daemon_config_file = '{}/.config'.format(self.pycache_dir)
-        if not os.path.exists(daemon_config_file):
-            raise Exception('Warning: no pycache daemon process exists.')
-        with open(daemon_config_file, 'r') as jsonfile:
-            data = json.load(jsonfile)
-            return data.get('host'), data.get('port')
+            if os.path.isdir(path) and not os.path.islink(path):
+                for root, _, files in os.walk(path):
+                    for name in files:
+                        _detach_file(os.path.join(root, name))
+            else:
+                _detach_file(path)
 
     def descend_directory(self, path):
         digest = self.cache_key(path)
@@ -17,8 +17,12 @@ import os
 import sys
 import argparse
 import errno
+import hashlib
+import shutil
 import json
+import time
 import datetime
+import threading
 import http.client as client
 
 from http.server import BaseHTTPRequestHandler
@@ -27,6 +31,14 @@ from http.server import HTTPServer
 PYCACHE_PORT = 7970  # Ascii code for 'yp'
 LOCALHOST = '127.0.0.1'
 DEBUG = int(os.environ.get('PRINT_BUILD_EXPLANATIONS', 0))
+# Pycache pool holds as much as PYCACHE_MAX_SIZE (40GB by default) or as long
+# as 15 days cache objects, trimmed every PYCACHE_TRIM_INTERVAL seconds.
+PYCACHE_MAX_SIZE = int(os.environ.get('PYCACHE_MAX_SIZE', 40 * 1024 * 1024 * 1024))
+PYCACHE_MAX_DAYS = 15
+PYCACHE_TRIM_INTERVAL = int(os.environ.get('PYCACHE_TRIM_INTERVAL', 600))
+ENTRY_META_FILE = 'entry.json'
+# Its mtime is the last time the used entries were checked against their sha256.
+VERIFIED_STAMP_FILE = '.verified'
 
 
 class PycacheDaemonRequestHandler(BaseHTTPRequestHandler):
@@ -37,22 +49,10 @@ class PycacheDaemonRequestHandler(BaseHTTPRequestHandler):
         else:
             pass
 
-    def do_cache_hit(self):
-        self.server.hit_times += 1
-        self.send_response(200)
-
-    def do_cache_miss(self):
-        self.server.miss_times += 1
-        self.send_response(200)
-
     def do_cache_manage(self):
         self.send_response(200)
         self.server.cache_manage()
 
-    def do_show_statistics(self):
-        self.send_response(200)
-        self.server.show_statistics()
-
     def do_stop_service(self):
         self.send_response(200)
         self.server.stop_service = True
@@ -60,18 +60,24 @@ class PycacheDaemonRequestHandler(BaseHTTPRequestHandler):
 
 class PycacheDaemon(HTTPServer):
     def __init__(self, *args, **kargs):
-        self.hit_times = 0
-        self.miss_times = 0
         self.stop_service = False
         self.pycache_dir = None
         self.pycache_config_file = None
+        self.trim_lock = threading.Lock()
         super().__init__(*args, **kargs)
 
     def serve_forever(self, poll_interval=0.5):
+        trimmer = threading.Thread(target=self._trim_periodically, daemon=True)
+        trimmer.start()
         while not self.stop_service:
             self.handle_request()
         os.unlink(self.pycache_config_file)
 
+    def _trim_periodically(self):
+        while not self.stop_service:
+            self.cache_manage()
+            time.sleep(PYCACHE_TRIM_INTERVAL)
+
     def record_pycache_config(self, pycache_dir):
         root = os.path.realpath(pycache_dir)
         self.pycache_dir = root
@@ -89,43 +95,115 @@ class PycacheDaemon(HTTPServer):
             json.dump(config, jsonfile, indent=2, sort_keys=True)
 
     def cache_manage(self):
-        now = datetime.datetime.now()
-        days = 15
-        earlier_time = (now - datetime.timedelta(days)).timestamp()
-        # Pycache pool holds as much as 40GB  or as long as 15 days
-        # cache objects
-        while days > 0:
-            disk_usage = 0
-            for root, _, files in os.walk(self.pycache_dir):
-                for file in files:
-                    path = os.path.join(root, file)
-                    stat = os.stat(path)
-                    if stat.st_atime < int(earlier_time):
-                        os.unlink(path)
-                    else:
-                        disk_usage += stat.st_size
-            if disk_usage >= 40 * 1024 * 1024 * 1024:
-                days -= 1
-                earlier_time = (now - datetime.timedelta(days)).timestamp()
-            else:
-                break
-
-    def show_statistics(self):
-        actions = self.hit_times + self.miss_times
-        if actions != 0:
-            print('-' * 80)
-            print('pycache statistics:')
-            print('pycache hit targets: {}'.format(self.hit_times))
-            print('pycache miss targets: {}'.format(self.miss_times))
-            hit_rate = float(self.hit_times) / actions * 100
-            miss_rate = float(self.miss_times) / actions * 100
-            print('pycache hit rate: {:.2f}%'.format(hit_rate))
-            print('pycache miss rate: {:.2f}%'.format(miss_rate))
-            print('-' * 80)
+        # a manual --manage request may come in while the trimmer is running
+        if not self.trim_lock.acquire(blocking=False):
+            return
+        try:
+            trim_cache(self.pycache_dir, PYCACHE_MAX_SIZE, PYCACHE_MAX_DAYS)
+        finally:
+            self.trim_lock.release()
+
+
+def _cache_item_usage(path):
+    """Size and last use of a cache item: a manifest file or an entry dir."""
+    if not os.path.isdir(path):
+        file_stat = os.stat(path)
+        return file_stat.st_size, file_stat.st_mtime
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            size += os.lstat(os.path.join(root, file)).st_size
+    meta_file = os.path.join(path, ENTRY_META_FILE)
+    last_use = os.stat(meta_file if os.path.exists(meta_file) else path).st_mtime
+    return size, last_use
+
+
+def _file_digest(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _entry_is_intact(entry_dir):
+    """Whether the stored files of an entry still match the sha256 recorded
+    by pycache.py, a restored hardlink may have been rewritten in place."""
+    with open(os.path.join(entry_dir, ENTRY_META_FILE), 'r') as jsonfile:
+        artifacts = json.load(jsonfile).get('outputs', {})
+    for obj, artifact in artifacts.items():
+        # same name as pycache.Storage._artifact_name
+        src = os.path.join(entry_dir, hashlib.sha256(obj.encode()).hexdigest()[:32])
+        if artifact.get('type') == 'file':
+            stored = {src: artifact.get('sha256')}
         else:
-            print('-' * 80)
-            print('No pycache actions in pycache, skip statistics')
-            print('-' * 80)
+            stored = {os.path.join(src, relpath): file_info[1]
+                      for relpath, file_info in artifact.get('files', {}).items()}
+        for path, digest in stored.items():
+            if digest is None or _file_digest(path) != digest:
+                return False
+    return True
+
+
+def trim_cache(pycache_dir, max_size, max_days):
+    """Remove items unused for max_days, then the least recently used ones
+    until the cache fits in max_size. Entries used since the last trim are
+    checked against their sha256 and removed when they do not match."""
+    earlier_time = (datetime.datetime.now() - datetime.timedelta(max_days)).timestamp()
+    verified_stamp = os.path.join(pycache_dir, VERIFIED_STAMP_FILE)
+    try:
+        verified_time = os.stat(verified_stamp).st_mtime
+    except OSError:
+        verified_time = 0
+    verify_start = time.time()
+    items = []
+    disk_usage = 0
+    for prefix in os.listdir(pycache_dir):
+        prefix_dir = os.path.join(pycache_dir, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for name in os.listdir(prefix_dir):
+            path = os.path.join(prefix_dir, name)
+            try:
+                size, last_use = _cache_item_usage(path)
+            except OSError:
+                continue
+            if last_use < earlier_time:
+                _remove_cache_item(path)
+                continue
+            # skip the tmp dirs of entries pycache.py is still storing
+            if last_use >= verified_time and os.path.isdir(path) and not name.endswith('.tmp'):
+                try:
+                    intact = _entry_is_intact(path)
+                except (OSError, ValueError, IndexError, TypeError):
+                    intact = False
+                if not intact:
+                    _remove_cache_item(path)
+                    continue
+            items.append((last_use, size, path))
+            disk_usage += size
+    items.sort()
+    for _, size, path in items:
+        if disk_usage <= max_size:
+            break
+        _remove_cache_item(path)
+        disk_usage -= size
+    try:
+        with open(verified_stamp, 'a'):
+            pass
+        os.utime(verified_stamp, (verify_start, verify_start))
+    except OSError:
+        pass
+
+
+def _remove_cache_item(path):
+    try:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    except OSError:
+        pass
 
 
 def start_server(host, port, root):
@@ -165,14 +243,31 @@ def stop_server():
         pass
 
 
-def show_statistics():
-    try:
-        host, port = get_pyd()
-        conn = client.HTTPConnection(host, port)
-        conn.request('show_statistics', '/')
-        conn.close()
-    except:  # noqa: E722 pylint: disable=bare-except
-        pass
+def show_statistics(stats_file):
+    hit_times = 0
+    miss_times = 0
+    saved_bytes = 0
+    if stats_file and os.path.isfile(stats_file):
+        with open(stats_file, 'r') as file:
+            for line in file:
+                result, size = (line.split() + ['0'])[:2]
+                if result == 'hit':
+                    hit_times += 1
+                    saved_bytes += int(size)
+                elif result == 'miss':
+                    miss_times += 1
+    actions = hit_times + miss_times
+    print('-' * 80)
+    if actions != 0:
+        print('pycache statistics:')
+        print('pycache hit targets: {}'.format(hit_times))
+        print('pycache miss targets: {}'.format(miss_times))
+        print('pycache hit rate: {:.2f}%'.format(float(hit_times) / actions * 100))
+        print('pycache miss rate: {:.2f}%'.format(float(miss_times) / actions * 100))
+        print('pycache restored outputs: {:.2f} MB'.format(saved_bytes / 1024 / 1024))
+    else:
+        print('No pycache actions in pycache, skip statistics')
+    print('-' * 80)
 
 
 def manage_cache_contents():
@@ -200,6 +295,9 @@ def main(args):
     parser.add_argument('--stat',
                         action='store_true',
                         help='report cache statistics')
+    parser.add_argument('--stats-file',
+                        default=os.environ.get('PYCACHE_STATS_FILE'),
+                        help='stats file written by the pycache users of a build')
     parser.add_argument('--manage',
                         action='store_true',
                         help='manage pycache contents')
@@ -210,7 +308,7 @@ def main(args):
     if options.stop:
         stop_server()
     if options.stat:
-        show_statistics()
+        show_statistics(options.stats_file)
     if options.manage:
         manage_cache_contents()
 
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Columnar file of the resource samples taken by hb during a build.
+
+A JSON header line (version, column names, phase names, sample count) is
+followed by every column as little-endian float64 values and by the phase
+index of every sample as one byte each.
+"""
+
+import os
+import sys
+import json
+from array import array
+
+RESOURCE_SAMPLES_VERSION = 1
+
+# time is the epoch time in seconds, stalls are the milliseconds tasks were
+# stalled on the resource since the previous sample (/proc/pressure)
+SAMPLE_COLUMNS = (
+    'time',
+    'cpu_busy_percent',
+    'cpu_iowait_percent',
+    'mem_used_mb',
+    'swap_used_mb',
+    'build_rss_mb',
+    'build_processes',
+    'cpu_stall_ms',
+    'mem_stall_ms',
+    'mem_full_stall_ms',
+    'io_stall_ms',
+)
+
+
+def write_samples(sample_file: str, columns: dict, phase_indices: array, phases: list):
+    header = {
+        'version': RESOURCE_SAMPLES_VERSION,
+        'columns': list(SAMPLE_COLUMNS),
+        'phases': phases,
+        'count': len(phase_indices),
+    }
+    tmp_file = '{}.{}.tmp'.format(sample_file, os.getpid())
+    with open(tmp_file, 'wb') as sample_f:
+        sample_f.write(json.dumps(header).encode() + b'\n')
+        for name in SAMPLE_COLUMNS:
+            values = array('d', columns[name])
+            if sys.byteorder != 'little':
+                values.byteswap()
+            sample_f.write(values.tobytes())
+        sample_f.write(array('B', phase_indices).tobytes())
+    os.replace(tmp_file, sample_file)
+
+
+def read_samples(sample_file: str):
+    """Return (columns, phase of every sample), columns map names to lists."""
+    with open(sample_file, 'rb') as sample_f:
+        header = json.loads(sample_f.readline())
+        if header.get('version') != RESOURCE_SAMPLES_VERSION:
+            raise ValueError('unsupported resource samples version in {}'.format(sample_file))
+        count = header['count']
+        columns = {}
+        for name in header['columns']:
+            values = array('d')
+            values.frombytes(sample_f.read(count * values.itemsize))
+            if sys.byteorder != 'little':
+                values.byteswap()
+            columns[name] = values.tolist()
+        phase_indices = array('B')
+        phase_indices.frombytes(sample_f.read(count))
+    phases = header['phases']
+    return columns, [phases[index] for index in phase_indices]
@@ -24,7 +24,8 @@ from scripts.util import file_utils  # noqa: E402
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument('--part-name', required=True)
+    # without --part-name, every "<part_name>:<subsystem_name>" is printed
+    parser.add_argument('--part-name', required=False)
     parser.add_argument('--part-subsystem-info-file', required=False)
     args = parser.parse_args()
 
@@ -40,6 +41,12 @@ def main():
         raise Exception(
             "read file '{}' failed.".format(part_subsystem_info_file))
 
+    if args.part_name is None:
+        for part_name, subsystem_name in sorted(data.items()):
+            if subsystem_name:
+                print('{}:{}'.format(part_name, subsystem_name))
+        return 0
+
     subsystem_name = data.get(args.part_name)
     if subsystem_name is None or subsystem_name == '':
         raise Exception("subsystem name error, part_name='{}'".format(
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare part -> subsystem lookup costs during gn gen.
+
+A synthetic tree with --targets targets spread over --parts parts is
+generated twice: once resolving the subsystem with an exec_script call of
+get_subsystem_name.py per target (as every template did before), once with
+the part_subsystem.gni map written by the hb loader. For both variants
+the number of exec_script invocations (from gn --tracelog) and the gn gen
+wall time are printed.
+
+usage: python3 part_subsystem_lookup_benchmark.py --gn <path to gn>
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+GET_SUBSYSTEM_SCRIPT = os.path.join(BUILD_ROOT, 'templates', 'common', 'get_subsystem_name.py')
+
+DOT_GN = """buildconfig = "//BUILDCONFIG.gn"
+script_executable = "{python}"
+"""
+
+BUILDCONFIG_GN = """declare_args() {
+  ohos_indep_compiler_enable = false
+}
+set_default_toolchain("//:bench_toolchain")
+"""
+
+LOOKUP_GNI = """template("bench_target") {
+  part_name = invoker.part_name
+  if (ohos_indep_compiler_enable) {
+    _part_subsystem_info_file =
+        "$root_build_dir/build_configs/parts_info/part_subsystem.json"
+    _arguments = [
+      "--part-name",
+      part_name,
+      "--part-subsystem-info-file",
+      rebase_path(_part_subsystem_info_file, root_build_dir),
+    ]
+    get_subsystem_script = "{script}"
+    subsystem_name =
+        exec_script(get_subsystem_script, _arguments, "trim string")
+  } else {
+    import("$root_build_dir/build_configs/parts_info/part_subsystem.gni")
+    _part_subsystem =
+        filter_include(part_subsystem_info, [ "${part_name}:*" ])
+    assert(_part_subsystem != [],
+           "subsystem name error, part_name='${part_name}'")
+    subsystem_name =
+        string_replace(_part_subsystem[0], "${part_name}:", "", 1)
+  }
+  group(target_name) {
+    metadata = {
+      subsystem = [ subsystem_name ]
+    }
+  }
+}
+"""
+
+BUILD_GN_HEADER = """import("//lookup.gni")
+
+toolchain("bench_toolchain") {
+  tool("stamp") {
+    command = "touch {{output}}"
+  }
+}
+"""
+
+
+def _default_gn():
+    host = platform.system().lower()
+    arch = 'aarch64' if platform.machine().lower() == 'aarch64' else 'x86'
+    return os.path.join(os.path.dirname(BUILD_ROOT), 'prebuilts', 'build-tools',
+                        '{}-{}'.format(host, arch), 'bin', 'gn')
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file_obj:
+        file_obj.write(content)
+
+
+def generate_tree(root_dir, parts, targets):
+    part_subsystem = {'part_{}'.format(i): 'subsystem_{}'.format(i % 50) for i in range(parts)}
+    _write(os.path.join(root_dir, '.gn'), DOT_GN.format(python=sys.executable))
+    _write(os.path.join(root_dir, 'BUILDCONFIG.gn'), BUILDCONFIG_GN)
+    _write(os.path.join(root_dir, 'lookup.gni'),
+           LOOKUP_GNI.replace('{script}', GET_SUBSYSTEM_SCRIPT))
+    body = [BUILD_GN_HEADER]
+    for i in range(targets):
+        body.append('bench_target("t{}") {{\n  part_name = "part_{}"\n}}\n'.format(i, i % parts))
+    _write(os.path.join(root_dir, 'BUILD.gn'), '\n'.join(body))
+    return part_subsystem
+
+
+def prepare_out_dir(out_dir, part_subsystem):
+    parts_info_dir = os.path.join(out_dir, 'build_configs', 'parts_info')
+    os.makedirs(parts_info_dir, exist_ok=True)
+    with open(os.path.join(parts_info_dir, 'part_subsystem.json'), 'w') as file_obj:
+        json.dump(part_subsystem, file_obj, sort_keys=True, indent=2)
+    entries = '\n'.join('  "{}:{}",'.format(part, subsystem)
+                        for part, subsystem in sorted(part_subsystem.items()))
+    _write(os.path.join(parts_info_dir, 'part_subsystem.gni'),
+           'part_subsystem_info = [\n{}\n]\n'.format(entries))
+
+
+def count_script_exec(tracelog):
+    with open(tracelog, 'r') as file_obj:
+        events = json.load(file_obj)
+    if isinstance(events, dict):
+        events = events.get('traceEvents', [])
+    return sum(1 for event in events if event.get('cat') == 'script_exec')
+
+
+def run_gn_gen(gn_path, root_dir, out_name, indep):
+    out_dir = os.path.join(root_dir, out_name)
+    tracelog = os.path.join(root_dir, '{}_trace.json'.format(out_name))
+    cmd = [gn_path, 'gen', out_name, '--root={}'.format(root_dir),
+           '--args=ohos_indep_compiler_enable={}'.format('true' if indep else 'false'),
+           '--tracelog={}'.format(tracelog)]
+    start = time.monotonic()
+    subprocess.run(cmd, cwd=root_dir, check=True, stdout=subprocess.DEVNULL)
+    cost = time.monotonic() - start
+    shutil.rmtree(os.path.join(out_dir, 'obj'), ignore_errors=True)
+    return count_script_exec(tracelog), cost
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--gn', default=_default_gn())
+    parser.add_argument('--parts', type=int, default=500)
+    parser.add_argument('--targets', type=int, default=5000)
+    parser.add_argument('--work-dir', default=None)
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.gn):
+        print("gn binary '{}' not found, use --gn to specify it.".format(args.gn))
+        return 1
+
+    root_dir = args.work_dir or tempfile.mkdtemp(prefix='part_subsystem_bench_')
+    part_subsystem = generate_tree(root_dir, args.parts, args.targets)
+    results = []
+    for out_name, indep in (('out_exec_script', True), ('out_gni_map', False)):
+        prepare_out_dir(os.path.join(root_dir, out_name), part_subsystem)
+        exec_count, cost = run_gn_gen(args.gn, root_dir, out_name, indep)
+        results.append((out_name, exec_count, cost))
+
+    print('{:<18}{:>14}{:>14}'.format('variant', 'exec_script', 'gn gen (s)'))
+    for out_name, exec_count, cost in results:
+        print('{:<18}{:>14}{:>14.2f}'.format(out_name, exec_count, cost))
+    if not args.work_dir:
+        shutil.rmtree(root_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
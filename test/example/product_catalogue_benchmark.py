@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare product lookup costs of hb on a tree with many products.
+
+A synthetic tree with --companies x --products vendor products is
+generated. The time of a full scan of all product configs (what every
+ProductUtil.get_products call did before) is printed next to the time of
+loading the product catalogue from out/product_catalogue.json, as a new hb
+invocation does, and of a lookup by name in the loaded catalogue.
+
+usage: python3 product_catalogue_benchmark.py [--companies 10] [--products 50]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+sys.path.insert(0, os.path.join(BUILD_ROOT, 'hb'))
+
+from util.product_catalogue import ProductCatalogue, PRODUCT_CATALOGUE_FILE  # noqa: E402
+
+
+def write_product_config(path, product_name, subsystems):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    config = {
+        'product_name': product_name,
+        'type': 'standard',
+        'version': '3.0',
+        'subsystems': [{
+            'subsystem': 'subsystem{}'.format(i),
+            'components': [{
+                'component': 'component{}'.format(j),
+                'features': ['feature{}=true'.format(k) for k in range(4)]
+            } for j in range(10)]
+        } for i in range(subsystems)]
+    }
+    with open(path, 'w') as config_file:
+        json.dump(config, config_file, indent=2)
+
+
+def make_tree(root, companies, products, subsystems):
+    for company in range(companies):
+        for product in range(products):
+            write_product_config(
+                os.path.join(root, 'vendor', 'company{}'.format(company), 'product{}'.format(product), 'config.json'),
+                'product{}'.format(product), subsystems)
+    built_in_path = os.path.join(root, 'productdefine', 'common', 'products')
+    for product in range(10):
+        write_product_config(os.path.join(built_in_path, 'builtin{}.json'.format(product)),
+                             'builtin{}'.format(product), 1)
+    return [root, built_in_path, os.path.join(root, 'toolchain', 'llvm-project', 'llvm_products')]
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--companies', type=int, default=10)
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--subsystems', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='product_catalogue_')
+    try:
+        paths = make_tree(root, args.companies, args.products, args.subsystems)
+        cache_file = os.path.join(root, 'out', PRODUCT_CATALOGUE_FILE)
+
+        scan_time, catalogue = timed(lambda: ProductCatalogue.scan(*paths), args.repeat)
+        ProductCatalogue.get(*paths, cache_file=cache_file)
+
+        def load():
+            ProductCatalogue.clear()
+            return ProductCatalogue.get(*paths, cache_file=cache_file)
+
+        load_time, loaded = timed(load, args.repeat)
+        assert loaded.products == catalogue.products
+        lookup_time, _ = timed(lambda: loaded.find('product7', 'company3'), 1000)
+
+        print('products: {}'.format(len(catalogue.products)))
+        print('full scan of the product configs: {:.1f} ms'.format(scan_time * 1000))
+        print('catalogue loaded from cache:      {:.1f} ms'.format(load_time * 1000))
+        print('lookup by company and name:       {:.2f} us'.format(lookup_time * 1e6))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the graph backends of DependGraphAnalyzer on a synthetic graph.
+
+A layered DAG with --targets targets and --deps dependencies per target is
+generated. For each backend (networkx only when installed) the graph build,
+one traversal from a virtual root over --installs install targets (as
+FileDependencyAnalyzer does), --queries descendants queries, the peak RSS
+and the equality of the traversal orders are reported.
+
+usage: python3 sbom_depend_graph_benchmark.py [--targets 300000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def generate_targets(target_count, dep_count, seed=1):
+    from ohos.sbom.data.target import CompactTarget
+
+    rng = random.Random(seed)
+    targets = []
+    for i in range(target_count):
+        # depend on targets generated before, mostly close ones
+        deps = tuple('//bench:t{}'.format(rng.randrange(max(i - 2000, 0), i))
+                     for _ in range(dep_count) if i)
+        targets.append(CompactTarget(target_name='//bench:t{}'.format(i), type='shared_library', deps=deps))
+    return targets
+
+
+def run(backend, args):
+    sys.path.insert(0, BUILD_ROOT)
+    from ohos.sbom.analysis.depend_graph import DependGraphAnalyzer
+
+    targets = generate_targets(args.targets, args.deps)
+    rng = random.Random(2)
+    installs = ['//bench:t{}'.format(rng.randrange(args.targets)) for _ in range(args.installs)]
+    base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.monotonic()
+    analyzer = DependGraphAnalyzer(targets, backend=backend)
+    build_cost = time.monotonic() - start
+
+    visited = []
+    start = time.monotonic()
+    analyzer.add_virtual_root('__ROOT__', installs)
+    order = analyzer.dfs_downstream('__ROOT__', pre_visit=lambda n, d, p: True,
+                                    post_visit=lambda n, d, p: visited.append(n))
+    analyzer.remove_virtual_root('__ROOT__')
+    dfs_cost = time.monotonic() - start
+
+    start = time.monotonic()
+    closure_size = 0
+    for name in installs[:args.queries] * 2:
+        closure_size += len(analyzer.descendants(name))
+    query_cost = time.monotonic() - start
+
+    peak_mb = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base_rss) / 1024
+    print(json.dumps({'build': build_cost, 'dfs': dfs_cost, 'queries': query_cost, 'peak_mb': peak_mb,
+                      'visited': len(order), 'closure': closure_size,
+                      'order_hash': hash(tuple(order + visited)) & 0xffffffff}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--targets', type=int, default=300000)
+    parser.add_argument('--deps', type=int, default=6)
+    parser.add_argument('--installs', type=int, default=5000)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--run', choices=['csr', 'networkx'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run(args.run, args)
+        return 0
+
+    backends = ['csr']
+    try:
+        import networkx  # noqa: F401 pylint: disable=unused-import
+        backends.append('networkx')
+    except ImportError:
+        print('networkx is not installed, only the csr backend is measured')
+
+    results = {}
+    for backend in backends:
+        cmd = [sys.executable, os.path.abspath(__file__), '--run', backend, '--targets', str(args.targets),
+               '--deps', str(args.deps), '--installs', str(args.installs), '--queries', str(args.queries)]
+        env = dict(os.environ, PYTHONHASHSEED='0')
+        output = subprocess.check_output(cmd, env=env)
+        results[backend] = json.loads(output.decode().strip().splitlines()[-1])
+
+    print('{:<10}{:>10}{:>10}{:>12}{:>16}{:>10}'.format('backend', 'build(s)', 'dfs(s)', 'queries(s)',
+                                                        'peak RSS (MB)', 'visited'))
+    for backend, result in results.items():
+        print('{:<10}{:>10.2f}{:>10.2f}{:>12.2f}{:>16.1f}{:>10}'.format(
+            backend, result['build'], result['dfs'], result['queries'], result['peak_mb'], result['visited']))
+    if len(results) == 2:
+        same = results['csr']['order_hash'] == results['networkx']['order_hash'] \
+            and results['csr']['closure'] == results['networkx']['closure']
+        print('traversal order and closures identical: {}'.format(same))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the memory and time of loading gn_gen.json for the SBOM.
+
+Three loaders run in their own process, the peak RSS and the load time of
+each are printed:
+  legacy    json.loads() of the whole file and a Target per entry
+  streaming NinjaJsonLoader parsing into compact targets
+  cached    NinjaJsonLoader reading the compact form saved by streaming
+
+usage: python3 sbom_ninja_json_benchmark.py [--gn-json out/rk3568/sbom/gn_gen.json]
+Without --gn-json a synthetic file with --targets targets is generated.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def generate_gn_json(path, target_count):
+    with open(path, 'w') as file_obj:
+        file_obj.write('{"build_settings": ')
+        json.dump({'build_dir': '//out/bench/', 'default_toolchain': '//build/toolchain/ohos:ohos_clang_arm64',
+                   'gen_input_files': ['//BUILD.gn'], 'root_path': '/bench'}, file_obj)
+        file_obj.write(', "targets": {')
+        for i in range(target_count):
+            part = i % 800
+            label = '//foundation/part_{}/module_{}:target_{}'.format(part, i % 50, i)
+            target = {
+                'type': ('shared_library', 'source_set', 'action', 'group')[i % 4],
+                'toolchain': '//build/toolchain/ohos:ohos_clang_arm64',
+                'testonly': i % 10 == 0,
+                'visibility': ['*'],
+                'public': '*',
+                'deps': ['//foundation/part_{}/module_{}:target_{}'.format(part, (i + j) % 50, max(i - j, 0))
+                         for j in range(1, 6)],
+                'sources': ['//foundation/part_{}/module_{}/src/file_{}.cpp'.format(part, i % 50, j)
+                            for j in range(8)],
+                'outputs': ['//out/bench/foundation/part_{}/libtarget_{}.z.so'.format(part, i)],
+                'include_dirs': ['//foundation/part_{}/include/dir_{}/'.format(part, j) for j in range(20)],
+                'cflags': ['-fstack-protector-strong', '-Wall', '-Werror', '-O2', '-fPIC'] * 4,
+                'defines': ['FEATURE_{}=1'.format(j) for j in range(10)],
+                'args': ['--module-name', 'target_{}'.format(i), '--part-name', 'part_{}'.format(part)],
+                'metadata': {'install_modules': [label] if i % 3 == 0 else [],
+                             'module_info': ['gen/part_{}/target_{}_module_info.json'.format(part, i)]},
+            }
+            if i:
+                file_obj.write(', ')
+            json.dump(label, file_obj)
+            file_obj.write(': ')
+            json.dump(target, file_obj)
+        file_obj.write('}, "toolchains": {}}')
+
+
+def load(variant, gn_json, cache_file):
+    sys.path.insert(0, BUILD_ROOT)
+    from ohos.sbom.data.ninja_json import NinjaJson
+    from ohos.sbom.extraction.ninja_json_loader import NinjaJsonLoader
+
+    start = time.monotonic()
+    if variant == 'legacy':
+        with open(gn_json, 'r', encoding='utf-8') as file_obj:
+            ninja_json = NinjaJson.from_dict(json.loads(file_obj.read()))
+    else:
+        ninja_json = NinjaJsonLoader(gn_json, cache_file).load()
+    cost = time.monotonic() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'targets': len(ninja_json.all_targets()), 'cost': cost, 'peak_mb': peak_mb}))
+
+
+def run_variant(variant, gn_json, cache_file):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--load', variant,
+                                      '--gn-json', gn_json, '--cache-file', cache_file])
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--gn-json', default=None)
+    parser.add_argument('--targets', type=int, default=100000)
+    parser.add_argument('--cache-file', default=None)
+    parser.add_argument('--load', choices=['legacy', 'streaming', 'cached'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.load:
+        load(args.load, args.gn_json, args.cache_file)
+        return 0
+
+    work_dir = tempfile.mkdtemp(prefix='sbom_ninja_json_bench_')
+    gn_json = args.gn_json
+    if not gn_json:
+        gn_json = os.path.join(work_dir, 'gn_gen.json')
+        generate_gn_json(gn_json, args.targets)
+    cache_file = os.path.join(work_dir, 'gn_gen.compact.pickle')
+
+    print('gn_gen.json: {:.1f} MB'.format(os.path.getsize(gn_json) / 1024 / 1024))
+    print('{:<12}{:>10}{:>12}{:>14}'.format('loader', 'targets', 'time (s)', 'peak RSS (MB)'))
+    for variant in ('legacy', 'streaming', 'cached'):
+        result = run_variant(variant, gn_json, cache_file)
+        print('{:<12}{:>10}{:>12.2f}{:>14.1f}'.format(variant, result['targets'], result['cost'], result['peak_mb']))
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
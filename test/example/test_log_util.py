@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check which failures of build.log the failed log analysis reports when it
+starts at the offset where the failed command began writing."""
+
+import os
+import sys
+
+import pytest
+
+HB_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'hb')
+sys.path.insert(0, HB_ROOT)
+
+from exceptions.ohos_exception import OHOSException  # noqa: E402
+from util.log_util import FailedLogAnalyzer, LogUtil  # noqa: E402
+
+CMD = ['ninja', '-C', 'out']
+
+EARLIER_BUILD = (
+    '[1/3] CXX obj/old/old.o\n'
+    'FAILED: obj/old/old.o\n'
+    'old.cpp:1:1: error: old failure\n'
+    'ninja: error: old ninja failure\n'
+    'ninja: build stopped: subcommand failed.\n'
+)
+
+FAILED_COMMAND = (
+    '[1/2] CXX obj/new/new.o\n'
+    'FAILED: obj/new/new.o\n'
+    'new.cpp:1:1: error: new failure\n'
+    'ninja: build stopped: subcommand failed.\n'
+)
+
+
+@pytest.fixture
+def build_log(tmp_path):
+    log_path = tmp_path / 'build.log'
+    log_path.write_text(EARLIER_BUILD + FAILED_COMMAND, encoding='utf-8')
+    return str(log_path), len(EARLIER_BUILD.encode('utf-8'))
+
+
+def scan(log_path, start_offset):
+    analyzer = FailedLogAnalyzer(LogUtil.get_compiler_failed_prefix(CMD))
+    analyzer.scan(log_path, start_offset)
+    return analyzer
+
+
+def test_scan_from_start_reports_every_failure(build_log):
+    log_path, _ = build_log
+    analyzer = scan(log_path, 0)
+    assert analyzer.ninja_error_lines == ['ninja: error: old ninja failure']
+    assert len(analyzer.compiler_failed_logs) == 2
+    assert 'old failure' in analyzer.compiler_failed_logs[0]
+
+
+def test_scan_from_offset_skips_earlier_output(build_log):
+    log_path, start_offset = build_log
+    analyzer = scan(log_path, start_offset)
+    assert analyzer.ninja_error_lines == []
+    assert analyzer.compiler_failed_logs == [FAILED_COMMAND[:FAILED_COMMAND.index('ninja: build stopped')]]
+    assert analyzer.is_compiler_failed
+
+
+def test_failed_log_from_offset(build_log):
+    log_path, start_offset = build_log
+    with pytest.raises(OHOSException):
+        LogUtil.get_failed_log(log_path, CMD, start_offset)
+    with open(os.path.join(os.path.dirname(log_path), 'error.log'), 'r', encoding='utf-8') as error_log:
+        content = error_log.read()
+    assert 'new failure' in content
+    assert 'old failure' not in content
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check that the graph queries of the csr backend build the networkx graph
+on demand and agree with the networkx backend, and that its closure cache
+stays bounded."""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+
+from ohos.sbom.analysis.csr_graph import CsrGraph  # noqa: E402
+from ohos.sbom.analysis.depend_graph import DependGraphAnalyzer  # noqa: E402
+from ohos.sbom.data.target import CompactTarget  # noqa: E402
+
+needs_networkx = pytest.mark.skipif(importlib.util.find_spec("networkx") is None,
+                                    reason="networkx is not installed")
+
+
+def make_targets():
+    deps = {
+        '//a:a': ['//b:b', '//c:c'],
+        '//b:b': ['//d:d'],
+        '//c:c': ['//d:d'],
+        '//d:d': [],
+        '//e:e': ['//a:a'],
+    }
+    return [CompactTarget(target_name=name, type='shared_library', deps=target_deps)
+            for name, target_deps in deps.items()]
+
+
+@needs_networkx
+@pytest.mark.parametrize("backend", DependGraphAnalyzer.BACKENDS)
+def test_shortest_path_on_fresh_analyzer(backend):
+    analyzer = DependGraphAnalyzer(make_targets(), backend=backend)
+    assert analyzer.shortest_path('//e:e', '//d:d') in (['//e:e', '//a:a', '//b:b', '//d:d'],
+                                                        ['//e:e', '//a:a', '//c:c', '//d:d'])
+
+
+@needs_networkx
+@pytest.mark.parametrize("backend", DependGraphAnalyzer.BACKENDS)
+def test_sub_graph_on_fresh_analyzer(backend):
+    analyzer = DependGraphAnalyzer(make_targets(), backend=backend)
+    sub_graph = analyzer.sub_graph(['//a:a', '//b:b', '//d:d'])
+    assert sorted(sub_graph.nodes) == ['//a:a', '//b:b', '//d:d']
+    assert sorted(sub_graph.edges) == [('//a:a', '//b:b'), ('//b:b', '//d:d')]
+    assert sub_graph.nodes['//b:b']['data'].target_name == '//b:b'
+
+
+@needs_networkx
+def test_csr_queries_match_networkx_backend():
+    csr = DependGraphAnalyzer(make_targets(), backend="csr")
+    networkx = DependGraphAnalyzer(make_targets(), backend="networkx")
+    assert sorted(csr.descendants('//e:e')) == sorted(networkx.descendants('//e:e'))
+    assert sorted(csr.sub_graph(csr.nodes()).edges) == sorted(networkx.sub_graph(networkx.nodes()).edges)
+
+
+def test_csr_closure_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(CsrGraph, "CLOSURE_CACHE_IDS", 4)
+    graph = CsrGraph(make_targets())
+
+    def names(ids):
+        return sorted(graph.name_of(i) for i in ids)
+
+    assert names(graph.reachable('//e:e')) == ['//a:a', '//b:b', '//c:c', '//d:d']
+    assert names(graph.reachable('//a:a')) == ['//b:b', '//c:c', '//d:d']
+    # the closure of //e:e was dropped to make room for the one of //a:a
+    assert graph._closure_cache_ids <= 4
+    assert list(graph._closure_cache) == [(graph.node_id('//a:a'), True)]
+    assert names(graph.reachable('//e:e')) == ['//a:a', '//b:b', '//c:c', '//d:d']
+    assert names(graph.reachable('//d:d', downstream=False)) == ['//a:a', '//b:b', '//c:c', '//e:e']
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check that an incremental SBOM run produces the same SPDX document as a
+full run, on a synthetic source tree and gn_gen.json."""
+
+import argparse
+import copy
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("packageurl")
+pytest.importorskip("license_expression")
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+
+from ohos.sbom.extraction.local_resource_loader import LocalResourceLoader  # noqa: E402
+from ohos.sbom.generate_sbom import generate_sbom, set_path  # noqa: E402
+
+BASE_DIRS = ['system', 'ramdisk', 'vendor', 'updater', 'updater_vendor', 'eng_system',
+             'eng_chipset', 'sys_prod', 'chip_prod', 'cloud_rom']
+
+MANIFEST = """<manifest>
+  <remote name="origin" fetch="https://gitee.com/openharmony"/>
+  <default remote="origin" revision="master" sync-j="4"/>
+{projects}
+</manifest>
+"""
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def _module_info_args(project, name, install_enable=True):
+    args = []
+    for base_dir in BASE_DIRS:
+        args += ['--{}-base-dir'.format(base_dir), base_dir]
+    args += ['--label-name', name, '--target-label', '//{}:{}'.format(project, name), '--type', 'lib',
+             '--source-dir', project, '--install-images', 'system', '--install-name', name,
+             '--suffix', '.so', '--output-file', 'gen/{}/{}_module_info.json'.format(project, name),
+             '--module-install-dir', 'lib']
+    if not install_enable:
+        args.append('--install-enable')
+    return args
+
+
+def make_source_tree(source_root, projects=4, libs=6):
+    """Source files and licenses, and the gn_gen.json targets building them."""
+    targets = {}
+    manifest_projects = []
+    for p in range(projects):
+        project = 'proj{}'.format(p)
+        manifest_projects.append('  <project name="{0}" path="{0}" revision="r{1}"/>'.format(project, p))
+        _write(os.path.join(source_root, project, 'LICENSE'), 'Apache License\nVersion 2.0\n')
+        for k in range(libs):
+            name = 'lib{}'.format(k)
+            label = '//{}:{}'.format(project, name)
+            sources = ['//{}/{}_{}.c'.format(project, name, i) for i in range(2)]
+            for source in sources:
+                _write(os.path.join(source_root, source[2:]),
+                       '/* Copyright (c) 2025 {} Co., Ltd. */\nint {}(void);\n'.format(project, name))
+            deps = ['//proj{}:lib{}'.format((p + 1) % projects, (k + 1) % libs)] if p or k else []
+            module_info = 'gen/{}/{}_module_info.json'.format(project, name)
+            targets[label] = {
+                'type': 'shared_library', 'deps': deps + [label + '_info'], 'sources': sources,
+                'outputs': ['//out/x/{}/{}.so'.format(project, name)],
+                'source_outputs': {s: ['//out/x/obj/{}.o'.format(s[2:])] for s in sources},
+                'libs': ['c'], 'ldflags': ['-lm'], 'args': [], 'testonly': False,
+                'metadata': {'install_modules': [{'module_info_file': module_info}]},
+            }
+            targets[label + '_info'] = {
+                'type': 'generated_file', 'deps': [], 'outputs': ['//out/x/' + module_info],
+                'args': _module_info_args(project, name),
+            }
+    return {
+        'build_settings': {'build_dir': '//out/x/', 'default_toolchain': '//toolchain:x',
+                           'gen_input_files': [], 'root_path': source_root},
+        'targets': targets,
+    }, MANIFEST.format(projects='\n'.join(manifest_projects))
+
+
+def run_sbom(source_root, out_dir, gn_gen, manifest, incremental):
+    # generate_sbom removes gn_gen.json and the manifests when it is done
+    _write(os.path.join(out_dir, 'sbom', 'gn_gen.json'), json.dumps(gn_gen))
+    _write(os.path.join(out_dir, 'sbom', 'manifests', 'manifest_tag_20250101_000000.xml'), manifest)
+    LocalResourceLoader.clear_cache()
+    args = argparse.Namespace(source_root_dir=source_root, out_dir=out_dir, product='bench',
+                              platform='linux-x86_64', jobs=1, incremental=incremental)
+    set_path(args)
+    generate_sbom(args)
+    with open(os.path.join(out_dir, 'sbom', 'spdx.json')) as f:
+        spdx = json.load(f)
+    # the only fields that differ from one run to the next
+    spdx['creationInfo'].pop('created', None)
+    spdx.pop('documentNamespace', None)
+    return spdx
+
+
+def change_targets(gn_gen, source_root):
+    changed = copy.deepcopy(gn_gen)
+    targets = changed['targets']
+    # new source file
+    new_source = '//proj1/lib2_extra.c'
+    _write(os.path.join(source_root, new_source[2:]), '/* Copyright (c) 2025 New Author */\n')
+    targets['//proj1:lib2']['sources'].append(new_source)
+    # new dependency
+    targets['//proj2:lib3']['deps'].append('//proj0:lib5')
+    # no longer installed
+    targets['//proj3:lib1_info']['args'] = _module_info_args('proj3', 'lib1', install_enable=False)
+    # removed target
+    del targets['//proj0:lib4']
+    del targets['//proj0:lib4_info']
+    for target in targets.values():
+        if '//proj0:lib4' in target.get('deps', []):
+            target['deps'].remove('//proj0:lib4')
+    return changed
+
+
+def test_incremental_sbom_matches_full_run(tmp_path):
+    source_root = str(tmp_path / 'src')
+    gn_gen, manifest = make_source_tree(source_root)
+    incremental_out = str(tmp_path / 'out_incremental')
+
+    full = run_sbom(source_root, str(tmp_path / 'out_full'), gn_gen, manifest, incremental=False)
+    assert run_sbom(source_root, incremental_out, gn_gen, manifest, incremental=True) == full
+    assert os.path.isfile(os.path.join(incremental_out, 'sbom', 'sbom_state.pickle'))
+    # nothing changed, everything is reused
+    assert run_sbom(source_root, incremental_out, gn_gen, manifest, incremental=True) == full
+
+    changed = change_targets(gn_gen, source_root)
+    full_changed = run_sbom(source_root, str(tmp_path / 'out_full_changed'), changed, manifest, incremental=False)
+    assert full_changed != full
+    assert run_sbom(source_root, incremental_out, changed, manifest, incremental=True) == full_changed
+
+
+def test_full_runs_are_identical(tmp_path):
+    source_root = str(tmp_path / 'src')
+    gn_gen, manifest = make_source_tree(source_root)
+    first = run_sbom(source_root, str(tmp_path / 'out_first'), gn_gen, manifest, incremental=False)
+    second = run_sbom(source_root, str(tmp_path / 'out_second'), gn_gen, manifest, incremental=False)
+    assert first == second
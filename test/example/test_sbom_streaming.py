@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check that the streaming SBOM writers produce the same files as converting
+the complete SBOM metadata in memory."""
+
+import gzip
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("packageurl")
+pytest.importorskip("license_expression")
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+
+from ohos.sbom.common.utils import write_json  # noqa: E402
+from ohos.sbom.converters.api import SBOMConverter, SBOMMetaDataStreamWriter  # noqa: E402
+from ohos.sbom.converters.base import SBOMFormat  # noqa: E402
+from ohos.sbom.sbom.metadata.sbom_meta_data import (Document, File, Hash, Package, Relationship,  # noqa: E402
+                                                    RelationshipType, SBOMMetaData)
+
+
+def make_sbom_meta_data(files=50, dangling=None):
+    document = Document(serial_number="urn:uuid:1", version="1", bom_format="SPDX", spec_version="2.3",
+                        data_license="CC0-1.0", timestamp="2025-01-01T00:00:00Z", authors=["OpenHarmony"],
+                        doc_id=None, name="product-master", document_namespace=None,
+                        license_list_version="3.20", tools=[{"name": "ohos-sbom", "version": "1.0"}])
+    packages = [Package(type="source", supplier="Organization: OpenHarmony", group="OpenHarmony",
+                        name="proj{}".format(i), version="master", purl="pkg:gitee/openharmony/proj{}".format(i),
+                        license_concluded="", license_declared="Apache-2.0",
+                        bom_ref="pkg:gitee/openharmony/proj{}".format(i), comp_platform="linux",
+                        download_location="https://gitee.com/openharmony/proj{}".format(i))
+                for i in range(3)]
+    file_list = [File(file_name="lib{}.c".format(i), file_id="//proj{}/lib{}.c".format(i % 3, i),
+                      checksums=[Hash(alg="sha256", content="0" * 64)] if i % 2 else [],
+                      license_concluded="NOASSERTION", copyright_text="Copyright (c) 2025 作者 {}".format(i))
+                 for i in range(files)]
+    relationships = [Relationship(bom_ref=file_list[i].file_id, depends_on=[file_list[i - 1].file_id],
+                                  relationship_type=RelationshipType.GENERATED_FROM)
+                     for i in range(1, files)]
+    relationships.append(Relationship(bom_ref=packages[0].bom_ref,
+                                      depends_on=[p.bom_ref for p in packages[1:]] + (dangling or []),
+                                      relationship_type=RelationshipType.DEPENDS_ON))
+    return SBOMMetaData(document=document, packages=packages, files=file_list, relationships=relationships)
+
+
+def stream(sbom_meta, writer):
+    # the generator produces files first, then packages and their relationships
+    with writer:
+        writer.write_document(sbom_meta.document)
+        for file in sbom_meta.files:
+            writer.add_file(file)
+        for rel in sbom_meta.relationships[:-1]:
+            writer.add_relationship(rel)
+        for package in sbom_meta.packages:
+            writer.add_package(package)
+        writer.add_relationship(sbom_meta.relationships[-1])
+
+
+def read_bytes(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_streamed_files_match_in_memory_conversion(tmp_path, compress):
+    sbom_meta = make_sbom_meta_data()
+    suffix = ".gz" if compress else ""
+    expected_spdx = str(tmp_path / "expected_spdx.json")
+    expected_meta_data = str(tmp_path / "expected_sbom_meta_data.json")
+    write_json(SBOMConverter(sbom_meta).convert(SBOMFormat.SPDX), expected_spdx)
+    write_json(sbom_meta.to_dict(), expected_meta_data)
+
+    spdx = str(tmp_path / ("spdx.json" + suffix))
+    meta_data = str(tmp_path / ("sbom_meta_data.json" + suffix))
+    stream(sbom_meta, SBOMConverter.open_stream(SBOMFormat.SPDX, spdx, compress=compress, validate=True))
+    stream(sbom_meta, SBOMMetaDataStreamWriter(meta_data, compress=compress))
+
+    assert read_bytes(spdx) == read_bytes(expected_spdx)
+    assert read_bytes(meta_data) == read_bytes(expected_meta_data)
+    assert sorted(os.listdir(tmp_path)) == sorted(["expected_spdx.json", "expected_sbom_meta_data.json",
+                                                   "spdx.json" + suffix, "sbom_meta_data.json" + suffix])
+
+
+def test_validation_reports_dangling_references(tmp_path):
+    sbom_meta = make_sbom_meta_data(dangling=["pkg:gitee/openharmony/missing"])
+    spdx = str(tmp_path / "spdx.json")
+    with pytest.raises(ValueError, match="Invalid reference: pkg:gitee/openharmony/missing"):
+        stream(sbom_meta, SBOMConverter.open_stream(SBOMFormat.SPDX, spdx, validate=True))
+
+
+def test_aborted_stream_leaves_no_output(tmp_path):
+    sbom_meta = make_sbom_meta_data()
+    spdx = str(tmp_path / "spdx.json")
+    with pytest.raises(RuntimeError):
+        with SBOMConverter.open_stream(SBOMFormat.SPDX, spdx) as writer:
+            writer.write_document(sbom_meta.document)
+            writer.add_file(sbom_meta.files[0])
+            raise RuntimeError("generation failed")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Check that the raw copy and threaded paths of the zip helpers write the
+same zips as the public zipfile path they fall back to."""
+
+import os
+import random
+import sys
+import zipfile
+
+import pytest
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+
+from scripts.util import build_utils  # noqa: E402
+
+
+@pytest.fixture
+def input_zips(tmp_path):
+    rand = random.Random(5)
+    words = [''.join(rand.choice('abcdefghij') for _ in range(6)) for _ in range(64)]
+    zips = []
+    for index in range(3):
+        files = []
+        for entry in range(40):
+            path = tmp_path / 'src{}'.format(index) / 'dir{}'.format(entry % 4) / 'file{}.txt'.format(entry)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # empty, tiny and compressible entries, some in every zip
+            path.write_text(' '.join(rand.choice(words) for _ in range(entry * 30)))
+            files.append(str(path))
+        zip_file = tmp_path / 'input{}.zip'.format(index)
+        build_utils.do_zip(files, str(zip_file), base_dir=str(tmp_path / 'src{}'.format(index)),
+                           compress_fn=lambda zip_path: not zip_path.endswith('3.txt'))
+        zips.append(str(zip_file))
+    return zips
+
+
+def zip_bytes(path):
+    with open(path, 'rb') as zip_file:
+        return zip_file.read()
+
+
+def test_internals_supported():
+    assert build_utils._zip_internals_supported()
+
+
+def test_merge_zips_matches_slow_path(tmp_path, input_zips, monkeypatch):
+    build_utils.merge_zips(str(tmp_path / 'fast.zip'), input_zips)
+    monkeypatch.setattr(build_utils, '_zip_internals_supported', lambda: False)
+    build_utils.merge_zips(str(tmp_path / 'slow.zip'), input_zips)
+
+    assert zip_bytes(tmp_path / 'fast.zip') == zip_bytes(tmp_path / 'slow.zip')
+    with zipfile.ZipFile(str(tmp_path / 'fast.zip')) as merged:
+        assert merged.testzip() is None
+        # the same names in later zips are skipped
+        assert len(merged.namelist()) == 40
+
+
+def test_do_zip_matches_slow_path(tmp_path, input_zips, monkeypatch):
+    src_dir = tmp_path / 'src0'
+    files = sorted(str(path) for path in src_dir.rglob('*.txt'))
+    build_utils.do_zip(files, str(tmp_path / 'fast.zip'), base_dir=str(src_dir), compress_fn=lambda _: True)
+    monkeypatch.setattr(build_utils, '_zip_internals_supported', lambda: False)
+    build_utils.do_zip(files, str(tmp_path / 'slow.zip'), base_dir=str(src_dir), compress_fn=lambda _: True)
+
+    assert zip_bytes(tmp_path / 'fast.zip') == zip_bytes(tmp_path / 'slow.zip')
+
+
+@pytest.mark.parametrize('compress_level', [1, 9])
+def test_merge_zips_recompresses_other_levels(tmp_path, compress_level, monkeypatch):
+    data = ' '.join('word{}'.format(index % 97) for index in range(4000)).encode()
+    input_zip = str(tmp_path / 'level.zip')
+    with zipfile.ZipFile(input_zip, 'w', zipfile.ZIP_DEFLATED, compresslevel=compress_level) as zip_file:
+        zip_file.writestr('deflated.txt', data)
+        zip_file.writestr(zipfile.ZipInfo('stored.txt'), data, zipfile.ZIP_STORED)
+
+    build_utils.merge_zips(str(tmp_path / 'fast.zip'), [input_zip])
+    monkeypatch.setattr(build_utils, '_zip_internals_supported', lambda: False)
+    build_utils.merge_zips(str(tmp_path / 'slow.zip'), [input_zip])
+
+    assert zip_bytes(tmp_path / 'fast.zip') == zip_bytes(tmp_path / 'slow.zip')
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2025 Huawei Device Co., Ltd.
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compare the zip helpers of build_utils with the way they worked before.
+
+--zips input zips of --entries deflated entries each are generated with
+do_zip(). The time of merging them with merge_zips() (entries deflated
+again in threads) is printed next to the time of inflating and deflating
+every entry one at a time, as merge_zips() did before. The time of do_zip() (files
+deflated in threads) is printed next to adding the files one at a time.
+Both pairs of outputs are checked to be byte identical.
+
+usage: python3 zip_merge_benchmark.py [--zips 4] [--entries 2000]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+BUILD_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, BUILD_ROOT)
+
+from scripts.util import build_utils  # noqa: E402
+
+
+def make_files(root, zip_index, entries, entry_size):
+    rand = random.Random(zip_index)
+    words = [''.join(rand.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(8)) for _ in range(512)]
+    files = []
+    for entry in range(entries):
+        path = os.path.join(root, 'zip{}'.format(zip_index), 'dir{}'.format(entry % 20),
+                            'file{}.txt'.format(entry))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            # compressible text, as source files and resources are
+            f.write(' '.join(rand.choice(words) for _ in range(entry_size // 9)))
+        files.append(path)
+    return files
+
+
+def serial_do_zip(files, output, base_dir):
+    """do_zip() before the files were deflated in threads."""
+    inputs = sorted((os.path.relpath(path, base_dir), path) for path in files)
+    with zipfile.ZipFile(output, 'w') as out_zip:
+        for zip_path, fs_path in inputs:
+            with open(fs_path, 'rb') as f:
+                build_utils.add_to_zip_hermetic(out_zip, zip_path, data=f.read(), compress=True)
+
+
+def recompress_merge_zips(output, input_zips):
+    """merge_zips() before entries were deflated again in threads."""
+    added_names = set()
+    with zipfile.ZipFile(output, 'w') as out_zip:
+        for in_file in input_zips:
+            with zipfile.ZipFile(in_file, 'r') as in_zip:
+                for info in in_zip.infolist():
+                    if info.filename[-1] == '/' or info.filename in added_names:
+                        continue
+                    build_utils.add_to_zip_hermetic(out_zip, info.filename, data=in_zip.read(info),
+                                                    compress=info.compress_type != zipfile.ZIP_STORED)
+                    added_names.add(info.filename)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def same_bytes(first, second):
+    with open(first, 'rb') as f1, open(second, 'rb') as f2:
+        return f1.read() == f2.read()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--zips', type=int, default=4)
+    parser.add_argument('--entries', type=int, default=2000)
+    parser.add_argument('--entry-size', type=int, default=8192)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='zip_merge_')
+    try:
+        input_zips = []
+        all_files = []
+        for index in range(args.zips):
+            files = make_files(os.path.join(root, 'src'), index, args.entries, args.entry_size)
+            all_files.extend(files)
+            input_zip = os.path.join(root, 'input{}.zip'.format(index))
+            build_utils.do_zip(files, input_zip, base_dir=os.path.join(root, 'src'), compress_fn=lambda _: True)
+            input_zips.append(input_zip)
+
+        base_dir = os.path.join(root, 'src')
+        serial_zip_time = timed(lambda: serial_do_zip(all_files, os.path.join(root, 'serial.zip'), base_dir),
+                                args.repeat)
+        do_zip_time = timed(lambda: build_utils.do_zip(all_files, os.path.join(root, 'threaded.zip'),
+                                                       base_dir=base_dir, compress_fn=lambda _: True),
+                            args.repeat)
+        recompress_time = timed(lambda: recompress_merge_zips(os.path.join(root, 'recompressed.zip'), input_zips),
+                                args.repeat)
+        merge_time = timed(lambda: build_utils.merge_zips(os.path.join(root, 'merged.zip'), input_zips),
+                           args.repeat)
+
+        assert same_bytes(os.path.join(root, 'serial.zip'), os.path.join(root, 'threaded.zip'))
+        assert same_bytes(os.path.join(root, 'recompressed.zip'), os.path.join(root, 'merged.zip'))
+        with zipfile.ZipFile(os.path.join(root, 'merged.zip')) as merged:
+            assert merged.testzip() is None
+
+        print('entries: {} in {} zips, workers: {}'.format(
+            len(all_files), args.zips, build_utils._zip_worker_count()))
+        print('do_zip, one file at a time:      {:.0f} ms'.format(serial_zip_time * 1000))
+        print('do_zip, deflated in threads:     {:.0f} ms'.format(do_zip_time * 1000))
+        print('merge_zips, one entry at a time:  {:.0f} ms'.format(recompress_time * 1000))
+        print('merge_zips, deflated in threads:  {:.0f} ms'.format(merge_time * 1000))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())